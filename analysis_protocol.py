@@ -0,0 +1,59 @@
+"""
+Wire protocol between capture agents and the analysis server
+
+Every message is:  4-byte big-endian header length | JSON header | payload
+The header's 'payload' field gives the payload length in bytes (0 if none).
+
+Agent -> server
+  hello  {bay, mode, width, height}         register a bay
+  frame  {seq, tiles: [[x, y, w, h, len]]}  changed tiles, PNG bytes concatenated
+Server -> agent
+  welcome {credits}                         frames the agent may have in flight
+  credit  {n}                               n more frames may be sent
+  speech  {text, seq}                       commentary to speak on the bay
+  error   {error}                           bad hello or frame; the server hangs up
+"""
+
+import json
+import struct
+
+_LENGTH = struct.Struct('>I')
+MAX_HEADER = 1 << 20
+MAX_PAYLOAD = 64 << 20
+
+
+def send_message(sock, header, payload=b''):
+    """Send one framed message (caller serializes concurrent senders)"""
+    header = dict(header, payload=len(payload))
+    blob = json.dumps(header, separators=(',', ':')).encode()
+    sock.sendall(_LENGTH.pack(len(blob)) + blob + payload)
+
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes, or raise ConnectionError on EOF"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    """Receive one framed message as (header, payload)"""
+    (length,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    if length > MAX_HEADER:
+        raise ConnectionError(f"header too large ({length} bytes)")
+    header = json.loads(_recv_exact(sock, length))
+    if not isinstance(header, dict):
+        raise ConnectionError("header is not a JSON object")
+    size = header.get('payload', 0)
+    if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+        raise ConnectionError(f"bad payload length ({size!r})")
+    if size > MAX_PAYLOAD:
+        raise ConnectionError(f"payload too large ({size} bytes)")
+    payload = _recv_exact(sock, size) if size else b''
+    return header, payload
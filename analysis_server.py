@@ -0,0 +1,398 @@
+"""
+Headless analysis server - runs detection, OCR, parsing and LLM calls for
+lightweight capture agents on the bay PCs, and sends speech text back
+
+Each agent streams changed screen tiles; the server keeps a per-bay canvas,
+batches dirty canvases across agents, OCRs them on the shared worker pool
+and announces through one TriggerBasedAnnouncer per bay.
+
+Backpressure is credit based: an agent may have at most --credits frames
+unacknowledged. Credits are returned when the server picks a bay's canvas up
+for analysis, so frames that arrive while a bay is busy are coalesced into
+one canvas rather than queued.
+
+Examples:
+  python analysis_server.py --port 8765
+  python capture_agent.py --server 127.0.0.1:8765 --bay bay1 --mode hype
+"""
+
+import io
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import llm_transport
+import model_router
+from analysis_protocol import recv_message, send_message
+from commentary_cache import get_commentary_cache
+from gspro_ai_trigger import TriggerBasedAnnouncer
+from ocr_pool import get_ocr_pool, ocr_image, shutdown_ocr_pool
+from personality_registry import get_registry
+from shared_resources import warm_up
+
+# Largest canvas an agent may register (pixels per side)
+MAX_CANVAS = 16384
+
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def frame_error(header, payload_size, size):
+    """Why a frame header can't be applied to a canvas of size, or None if it can"""
+    tiles = header.get('tiles')
+    if not isinstance(tiles, list):
+        return "frame needs a tiles list"
+    if not _is_count(header.get('seq', 0)):
+        return "frame seq must be a non-negative integer"
+    width, height = size
+    total = 0
+    for tile in tiles:
+        if not (isinstance(tile, list) and len(tile) == 5 and all(map(_is_count, tile))):
+            return "each tile must be [x, y, w, h, length] in non-negative integers"
+        x, y, w, h, length = tile
+        if not (w and h and x + w <= width and y + h <= height):
+            return f"tile {tile} is outside the {width}x{height} canvas"
+        total += length
+    if total > payload_size:
+        return f"tiles need {total} payload bytes, frame has {payload_size}"
+    return None
+
+
+class AgentSession:
+    """Server-side state for one connected capture agent (one bay)"""
+
+    def __init__(self, sock, bay, mode, size, announcer):
+        from PIL import Image
+
+        self.sock = sock
+        self.bay = bay
+        self.mode = mode
+        self.announcer = announcer
+        self.canvas = Image.new('RGB', size)
+        self.dirty = False
+        self.busy = False
+        self.retry = False
+        self.unacked = 0
+        self.last_seq = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.stats = {'frames': 0, 'tiles': 0, 'bytes': 0, 'batches': 0, 'spoken': 0}
+
+    def send(self, header, payload=b''):
+        """Send to the agent, ignoring a connection that has gone away"""
+        if self.closed:
+            return
+        try:
+            with self.send_lock:
+                send_message(self.sock, header, payload)
+        except OSError:
+            self.closed = True
+
+    def apply_frame(self, header, payload):
+        """Paste the frame's changed tiles onto the bay canvas"""
+        from PIL import Image
+
+        offset = 0
+        with self.lock:
+            for x, y, w, h, length in header['tiles']:
+                try:
+                    tile = Image.open(io.BytesIO(payload[offset:offset + length]))
+                except Image.DecompressionBombError as e:
+                    raise ValueError(str(e))
+                if tile.size != (w, h):
+                    raise ValueError(f"tile at {x},{y} is {tile.size}, header says {(w, h)}")
+                self.canvas.paste(tile.convert('RGB'), (x, y))
+                offset += length
+            self.dirty = True
+            self.unacked += 1
+            self.last_seq = header.get('seq', self.last_seq)
+            self.stats['frames'] += 1
+            self.stats['tiles'] += len(header['tiles'])
+            self.stats['bytes'] += len(payload)
+
+
+class AnalysisServer:
+    """Accepts agents, batches their dirty canvases and announces the results"""
+
+    def __init__(self, host='127.0.0.1', port=8765, credits=2, batch_window=0.05,
+                 ocr_workers=None, api_key=None, debug=False):
+        self.credits = credits
+        self.batch_window = batch_window
+        self.api_key = api_key
+        self.debug = debug
+        self.sessions = []
+        self.sessions_lock = threading.Lock()
+        self.work_ready = threading.Condition(self.sessions_lock)
+        self.ocr_workers = ocr_workers
+        self.ocr_pool = get_ocr_pool(ocr_workers)
+        self.pool_lock = threading.Lock()
+        self.announce_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='announce')
+        self.cache = get_commentary_cache()
+        self.running = True
+
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server.handle_agent(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.tcp = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.tcp.daemon_threads = True
+        self.address = self.tcp.server_address
+
+    def handle_agent(self, sock):
+        """Connection thread: register the agent, then apply its frames"""
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            header, _ = recv_message(sock)
+        except (ConnectionError, ValueError):
+            return
+        if header.get('type') != 'hello':
+            return
+        size = (header.get('width'), header.get('height'))
+        if not all(isinstance(v, int) and not isinstance(v, bool) and 0 < v <= MAX_CANVAS
+                   for v in size):
+            try:
+                send_message(sock, {'type': 'error',
+                                    'error': f"hello needs width and height in 1-{MAX_CANVAS}"})
+            except OSError:
+                pass
+            return
+
+        mode = header.get('mode', 'normal')
+        if get_registry().get(mode) is None:
+            mode = 'normal'
+        announcer = TriggerBasedAnnouncer(
+            personality_mode=mode,
+            debug_mode=self.debug,
+            api_key=self.api_key,
+            commentary_cache=self.cache
+        )
+        session = AgentSession(sock, header.get('bay', 'bay'), mode, size, announcer)
+        with self.sessions_lock:
+            self.sessions.append(session)
+        session.send({'type': 'welcome', 'credits': self.credits})
+        print(f"🔌 Agent connected: {session.bay} ({mode}, {size[0]}x{size[1]})")
+
+        try:
+            while self.running:
+                header, payload = recv_message(sock)
+                if header.get('type') == 'frame':
+                    error = frame_error(header, len(payload), size)
+                    if error is None:
+                        try:
+                            session.apply_frame(header, payload)
+                        except (OSError, ValueError) as e:
+                            error = f"bad tile image ({e})"
+                    if error is not None:
+                        # A protocol error - tell the agent and drop the connection
+                        print(f"⚠️  {session.bay}: {error}")
+                        session.send({'type': 'error', 'error': error})
+                        break
+                    with self.work_ready:
+                        self.work_ready.notify()
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            session.closed = True
+            with self.sessions_lock:
+                self.sessions.remove(session)
+            print(f"🔌 Agent disconnected: {session.bay}")
+
+    def _collect_batch(self):
+        """Wait for dirty bays, then snapshot every idle dirty bay at once"""
+        with self.work_ready:
+            while self.running and not any(s.dirty and not s.busy for s in self.sessions):
+                self.work_ready.wait(0.5)
+        # Let frames from other agents arrive so they share this batch
+        time.sleep(self.batch_window)
+
+        batch = []
+        with self.sessions_lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            with session.lock:
+                if not session.dirty or session.busy:
+                    continue
+                snapshot = session.canvas.copy()
+                granted = session.unacked
+                session.dirty = False
+                session.busy = True
+                session.unacked = 0
+                session.stats['batches'] += 1
+            # Return credits now - later frames coalesce into the canvas
+            session.send({'type': 'credit', 'n': granted})
+            batch.append((session, snapshot))
+        return batch
+
+    def _finish(self, session, future, pool):
+        """OCR done: parse and generate commentary, then send it to the agent"""
+        retry = False
+        try:
+            try:
+                text = future.result()
+            except BrokenProcessPool:
+                self._restart_pool(pool)
+                retry = True
+                return
+            commentary = session.announcer.handle_ocr_text(text, speak=False)
+            if commentary:
+                session.stats['spoken'] += 1
+                session.send({'type': 'speech', 'text': commentary, 'seq': session.last_seq})
+                print(f"[{session.bay}] 🔊 {commentary}")
+        except Exception as e:
+            print(f"[{session.bay}] ❌ Analysis error: {e}")
+        finally:
+            self._release(session, retry)
+
+    def _restart_pool(self, broken):
+        """A worker died: rebuild the pool (once, however many jobs saw it break)"""
+        with self.pool_lock:
+            if self.ocr_pool is broken:
+                print("⚠️  OCR pool restarted")
+                shutdown_ocr_pool(wait=False)
+                self.ocr_pool = get_ocr_pool(self.ocr_workers)
+
+    def _release(self, session, retry=False):
+        """Mark a bay idle so its canvas can join the next batch (again, if retry)"""
+        with session.lock:
+            session.busy = False
+            if retry:
+                # Change detection already took this frame - OCR it without asking again
+                session.dirty = session.retry = True
+        with self.work_ready:
+            self.work_ready.notify()
+
+    def analysis_loop(self):
+        """Batch dirty canvases across agents and fan OCR out to the pool"""
+        while self.running:
+            batch = self._collect_batch()
+            for session, snapshot in batch:
+                retry, session.retry = session.retry, False
+                if not retry:
+                    changed, change_pct = session.announcer.detect_screen_change(snapshot)
+                    if not changed or not session.announcer.classify_scene(snapshot):
+                        self._release(session)
+                        continue
+                    print(f"[{session.bay}] 🎯 TRIGGER! Screen changed {change_pct:.1f}%")
+                pool = self.ocr_pool
+                try:
+                    future = pool.submit(ocr_image, snapshot)
+                except BrokenProcessPool:
+                    self._restart_pool(pool)
+                    self._release(session, retry=True)
+                    continue
+                future.add_done_callback(
+                    lambda f, s=session, p=pool: self.announce_pool.submit(self._finish, s, f, p)
+                )
+
+    def serve_forever(self):
+        """Run the accept loop and the analysis loop until Ctrl+C"""
+        threading.Thread(target=self.analysis_loop, name='analysis', daemon=True).start()
+        host, port = self.address
+        print("\n" + "="*60)
+        print("🖥️  GSPro ANALYSIS SERVER - ACTIVE")
+        print("="*60)
+        print(f"📡 Listening on {host}:{port}")
+        print(f"🎟️  Credits per agent: {self.credits}")
+        print("⌨️  Press Ctrl+C to stop")
+        print("="*60 + "\n")
+        try:
+            self.tcp.serve_forever()
+        except KeyboardInterrupt:
+            print("\n\n⛳ Stopping analysis server...")
+            self.print_stats()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop serving and release the worker pools"""
+        self.running = False
+        with self.work_ready:
+            self.work_ready.notify_all()
+        self.tcp.server_close()
+        self.announce_pool.shutdown(wait=False, cancel_futures=True)
+        shutdown_ocr_pool(wait=False)
+
+    def print_stats(self):
+        """Per-agent statistics"""
+        print("\n" + "="*60)
+        print("📊 ANALYSIS SERVER STATS")
+        print("="*60)
+        with self.sessions_lock:
+            sessions = list(self.sessions)
+        for s in sessions:
+            print(f"   {s.bay:<12} frames {s.stats['frames']:>6}  tiles {s.stats['tiles']:>7}  "
+                  f"{s.stats['bytes'] / 1e6:7.1f} MB  batches {s.stats['batches']:>5}  "
+                  f"spoken {s.stats['spoken']:>4}")
+        for line in model_router.get_router().report():
+            print(line)
+        print("="*60 + "\n")
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Headless GSPro analysis server for capture agents',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Port to listen on (default: 8765)')
+    parser.add_argument('--credits', type=int, default=2,
+                        help='Frames each agent may have in flight (default: 2)')
+    parser.add_argument('--batch-window', type=float, default=0.05,
+                        help='Seconds to wait for other agents before a batch (default: 0.05)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='OCR worker processes (default: cores - 1)')
+    parser.add_argument('--debug', action='store_true',
+                        help='Enable debug mode')
+    parser.add_argument('--api-key', type=str,
+                        help='Anthropic API key')
+    llm_transport.add_transport_arguments(parser)
+    model_router.add_router_arguments(parser)
+
+    args = parser.parse_args()
+    llm_transport.configure_from_args(args)
+    try:
+        model_router.configure_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Check for API key
+    if (llm_transport.requires_api_key() and
+            not args.api_key and not os.environ.get("ANTHROPIC_API_KEY")):
+        print("❌ Error: Anthropic API key required!")
+        print("\nSet it via:")
+        print("  export ANTHROPIC_API_KEY='your-key'")
+        print("\nGet your key at: https://console.anthropic.com/")
+        return
+
+    # The server never speaks - speech text goes back to the agents
+    warm_up(args.api_key, tts=False)
+
+    server = AnalysisServer(
+        host=args.host,
+        port=args.port,
+        credits=args.credits,
+        batch_window=args.batch_window,
+        ocr_workers=args.workers,
+        api_key=args.api_key,
+        debug=args.debug
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
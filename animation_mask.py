@@ -0,0 +1,105 @@
+"""
+Animation mask - learn which parts of the GSPro screen never stop moving
+Flags, water, grass and the idle camera sway change a few percent of the
+screen on every frame, so a plain pixel diff either triggers OCR constantly
+or needs a threshold high enough to miss real HUD updates.
+
+AnimationMask keeps an online estimate, per tile, of how often that tile
+changes between consecutive frames. Tiles that change on most frames are
+animated and left out of the change score, so only normally static pixels
+(HUD, scorecard, menus) count. Frames where most of the screen changes at
+once are camera moves or scene cuts, not ambient animation, and are not
+learned from.
+"""
+
+import numpy as np
+
+# Per-channel difference that counts as a changed pixel (same as the trigger)
+PIXEL_THRESHOLD = 20
+
+
+class AnimationMask:
+    """Per-tile change-rate model with change scoring over static tiles only
+
+    size is the (width, height) frames are compared at and must be a
+    multiple of tile. rate_alpha is the weight of each new frame in the
+    running change rate; a tile whose rate reaches animated_rate is masked.
+    """
+
+    def __init__(self, size=(400, 300), tile=10, rate_alpha=0.05, animated_rate=0.5,
+                 warmup_frames=20, cut_fraction=0.5, max_masked=0.6):
+        width, height = size
+        if width % tile or height % tile:
+            raise ValueError(f"size {size} must be a multiple of tile {tile}")
+        self.size = size
+        self.tile = tile
+        self.grid = (height // tile, width // tile)
+        self.rate_alpha = rate_alpha
+        self.animated_rate = animated_rate
+        self.warmup_frames = warmup_frames
+        self.cut_fraction = cut_fraction
+        self.max_masked = max_masked
+
+        self.rate = np.zeros(self.grid, dtype=np.float32)
+        self.frames = 0
+        self.skipped = 0
+        self.previous = None
+        self.reference = None
+
+    def prepare(self, image):
+        """Frame as a (height, width, 3) uint8 array at the comparison size"""
+        # Shrink first - converting a full 4K frame alone is a frame-sized copy
+        small = image.resize(self.size)
+        if small.mode != 'RGB':
+            small = small.convert('RGB')
+        return np.asarray(small)
+
+    def tile_counts(self, a, b):
+        """Changed channel values per tile between two prepared frames"""
+        diff = np.abs(a.astype(np.int16) - b.astype(np.int16)) > PIXEL_THRESHOLD
+        rows, cols = self.grid
+        return diff.reshape(rows, self.tile, cols, self.tile, 3).sum(axis=(1, 3, 4))
+
+    def observe(self, frame):
+        """Learn from the change between this frame and the previous one"""
+        previous, self.previous = self.previous, frame
+        if previous is None:
+            return
+        changed = self.tile_counts(previous, frame) > 0
+        if changed.mean() >= self.cut_fraction:
+            self.skipped += 1
+            return
+        self.rate += self.rate_alpha * (changed - self.rate)
+        self.frames += 1
+
+    def mask(self):
+        """Boolean grid of animated tiles (none until the model has warmed up)"""
+        if self.frames < self.warmup_frames:
+            return np.zeros(self.grid, dtype=bool)
+        animated = self.rate >= self.animated_rate
+        # Never mask so much that real changes have nowhere left to show
+        if animated.mean() > self.max_masked:
+            cutoff = np.quantile(self.rate, 1 - self.max_masked)
+            animated &= self.rate > cutoff
+        return animated
+
+    def score(self, frame, reference):
+        """Percent of static-tile channel values that differ from the reference"""
+        counts = self.tile_counts(reference, frame)
+        static = ~self.mask()
+        per_tile = self.tile * self.tile * 3
+        total = static.sum() * per_tile
+        if not total:
+            return 0.0
+        return float(counts[static].sum()) / total * 100
+
+    def masked_fraction(self):
+        """Share of the screen currently ignored as animated"""
+        return float(self.mask().mean())
+
+    def mask_image(self):
+        """Mask as a black/white PIL image at the comparison size (white = animated)"""
+        from PIL import Image
+
+        big = self.mask().repeat(self.tile, axis=0).repeat(self.tile, axis=1)
+        return Image.fromarray((big * 255).astype(np.uint8))
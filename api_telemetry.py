@@ -0,0 +1,202 @@
+"""
+API telemetry - real token, cost and latency accounting for commentary calls
+Every response carries a usage block; ApiTelemetry adds it up (input,
+output, cache write/read tokens), prices it per model and keeps a window of
+call latencies for p50/p95.
+
+TokenPolicy picks max_tokens for the next call. With a latency SLO set it
+shrinks the budget while p95 latency is over the SLO and grows it back once
+there is headroom, and when the next shot is due soon (at the recent pace of
+play) it only asks for what can be generated and spoken in time. Without an
+SLO every call gets the base budget.
+
+Replies cut off by max_tokens are trimmed back to their last full sentence
+so the voice never stops mid-word.
+"""
+
+import math
+import re
+import time
+from collections import deque
+
+from prompt_builder import DEFAULT_MAX_TOKENS, DEFAULT_MODEL
+
+# USD per million tokens: (input, output, cache write, cache read)
+PRICING = {
+    'opus': (15.00, 75.00, 18.75, 1.50),
+    'sonnet': (3.00, 15.00, 3.75, 0.30),
+    'haiku': (0.80, 4.00, 1.00, 0.08),
+}
+
+# Speaking rate used to turn "seconds until the next shot" into tokens
+SPOKEN_TOKENS_PER_SECOND = 3.5
+
+
+def price_for(model):
+    """Per-million-token prices for a model id (Sonnet pricing if unknown)"""
+    model = (model or DEFAULT_MODEL).lower()
+    for family, prices in PRICING.items():
+        if family in model:
+            return prices
+    return PRICING['sonnet']
+
+
+def usage_tokens(usage):
+    """(input, output, cache write, cache read) token counts from a usage block"""
+    if usage is None:
+        return 0, 0, 0, 0
+    return tuple(getattr(usage, field, 0) or 0 for field in
+                 ('input_tokens', 'output_tokens',
+                  'cache_creation_input_tokens', 'cache_read_input_tokens'))
+
+
+def cost_of(usage, model=None):
+    """USD cost of one response's usage block"""
+    prices = price_for(model)
+    return sum(tokens * price for tokens, price in zip(usage_tokens(usage), prices)) / 1e6
+
+
+def trim_to_sentence(text):
+    """Cut a truncated reply back to its last complete sentence (if it has one)"""
+    match = re.match(r'(.*[.!?]["\')\]]?)\s', text + ' ', re.DOTALL)
+    return match.group(1) if match else text
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sequence (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(pct / 100 * len(ordered)))) - 1
+    return ordered[rank]
+
+
+class ApiTelemetry:
+    """Token, cost and latency totals for one announcer's API calls"""
+
+    def __init__(self, window=50):
+        self.latencies = deque(maxlen=window)
+        self.totals = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0,
+                       'cache_write_tokens': 0, 'cache_read_tokens': 0,
+                       'truncated': 0, 'cost_usd': 0.0, 'latency_s': 0.0}
+
+    def record(self, message, latency, model=None):
+        """Account for one response and how long it took"""
+        usage = getattr(message, 'usage', None)
+        model = getattr(message, 'model', None) or model
+        input_tokens, output_tokens, cache_write, cache_read = usage_tokens(usage)
+        totals = self.totals
+        totals['calls'] += 1
+        totals['input_tokens'] += input_tokens
+        totals['output_tokens'] += output_tokens
+        totals['cache_write_tokens'] += cache_write
+        totals['cache_read_tokens'] += cache_read
+        totals['cost_usd'] += cost_of(usage, model)
+        totals['latency_s'] += latency
+        if getattr(message, 'stop_reason', None) == 'max_tokens':
+            totals['truncated'] += 1
+        self.latencies.append(latency)
+
+    def p50(self):
+        return percentile(self.latencies, 50)
+
+    def p95(self):
+        return percentile(self.latencies, 95)
+
+    def output_rate(self):
+        """Output tokens per second of call time (None before any call)"""
+        if not self.totals['latency_s']:
+            return None
+        return self.totals['output_tokens'] / self.totals['latency_s']
+
+    def publish(self, stats):
+        """Copy the totals into an announcer's stats dict"""
+        totals = self.totals
+        stats['input_tokens'] = totals['input_tokens']
+        stats['output_tokens'] = totals['output_tokens']
+        stats['cache_read_tokens'] = totals['cache_read_tokens']
+        stats['cost_usd'] = round(totals['cost_usd'], 6)
+        p95 = self.p95()
+        stats['latency_p95_s'] = round(p95, 3) if p95 is not None else None
+
+    def report(self):
+        """Human-readable lines for print_stats"""
+        totals = self.totals
+        if not totals['calls']:
+            return ["🤖 No API calls yet"]
+        lines = [
+            f"💰 Cost: ${totals['cost_usd']:.4f} "
+            f"(${totals['cost_usd'] / totals['calls']:.5f} per call)",
+            f"🔢 Tokens: {totals['input_tokens']} in / {totals['output_tokens']} out, "
+            f"cache {totals['cache_read_tokens']} read / {totals['cache_write_tokens']} written",
+            f"⏱️  Latency: p50 {self.p50():.2f}s  p95 {self.p95():.2f}s "
+            f"(last {len(self.latencies)} calls)",
+        ]
+        if totals['truncated']:
+            lines.append(f"✂️  {totals['truncated']} replies hit max_tokens and were trimmed")
+        return lines
+
+
+class TokenPolicy:
+    """Adaptive max_tokens from the latency SLO and the expected next shot"""
+
+    def __init__(self, base=DEFAULT_MAX_TOKENS, floor=40, slo_p95=None, step=0.8, cooldown=5,
+                 min_samples=5):
+        self.base = base
+        self.floor = min(floor, base)
+        self.slo_p95 = slo_p95
+        self.step = step
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.budget = base
+        self.shot_times = deque(maxlen=8)
+        self._calls_since_change = 0
+
+    def note_shot(self, when=None):
+        """Record when a shot happened (for predicting the next one)"""
+        self.shot_times.append(time.time() if when is None else when)
+
+    def shot_due_in(self, now=None):
+        """Seconds until the next shot at the recent pace
+
+        None if unknown, or if that shot is already overdue - play has paused
+        (a walk to the next tee, a break) and the pace says nothing about when
+        the next swing comes.
+        """
+        if len(self.shot_times) < 3:
+            return None
+        times = list(self.shot_times)
+        gaps = sorted(b - a for a, b in zip(times, times[1:]))
+        pace = gaps[len(gaps) // 2]
+        now = time.time() if now is None else now
+        due = times[-1] + pace - now
+        return due if due > 0 else None
+
+    def update(self, telemetry):
+        """Adjust the budget after a call, at most once per cooldown calls"""
+        self._calls_since_change += 1
+        if (self.slo_p95 is None or len(telemetry.latencies) < self.min_samples or
+                self._calls_since_change < self.cooldown):
+            return
+        p95 = telemetry.p95()
+        if p95 > self.slo_p95 and self.budget > self.floor:
+            self.budget = max(self.floor, int(self.budget * self.step))
+            self._calls_since_change = 0
+        elif p95 < self.slo_p95 * 0.7 and self.budget < self.base:
+            self.budget = min(self.base, int(self.budget / self.step) + 1)
+            self._calls_since_change = 0
+
+    def max_tokens(self, telemetry=None, now=None):
+        """Budget for the next call (always base unless an SLO is set)"""
+        if self.slo_p95 is None:
+            return self.base
+        budget = self.budget
+        due = self.shot_due_in(now)
+        if due is not None:
+            # Generate and speak before the next swing
+            overhead = (telemetry.p50() if telemetry and telemetry.p50() else 1.0)
+            rate = (telemetry.output_rate() if telemetry else None) or 50.0
+            seconds_per_token = 1 / rate + 1 / SPOKEN_TOKENS_PER_SECOND
+            budget = min(budget, int(max(0.0, due - overhead) / seconds_per_token))
+        # Whole tens, so replayed sessions see a handful of distinct requests
+        return max(self.floor, budget // 10 * 10)
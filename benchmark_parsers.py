@@ -0,0 +1,230 @@
+"""
+Parser benchmark - speed and accuracy of the OCR text parsers
+Runs every parser over a corpus of saved OCR dumps (clean and noisy, with
+the values the screen actually showed) and reports throughput and accuracy.
+Exits non-zero if any parser gets less accurate than the stored baseline,
+or slower by more than the tolerance. No Tesseract, API key or network
+needed.
+
+    python benchmark_parsers.py
+    python benchmark_parsers.py --verbose            (show every miss)
+    python benchmark_parsers.py --update-baseline    (after an intended change)
+
+Corpus lines are JSON: {"id", "kind": "clean"|"noisy", "text", "expected"}
+where expected holds distance, wind, hole, par and lie (null = not on
+screen). Add real dumps from --debug runs the same way. Throughput depends
+on the machine, so refresh the baseline on the machine that runs the check.
+"""
+
+import copy
+import io
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(HERE, 'benchmarks', 'ocr_corpus.jsonl')
+DEFAULT_BASELINE = os.path.join(HERE, 'benchmarks', 'parser_baseline.json')
+
+FIELDS = ('distance', 'wind', 'hole', 'par', 'lie')
+
+# game_state keys the stateful parsers store each field in
+STATE_KEYS = {'distance': 'current_distance', 'wind': 'wind_speed',
+              'hole': 'current_hole', 'par': 'current_par'}
+
+
+def load_corpus(path):
+    """Corpus entries in file order"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _quietly(factory):
+    """Build an announcer without its startup banner"""
+    with redirect_stdout(io.StringIO()):
+        return factory()
+
+
+def _stateful(announcer):
+    """parse(text) -> field values for a parse_game_state on a fresh round"""
+    initial = copy.deepcopy(announcer.game_state)
+
+    def parse(text):
+        announcer.game_state = copy.deepcopy(initial)
+        announcer.parse_game_state(text)
+        return {field: announcer.game_state[key] for field, key in STATE_KEYS.items()}
+
+    return parse
+
+
+def build_parsers():
+    """name -> (fields scored, parse(text) -> {field: value}, run(text) to time)"""
+    import llm_transport
+    from gspro_ai_announcer import GSProAIAnnouncer
+    from gspro_ai_trigger import TriggerBasedAnnouncer
+    from gspro_voice_caddy import GSProVoiceCaddy
+
+    # The announcers build an LLM client - replay keeps that offline
+    llm_transport.configure(mode='replay')
+
+    caddy = _quietly(GSProVoiceCaddy)
+    trigger = _quietly(TriggerBasedAnnouncer)
+    announcer = _quietly(GSProAIAnnouncer)
+
+    parsers = {}
+    for field in FIELDS:
+        method = getattr(caddy, f'parse_{field}')
+        parsers[f'caddy.parse_{field}'] = (
+            (field,), lambda text, m=method, f=field: {f: m(text)}, method
+        )
+    parsers['trigger.extract_observations'] = (
+        tuple(STATE_KEYS), trigger.extract_observations, trigger.extract_observations
+    )
+    # Timed as a stream (state carries over), scored per entry on a fresh round
+    parsers['trigger.parse_game_state'] = (
+        tuple(STATE_KEYS), _stateful(trigger), trigger.parse_game_state
+    )
+    parsers['announcer.parse_game_state'] = (
+        tuple(STATE_KEYS), _stateful(announcer), announcer.parse_game_state
+    )
+    return parsers
+
+
+def score(parse, fields, corpus):
+    """Accuracy overall and per kind, plus the misses"""
+    right = {}
+    total = {}
+    misses = []
+    for entry in corpus:
+        got = parse(entry['text'])
+        for field in fields:
+            want = entry['expected'].get(field)
+            value = got.get(field)
+            ok = (None if value is None else str(value)) == want
+            for kind in ('all', entry['kind']):
+                total[kind] = total.get(kind, 0) + 1
+                right[kind] = right.get(kind, 0) + ok
+            if not ok:
+                misses.append((entry['id'], field, want, value))
+    accuracy = {kind: right[kind] / total[kind] for kind in total}
+    return accuracy, misses
+
+
+def throughput(run, texts, repeat=7, min_time=0.1):
+    """Best-of-repeat texts per second"""
+    reps = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(reps):
+            for text in texts:
+                run(text)
+        if time.perf_counter() - start >= min_time:
+            break
+        reps *= 2
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(reps):
+            for text in texts:
+                run(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return reps * len(texts) / best
+
+
+def check(results, baseline, tolerance):
+    """Regressions against the baseline as (name, reason) pairs"""
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['accuracy'] < base['accuracy'] - 1e-9:
+            failures.append((name, f"accuracy {result['accuracy']:.1%} < "
+                                   f"baseline {base['accuracy']:.1%}"))
+        if result['per_sec'] < base['per_sec'] * (1 - tolerance):
+            failures.append((name, f"{result['per_sec']:,.0f}/s is more than "
+                                   f"{tolerance:.0%} below baseline {base['per_sec']:,.0f}/s"))
+    return failures
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark and regression-check the OCR text parsers',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--corpus', type=str, default=DEFAULT_CORPUS,
+                        help='OCR corpus (JSON lines)')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE,
+                        help='Stored baseline to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed throughput drop as a fraction (default: 0.5)')
+    parser.add_argument('--only', type=str, metavar='TEXT',
+                        help='Only run parsers whose name contains TEXT')
+    parser.add_argument('--verbose', action='store_true',
+                        help='List every entry a parser got wrong')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Write these results as the new baseline')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    texts = [entry['text'] for entry in corpus]
+    parsers = build_parsers()
+    if args.only:
+        parsers = {name: p for name, p in parsers.items() if args.only in name}
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+
+    print("\n" + "="*78)
+    print(f"🧪 PARSER BENCHMARK ({len(corpus)} OCR dumps)")
+    print("="*78)
+    print(f"{'Parser':<30} {'Accuracy':>9} {'Clean':>7} {'Noisy':>7} "
+          f"{'Texts/s':>11} {'µs/text':>8}")
+    print("-"*78)
+
+    results = {}
+    for name, (fields, parse, run) in parsers.items():
+        accuracy, misses = score(parse, fields, corpus)
+        per_sec = throughput(run, texts)
+        results[name] = {'accuracy': round(accuracy['all'], 4), 'per_sec': round(per_sec)}
+        print(f"{name:<30} {accuracy['all']:>9.1%} {accuracy.get('clean', 0):>7.1%} "
+              f"{accuracy.get('noisy', 0):>7.1%} {per_sec:>11,.0f} {1e6 / per_sec:>8.1f}")
+        if args.verbose:
+            for entry_id, field, want, got in misses:
+                print(f"     ✗ {entry_id:<10} {field:<8} expected {want!r:<10} got {got!r}")
+
+    print("="*78)
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"📝 Baseline written to {args.baseline}\n")
+        return 0
+
+    if not baseline:
+        print("⚠️  No baseline yet - run with --update-baseline to store one\n")
+        return 0
+
+    failures = check(results, baseline, args.tolerance)
+    for name, reason in failures:
+        print(f"❌ {name}: {reason}")
+    if not failures:
+        print(f"✅ No regressions against {os.path.basename(args.baseline)}")
+    print()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
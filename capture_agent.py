@@ -0,0 +1,232 @@
+"""
+Capture agent - the thin half of the split announcer that runs on a bay PC
+Grabs the screen (or an ROI), sends only changed tiles to the analysis
+server as PNG, and speaks whatever commentary comes back
+
+No OCR, NumPy or LLM work happens here, so GSPro keeps the CPU.
+
+Examples:
+  python capture_agent.py --server 127.0.0.1:8765 --bay bay1 --mode hype
+  python capture_agent.py --server 10.0.0.5:8765 --bay bay2 --bbox 0,0,1920,1080 --no-speech
+"""
+
+import io
+import socket
+import threading
+import time
+import zlib
+
+from analysis_protocol import recv_message, send_message
+
+# Captures are first compared at 1/PREVIEW_SCALE size (a box average, so a
+# changed glyph still moves it); tiles are only hashed when that differs
+PREVIEW_SCALE = 4
+
+
+class CaptureAgent:
+    """Streams changed screen tiles to the analysis server under credit flow control"""
+
+    def __init__(self, server=('127.0.0.1', 8765), bay='bay1', mode='normal',
+                 bbox=None, interval=0.2, tile_size=128, speak=True, source=None):
+        self.server = server
+        self.bay = bay
+        self.mode = mode
+        self.bbox = bbox
+        self.interval = interval
+        self.tile_size = tile_size
+        self.speak_enabled = speak
+        self.source = source or self._grab_screen
+        self.sock = None
+        self.credits = 0
+        self.credit_ready = threading.Condition()
+        self.tile_crcs = {}
+        self.preview = None
+        self.dirty = set()
+        self.seq = 0
+        self.running = True
+        self.stats = {'captures': 0, 'unchanged': 0, 'frames_sent': 0, 'tiles_sent': 0,
+                      'bytes_sent': 0, 'coalesced': 0}
+
+    def _grab_screen(self):
+        from PIL import ImageGrab
+        return ImageGrab.grab(bbox=self.bbox)
+
+    def speak(self, text):
+        """Speak commentary from the server"""
+        print(f"🔊 {text}")
+        if not self.speak_enabled:
+            return
+        from speech_service import get_speech_service
+        get_speech_service().say(text)
+
+    def connect(self, size):
+        """Open the connection and register this bay"""
+        self.sock = socket.create_connection(self.server)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        send_message(self.sock, {'type': 'hello', 'bay': self.bay, 'mode': self.mode,
+                                 'width': size[0], 'height': size[1]})
+        header, _ = recv_message(self.sock)
+        if header.get('type') == 'error':
+            raise ConnectionError(f"Server refused this agent: {header.get('error')}")
+        self.credits = header.get('credits', 1)
+        threading.Thread(target=self._reader, name='agent-reader', daemon=True).start()
+
+    def _reader(self):
+        """Handle credit grants and speech from the server"""
+        try:
+            while self.running:
+                header, _ = recv_message(self.sock)
+                kind = header.get('type')
+                if kind == 'credit':
+                    with self.credit_ready:
+                        self.credits += header.get('n', 1)
+                        self.credit_ready.notify()
+                elif kind == 'speech':
+                    # Queued on the speech thread, so credits keep flowing
+                    self.speak(header['text'])
+                elif kind == 'error':
+                    print(f"⚠️  Server closed the connection: {header.get('error')}")
+        except (ConnectionError, OSError, ValueError):
+            self.running = False
+            with self.credit_ready:
+                self.credit_ready.notify()
+
+    def changed_tiles(self, image):
+        """Mark tiles whose pixels changed since the last capture as dirty"""
+        # An unchanged downscaled frame is ~3x cheaper to rule out than every tile
+        preview = image.reduce(PREVIEW_SCALE).tobytes()
+        if preview == self.preview:
+            self.stats['unchanged'] += 1
+            return
+        self.preview = preview
+
+        width, height = image.size
+        size = self.tile_size
+        for y in range(0, height, size):
+            for x in range(0, width, size):
+                box = (x, y, min(x + size, width), min(y + size, height))
+                crc = zlib.crc32(image.crop(box).tobytes())
+                if self.tile_crcs.get(box) != crc:
+                    self.tile_crcs[box] = crc
+                    self.dirty.add(box)
+
+    def send_dirty(self, image):
+        """Send every dirty tile (current pixels) as one frame"""
+        tiles = []
+        payload = io.BytesIO()
+        for box in sorted(self.dirty):
+            start = payload.tell()
+            image.crop(box).save(payload, format='PNG', compress_level=1)
+            x, y, x2, y2 = box
+            tiles.append([x, y, x2 - x, y2 - y, payload.tell() - start])
+
+        self.seq += 1
+        data = payload.getvalue()
+        send_message(self.sock, {'type': 'frame', 'seq': self.seq, 'tiles': tiles}, data)
+        self.dirty.clear()
+        self.stats['frames_sent'] += 1
+        self.stats['tiles_sent'] += len(tiles)
+        self.stats['bytes_sent'] += len(data)
+
+    def step(self):
+        """Capture once; send if there's credit, otherwise coalesce dirty tiles"""
+        image = self.source()
+        if image is None:
+            return
+        image = image.convert('RGB')
+        self.stats['captures'] += 1
+        self.changed_tiles(image)
+        if not self.dirty:
+            return
+
+        with self.credit_ready:
+            if self.credits <= 0:
+                # Server is busy - keep the dirty set and send current pixels later
+                self.stats['coalesced'] += 1
+                return
+            self.credits -= 1
+        self.send_dirty(image)
+
+    def run(self):
+        """Main loop"""
+        first = self.source().convert('RGB')
+        self.connect(first.size)
+
+        print("\n" + "="*60)
+        print("📡 GSPro CAPTURE AGENT - ACTIVE")
+        print("="*60)
+        print(f"🏌️  Bay: {self.bay} ({self.mode})")
+        print(f"🖥️  Server: {self.server[0]}:{self.server[1]}")
+        print(f"📸 Capturing {first.size[0]}x{first.size[1]} every {self.interval}s")
+        print("⌨️  Press Ctrl+C to stop")
+        print("="*60 + "\n")
+
+        try:
+            while self.running:
+                start = time.monotonic()
+                self.step()
+                time.sleep(max(0.0, self.interval - (time.monotonic() - start)))
+            print("\n⚠️  Server connection lost")
+        except KeyboardInterrupt:
+            print("\n\n⛳ Stopping capture agent...")
+        finally:
+            self.running = False
+            self.sock.close()
+            self.print_stats()
+
+    def print_stats(self):
+        """Bandwidth and backpressure statistics"""
+        print("\n" + "="*60)
+        print("📊 CAPTURE AGENT STATS")
+        print("="*60)
+        print(f"📸 Captures: {self.stats['captures']} "
+              f"({self.stats['unchanged']} unchanged, no tiles hashed)")
+        print(f"📤 Frames sent: {self.stats['frames_sent']} "
+              f"({self.stats['tiles_sent']} tiles, {self.stats['bytes_sent'] / 1e6:.1f} MB)")
+        print(f"⏸️  Captures coalesced while server busy: {self.stats['coalesced']}")
+        print("="*60 + "\n")
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Thin GSPro capture agent for the analysis server',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--server', type=str, default='127.0.0.1:8765',
+                        help='Analysis server HOST:PORT (default: 127.0.0.1:8765)')
+    parser.add_argument('--bay', type=str, default=socket.gethostname(),
+                        help='Bay name (default: this host name)')
+    parser.add_argument('--mode', type=str, default='normal',
+                        help='Announcer personality mode for this bay')
+    parser.add_argument('--bbox', type=str, default=None,
+                        help='Capture region x1,y1,x2,y2 (default: full screen)')
+    parser.add_argument('--interval', type=float, default=0.2,
+                        help='Seconds between captures (default: 0.2)')
+    parser.add_argument('--tile', type=int, default=128,
+                        help='Tile size in pixels for change detection (default: 128)')
+    parser.add_argument('--no-speech', action='store_true',
+                        help='Print commentary instead of speaking it')
+
+    args = parser.parse_args()
+
+    host, _, port = args.server.rpartition(':')
+    bbox = tuple(int(v) for v in args.bbox.split(',')) if args.bbox else None
+
+    agent = CaptureAgent(
+        server=(host or '127.0.0.1', int(port)),
+        bay=args.bay,
+        mode=args.mode,
+        bbox=bbox,
+        interval=args.interval,
+        tile_size=args.tile,
+        speak=not args.no_speech
+    )
+    agent.run()
+
+
+if __name__ == "__main__":
+    main()
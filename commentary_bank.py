@@ -0,0 +1,322 @@
+"""
+Commentary bank - pre-generated lines per personality, by situation bucket
+Most announcements are the same few situations with different numbers: a
+new par 4 of 300-400 yards, 100-150 yards out on the second shot, a strong
+wind. The builder asks each personality for several variants of every
+bucket up front, with placeholders where the numbers go. At runtime the
+announcer maps the situation to its bucket (one dict lookup), fills in the
+exact numbers and only calls the API for situations the bank doesn't cover
+(launch monitor shot data, odd pars, unknown distances, edited personalities).
+
+Buckets are event x par x distance band x shot number x wind band:
+    hole|4|300|0|10     new par 4, 300-400 yards, breezy (10-19 mph)
+    distance|5|100|2|0  100-150 yards out, second shot on a par 5, calm
+    wind|*|*|*|20       strong wind (the other fields don't matter)
+
+The file keeps each distinct line once ("texts") and an index per
+personality prompt of bucket -> line numbers:
+
+    python commentary_bank.py --out commentary_bank.json --variants 4
+    python commentary_bank.py --only normal,hype --workers 8
+    python gspro_ai_trigger.py --bank commentary_bank.json
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+BANK_VERSION = 1
+DEFAULT_PATH = 'commentary_bank.json'
+
+# Lower edges in yards; a distance belongs to the last edge at or below it
+DISTANCE_BANDS = (0, 10, 30, 60, 100, 150, 200, 250, 300, 400, 500, 650)
+MAX_DISTANCE = 800
+
+# Lower edges in mph: calm, breezy, strong
+WIND_BANDS = (0, 10, 20)
+WIND_NAMES = ('calm', 'breezy', 'strong')
+
+PARS = (3, 4, 5)
+
+# Plausible tee distances per par (yards)
+TEE_RANGE = {3: (60, 300), 4: (250, 500), 5: (400, MAX_DISTANCE)}
+
+PLACEHOLDERS = ('hole', 'par', 'distance', 'shot', 'wind')
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+BUILD_INSTRUCTIONS = (
+    "Write {variants} different lines of commentary for this situation, one per line, "
+    "no numbering. Write the placeholders {{hole}}, {{par}}, {{distance}}, {{shot}} and "
+    "{{wind}} exactly as shown wherever their numbers belong, and never write any other "
+    "number."
+)
+
+
+def band(value, edges):
+    """Lower edge of the band value falls in"""
+    found = edges[0]
+    for edge in edges:
+        if value >= edge:
+            found = edge
+    return found
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def prompt_id(prompt):
+    """Short stable id of a personality prompt"""
+    return hashlib.sha1(prompt.encode()).hexdigest()[:12]
+
+
+def bucket_key(kind, par=None, distance=None, shot=0, wind=None):
+    """Bucket for a situation, or None if the bank doesn't cover it"""
+    wind = _int(wind) or 0
+    wind_band = band(wind, WIND_BANDS)
+    if kind == 'wind':
+        return f"wind|*|*|*|{wind_band}" if wind >= WIND_BANDS[1] else None
+
+    par, distance = _int(par), _int(distance)
+    if par not in PARS or distance is None or not 0 <= distance < MAX_DISTANCE:
+        return None
+    distance_band = band(distance, DISTANCE_BANDS)
+    if kind == 'hole':
+        return f"hole|{par}|{distance_band}|0|{wind_band}"
+    if kind == 'distance':
+        return f"distance|{par}|{distance_band}|{min(_int(shot) or 0, 3)}|{wind_band}"
+    return None
+
+
+def _wind_range(wind_band):
+    """e.g. 'breezy, 10-19 mph'"""
+    i = WIND_BANDS.index(wind_band)
+    if i + 1 == len(WIND_BANDS):
+        return f"{WIND_NAMES[i]}, {wind_band}+ mph"
+    return f"{WIND_NAMES[i]}, {wind_band}-{WIND_BANDS[i + 1] - 1} mph"
+
+
+def all_buckets():
+    """Every bucket the builder generates, with a situation for the prompt"""
+    buckets = {}
+    for wind_band in WIND_BANDS[1:]:
+        buckets[f"wind|*|*|*|{wind_band}"] = (
+            f"Golf situation: Wind: {{wind}} mph ({_wind_range(wind_band)})"
+        )
+    for par in PARS:
+        low, high = TEE_RANGE[par]
+        for i, distance_band in enumerate(DISTANCE_BANDS):
+            top = DISTANCE_BANDS[i + 1] if i + 1 < len(DISTANCE_BANDS) else MAX_DISTANCE
+            for wind_band in WIND_BANDS:
+                wind = f"Wind: {{wind}} mph ({_wind_range(wind_band)})"
+                if distance_band < high and top > low:
+                    buckets[f"hole|{par}|{distance_band}|0|{wind_band}"] = (
+                        f"Golf situation: New hole #{{hole}}, par {{par}}, {{distance}} yards "
+                        f"(between {distance_band} and {top}). {wind}"
+                    )
+                if distance_band >= high:
+                    continue
+                for shot in range(4):
+                    progress = ("on the tee" if shot == 0 else
+                                "shot #{shot} on this hole" + (" or later" if shot == 3 else ""))
+                    buckets[f"distance|{par}|{distance_band}|{shot}|{wind_band}"] = (
+                        f"Golf situation: Current distance: {{distance}} yards "
+                        f"(between {distance_band} and {top}, {progress}) on a par {{par}}. {wind}"
+                    )
+    return buckets
+
+
+def parse_variants(text):
+    """Usable template lines from a build reply"""
+    variants = []
+    for line in (text or '').splitlines():
+        line = re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line).strip().strip('"').strip()
+        if not line:
+            continue
+        names = _PLACEHOLDER.findall(line)
+        if any(name not in PLACEHOLDERS for name in names):
+            continue
+        # A number the model made up would be wrong for most of the bucket
+        if re.search(r'\d', _PLACEHOLDER.sub('', line)):
+            continue
+        if line not in variants:
+            variants.append(line)
+    return variants
+
+
+def fill(template, values):
+    """Put the live numbers into a template"""
+    return _PLACEHOLDER.sub(lambda m: str(values.get(m.group(1), m.group(0))), template)
+
+
+class CommentaryBank:
+    """Loaded bank: bucket lookup and variant rotation for live announcers"""
+
+    def __init__(self, texts, index, names=None):
+        self.texts = texts
+        self.index = index
+        self.names = names or {}
+        self._turns = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != BANK_VERSION:
+            raise ValueError(f"{path}: unsupported bank version {data.get('version')}")
+        return cls(data['texts'], data['index'], data.get('names'))
+
+    def covers(self, prompt):
+        """True if the bank was built for this exact personality prompt"""
+        return prompt_id(prompt) in self.index
+
+    def lookup(self, prompt, kind, game_state):
+        """A filled-in line for the situation, or None to use the live LLM"""
+        gs = game_state
+        if kind == 'shot':
+            if gs.get('last_shot'):
+                return None  # Launch monitor numbers deserve a real reply
+            kind = 'distance'
+        key = bucket_key(kind, gs.get('current_par'), gs.get('current_distance'),
+                         gs.get('shots_on_hole'), gs.get('wind_speed'))
+        pid = prompt_id(prompt)
+        variants = self.index.get(pid, {}).get(key) if key else None
+        if not variants:
+            return None
+
+        # Rotate through the variants, from a random start per bucket
+        turn_key = (pid, key)
+        with self._lock:
+            turn = self._turns.get(turn_key)
+            if turn is None:
+                turn = random.randrange(len(variants))
+            self._turns[turn_key] = turn + 1
+        template = self.texts[variants[turn % len(variants)]]
+        values = {
+            'hole': gs.get('current_hole'),
+            'par': gs.get('current_par'),
+            'distance': gs.get('current_distance'),
+            'shot': gs.get('shots_on_hole'),
+            'wind': gs.get('wind_speed'),
+        }
+        # A number that hasn't been read yet would be spoken as "None"
+        if any(values.get(name) in (None, '') for name in _PLACEHOLDER.findall(template)):
+            return None
+        return fill(template, values)
+
+    def __len__(self):
+        return sum(len(buckets) for buckets in self.index.values())
+
+
+def build_bank(client, personalities, variants=4, max_workers=4, buckets=None, **kwargs):
+    """Generate the bank data for {mode: prompt}; returns (data, results)"""
+    from commentary_matrix import run_matrix
+    from prompt_builder import DEFAULT_MAX_TOKENS
+
+    buckets = buckets or all_buckets()
+    scenarios = [{'name': key, 'context': situation} for key, situation in buckets.items()]
+    instructions = BUILD_INSTRUCTIONS.format(variants=variants)
+    kwargs.setdefault('max_tokens', DEFAULT_MAX_TOKENS * variants)
+    results, _ = run_matrix(client, personalities, scenarios,
+                            lambda context: f"{context}\n\n{instructions}",
+                            max_workers=max_workers, **kwargs)
+
+    texts = []
+    text_ids = {}
+    index = {prompt_id(prompt): {} for prompt in personalities.values()}
+    names = {prompt_id(prompt): mode for mode, prompt in personalities.items()}
+    for result in results:
+        lines = parse_variants(result['text'])[:variants]
+        if not lines:
+            continue
+        ids = []
+        for line in lines:
+            if line not in text_ids:
+                text_ids[line] = len(texts)
+                texts.append(line)
+            ids.append(text_ids[line])
+        index[prompt_id(personalities[result['personality']])][result['scenario']] = ids
+
+    data = {'version': BANK_VERSION, 'built': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'names': names, 'texts': texts, 'index': index}
+    return data, results
+
+
+def main():
+    """Entry point"""
+    import argparse
+    import llm_transport
+    from personality_registry import get_registry
+    from prompt_builder import DEFAULT_MODEL
+    from shared_resources import get_client
+
+    parser = argparse.ArgumentParser(
+        description='Pre-generate commentary per personality and situation bucket',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--out', type=str, default=DEFAULT_PATH,
+                        help=f'Bank file to write (default: {DEFAULT_PATH})')
+    parser.add_argument('--variants', type=int, default=4,
+                        help='Lines per bucket and personality (default: 4)')
+    parser.add_argument('--only', type=str, metavar='MODES',
+                        help='Comma-separated personalities (default: all)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent API calls (default: 4)')
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL,
+                        help=f'Model to generate with (default: {DEFAULT_MODEL})')
+    parser.add_argument('--api-key', type=str,
+                        help='Anthropic API key')
+    llm_transport.add_transport_arguments(parser)
+
+    args = parser.parse_args()
+    llm_transport.configure_from_args(args)
+
+    if (llm_transport.requires_api_key() and
+            not args.api_key and not os.environ.get("ANTHROPIC_API_KEY")):
+        print("❌ Error: Anthropic API key required!")
+        print("\nSet it via:")
+        print("  export ANTHROPIC_API_KEY='your-key'")
+        print("\nGet your key at: https://console.anthropic.com/")
+        return 1
+
+    personalities = {mode: p['prompt'] for mode, p in get_registry().all().items()}
+    if args.only:
+        wanted = [mode.strip() for mode in args.only.split(',') if mode.strip()]
+        unknown = [mode for mode in wanted if mode not in personalities]
+        if unknown:
+            parser.error(f"unknown personalities: {', '.join(unknown)}")
+        personalities = {mode: personalities[mode] for mode in wanted}
+
+    buckets = all_buckets()
+    print("\n" + "="*60)
+    print(f"📚 BUILDING COMMENTARY BANK - {len(personalities)} personalities x "
+          f"{len(buckets)} buckets x {args.variants} variants")
+    print("="*60)
+
+    start = time.perf_counter()
+    data, results = build_bank(get_client(args.api_key), personalities, args.variants,
+                               args.workers, buckets, model=args.model)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+    errors = sum(1 for r in results if r['error'])
+    for pid, mode in data['names'].items():
+        print(f"   {mode:<14} {len(data['index'][pid]):>4} / {len(buckets)} buckets")
+    print(f"\n📝 {len(data['texts'])} lines written to {args.out} "
+          f"({os.path.getsize(args.out) / 1024:.0f} KiB) in {time.perf_counter() - start:.0f}s"
+          f"{f', {errors} failed calls' if errors else ''}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
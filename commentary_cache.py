@@ -0,0 +1,66 @@
+"""
+Commentary cache shared between announcers
+Identical situations for the same personality within a short window reuse
+the last generated line instead of making another API call
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class CommentaryCache:
+    """Thread-safe LRU cache of commentary keyed by (system prompt, context)"""
+
+    def __init__(self, max_entries=512, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(system, context):
+        """Cache key for a prompt pair"""
+        blob = f"{system}\x00{context}"
+        return hashlib.sha1(blob.encode()).hexdigest()
+
+    def get(self, system, context):
+        """Return a fresh cached line, or None"""
+        key = self.key(system, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+
+    def put(self, system, context, text):
+        """Store a generated line, evicting the least recently used"""
+        key = self.key(system, context)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_commentary_cache():
+    """Return the process-wide commentary cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CommentaryCache()
+    return _cache
@@ -0,0 +1,143 @@
+"""
+Commentary matrix - concurrent fan-out over personalities x scenarios
+Used by the demo and the personality tester to check new personalities quickly
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prompt_builder import DEFAULT_MAX_TOKENS, DEFAULT_MODEL, STYLE_RULES, system_blocks
+
+
+def _retry_delay(error, attempt, base_delay):
+    """Work out how long to back off after a rate-limit error"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+    # Exponential backoff with jitter so workers don't retry in lockstep
+    return base_delay * (2 ** attempt) * (0.5 + random.random())
+
+
+def _is_rate_limited(error):
+    """True for errors worth retrying: 429 rate limit and 529 overloaded"""
+    return getattr(error, 'status_code', None) in (429, 529)
+
+
+def generate_cell(client, personality, scenario, prompt, model=DEFAULT_MODEL,
+                  max_tokens=DEFAULT_MAX_TOKENS, temperature=0.8, max_retries=4, base_delay=1.0):
+    """Generate one matrix cell, retrying on rate limits"""
+    cell = {
+        'personality': personality,
+        'scenario': scenario,
+        'text': None,
+        'error': None,
+        'latency': None,
+        'input_tokens': 0,
+        'output_tokens': 0,
+        'cache_read_tokens': 0,
+        'retries': 0,
+    }
+
+    # Rate-limit retries are handled here so the backoff honours retry-after
+    client = client.with_options(max_retries=0)
+
+    for attempt in range(max_retries + 1):
+        start = time.perf_counter()
+        try:
+            message = client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=prompt['system'],
+                messages=[{"role": "user", "content": prompt['user']}]
+            )
+        except Exception as e:
+            if _is_rate_limited(e) and attempt < max_retries:
+                cell['retries'] += 1
+                time.sleep(_retry_delay(e, attempt, base_delay))
+                continue
+            cell['error'] = str(e)
+            return cell
+
+        cell['latency'] = time.perf_counter() - start
+        cell['text'] = message.content[0].text.strip()
+        usage = getattr(message, 'usage', None)
+        if usage is not None:
+            cell['input_tokens'] = usage.input_tokens
+            cell['output_tokens'] = usage.output_tokens
+            cell['cache_read_tokens'] = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        return cell
+
+    return cell
+
+
+def run_matrix(client, personalities, scenarios, build_prompt, max_workers=4,
+               style_rules=STYLE_RULES, **kwargs):
+    """Generate commentary for every personality x scenario pair concurrently
+
+    personalities maps name -> system prompt, scenarios is a list of
+    {'name', 'context'} dicts and build_prompt(context) returns the user
+    message. style_rules is appended to each (cached) system prompt.
+    Results come back in personality-major, scenario-minor order.
+    """
+    jobs = []
+    for personality, system_prompt in personalities.items():
+        # One cached system block per personality, shared by all its scenarios
+        system = system_blocks(system_prompt, style_rules)
+        for scenario in scenarios:
+            prompt = {
+                'system': system,
+                'user': build_prompt(scenario['context']),
+            }
+            jobs.append((personality, scenario['name'], prompt))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [
+            pool.submit(generate_cell, client, personality, scenario, prompt, **kwargs)
+            for personality, scenario, prompt in jobs
+        ]
+        results = [future.result() for future in futures]
+    wall_time = time.perf_counter() - start
+
+    return results, wall_time
+
+
+def print_matrix_table(results, wall_time=None):
+    """Print per-cell latency and token usage as a table"""
+    name_width = max([len('Personality')] + [len(r['personality']) for r in results])
+    scenario_width = max([len('Scenario')] + [len(r['scenario']) for r in results])
+
+    header = (f"{'Personality':<{name_width}}  {'Scenario':<{scenario_width}}  "
+              f"{'Latency':>8}  {'In':>6}  {'Out':>5}  {'Retry':>5}")
+    print(header)
+    print("-" * len(header))
+
+    total_in = total_out = 0
+    latencies = []
+    for r in results:
+        latency = f"{r['latency']:.2f}s" if r['latency'] is not None else "ERROR"
+        print(f"{r['personality']:<{name_width}}  {r['scenario']:<{scenario_width}}  "
+              f"{latency:>8}  {r['input_tokens']:>6}  {r['output_tokens']:>5}  {r['retries']:>5}")
+        total_in += r['input_tokens']
+        total_out += r['output_tokens']
+        if r['latency'] is not None:
+            latencies.append(r['latency'])
+
+    print("-" * len(header))
+    errors = sum(1 for r in results if r['error'])
+    cached = sum(r.get('cache_read_tokens', 0) for r in results)
+    print(f"Cells: {len(results)}  Errors: {errors}  "
+          f"Tokens in/out: {total_in}/{total_out}  Cache reads: {cached}")
+    if latencies:
+        print(f"Latency avg: {sum(latencies) / len(latencies):.2f}s  "
+              f"max: {max(latencies):.2f}s  "
+              f"sequential total: {sum(latencies):.1f}s")
+    if wall_time is not None:
+        print(f"Wall time: {wall_time:.1f}s")
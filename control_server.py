@@ -0,0 +1,295 @@
+"""
+Control server - live stats and runtime tuning for a running announcer
+A small JSON-over-HTTP endpoint on localhost, so interval, threshold,
+capture region, personality and budgets can be changed in the middle of a
+round without restarting, and stats are visible without Ctrl+C.
+
+    GET  /stats     announcer stats, API latency/cost, stage timings
+    GET  /config    current settings
+    POST /config    change settings, e.g. {"interval": 0.5, "threshold": 3}
+
+A POST is validated as a whole (400 and nothing applied if any value is
+bad), then staged. The capture loop applies staged settings together
+between frames, and the request returns once they are live (202 if the
+loop didn't get there within a few seconds).
+
+    python gspro_ai_trigger.py --control 8780
+    curl localhost:8780/stats
+    curl -d '{"roi": [0, 0, 1920, 1080], "personality": "hype"}' localhost:8780/config
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from api_telemetry import percentile
+
+DEFAULT_PORT = 8780
+
+# Seconds a POST waits for the capture loop to apply it
+APPLY_TIMEOUT = 5.0
+
+
+class StageTimings:
+    """Recent durations of each capture-loop stage"""
+
+    def __init__(self, window=100):
+        self.window = window
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        samples = self.stages.get(name)
+        if samples is None:
+            samples = self.stages[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def report(self):
+        """{stage: {count, last_ms, p50_ms, p95_ms}} over the window"""
+        report = {}
+        for name, samples in list(self.stages.items()):
+            values = list(samples)
+            if not values:
+                continue
+            report[name] = {'count': len(values),
+                            'last_ms': round(values[-1] * 1000, 2),
+                            'p50_ms': round(percentile(values, 50) * 1000, 2),
+                            'p95_ms': round(percentile(values, 95) * 1000, 2)}
+        return report
+
+
+def _number(low=None, high=None, optional=False):
+    """Validator for a number in [low, high] (None allowed if optional)"""
+    def check(value, announcer):
+        if value is None and optional:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("must be a number")
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f"must be between {low} and {high}")
+        return value
+    return check
+
+
+def _roi(value, announcer):
+    if value is None:
+        return None
+    if (not isinstance(value, (list, tuple)) or len(value) != 4 or
+            not all(isinstance(v, int) and not isinstance(v, bool) for v in value)):
+        raise ValueError("must be [x1, y1, x2, y2] in pixels, or null for full screen")
+    x1, y1, x2, y2 = value
+    if x1 < 0 or y1 < 0 or x2 <= x1 or y2 <= y1:
+        raise ValueError("needs 0 <= x1 < x2 and 0 <= y1 < y2")
+    return tuple(value)
+
+
+def _personality(value, announcer):
+    from personality_registry import get_registry
+    names = get_registry().names()
+    if value not in names:
+        raise ValueError(f"unknown personality (choose from {', '.join(names)})")
+    return value
+
+
+def _set_roi(announcer, region):
+    announcer.capture_region = region
+    # A different frame size - start change detection over
+    announcer.last_screenshot = None
+    announcer.last_screenshot_hash = None
+    announcer.animation_mask = None
+
+
+def _set_personality(announcer, mode):
+    announcer.personality_mode = mode
+    announcer.personality_prompt = announcer.load_personality(mode)
+
+
+def _cpu_budget(announcer):
+    return announcer.governor.budget * 100 if announcer.governor is not None else None
+
+
+def _set_cpu_budget(announcer, percent):
+    if not percent:
+        if announcer.governor is not None:
+            if announcer.governor.level:
+                announcer.governor.set_level(0)  # Back to full settings
+            announcer.governor = None
+    elif announcer.governor is not None:
+        announcer.governor.budget = percent / 100
+    else:
+        from cpu_governor import CpuGovernor
+        announcer.governor = CpuGovernor(percent / 100, announcers=[announcer])
+
+
+def _set_latency_slo(announcer, seconds):
+    announcer.token_policy.slo_p95 = seconds
+    announcer.router.slo_p95 = seconds
+
+
+def _set_max_tokens(announcer, tokens):
+    policy = announcer.token_policy
+    policy.base = int(tokens)
+    policy.floor = min(policy.floor, policy.base)
+    policy.budget = min(policy.budget, policy.base)
+
+
+# name -> (validate(value, announcer), get(announcer), set(announcer, value))
+SETTINGS = {
+    'interval': (_number(0.05, 60),
+                 lambda a: a.check_interval,
+                 lambda a, v: setattr(a, 'check_interval', v)),
+    'threshold': (_number(0.1, 100),
+                  lambda a: a.change_threshold,
+                  lambda a, v: setattr(a, 'change_threshold', v)),
+    'roi': (_roi,
+            lambda a: list(a.capture_region) if a.capture_region else None,
+            _set_roi),
+    'personality': (_personality,
+                    lambda a: a.personality_mode,
+                    _set_personality),
+    'cpu_budget': (_number(1, 800, optional=True), _cpu_budget, _set_cpu_budget),
+    'latency_slo': (_number(0.1, 60, optional=True),
+                    lambda a: a.token_policy.slo_p95,
+                    _set_latency_slo),
+    'max_tokens': (_number(16, 1024),
+                   lambda a: a.token_policy.base,
+                   _set_max_tokens),
+}
+
+
+class ControlServer:
+    """Localhost HTTP control channel for one TriggerBasedAnnouncer"""
+
+    def __init__(self, announcer, port=DEFAULT_PORT, host='127.0.0.1'):
+        self.announcer = announcer
+        self.host = host
+        self.port = port
+        self._pending = {}
+        self._waiting = []
+        self._lock = threading.Lock()
+        self.httpd = None
+        self.stats = {'requests': 0, 'applied': 0, 'rejected': 0}
+
+    def config(self):
+        """Current value of every setting"""
+        return {name: get(self.announcer) for name, (_, get, _) in SETTINGS.items()}
+
+    def snapshot(self):
+        """Live stats for GET /stats"""
+        announcer = self.announcer
+        stats = dict(announcer.stats)
+        stats['runtime_s'] = round(time.time() - stats['start_time'], 1)
+        telemetry = announcer.telemetry
+        return {
+            'stats': stats,
+            'api': dict(telemetry.totals,
+                        p50_s=telemetry.p50(), p95_s=telemetry.p95(),
+                        max_tokens_now=announcer.token_policy.budget),
+            'router': announcer.router.stats,
+            'scene': announcer.scene,
+            'cpu_level': announcer.governor.level if announcer.governor is not None else None,
+            'stages': announcer.timings.report(),
+            'control': self.stats,
+        }
+
+    def stage(self, changes):
+        """Validate a batch of changes and queue it for the capture loop
+
+        Returns an Event set once the batch is live. Raises ValueError
+        (nothing staged) if any name or value is bad.
+        """
+        if not isinstance(changes, dict) or not changes:
+            raise ValueError("expected a JSON object of settings")
+        validated = {}
+        for name, value in changes.items():
+            if name not in SETTINGS:
+                raise ValueError(f"unknown setting '{name}' (choose from {', '.join(SETTINGS)})")
+            try:
+                validated[name] = SETTINGS[name][0](value, self.announcer)
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}")
+
+        applied = threading.Event()
+        with self._lock:
+            self._pending.update(validated)
+            self._waiting.append(applied)
+        # Wake the loop if it is waiting out the capture interval
+        self.announcer.feed_changes.put(None)
+        return applied
+
+    def apply_pending(self):
+        """Apply every staged change at once (call between frames)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            waiting, self._waiting = self._waiting, []
+        if pending:
+            with self.announcer.state_lock:
+                for name, value in pending.items():
+                    SETTINGS[name][2](self.announcer, value)
+            self.stats['applied'] += 1
+            print(f"🎛️  Applied: {', '.join(f'{k}={v}' for k, v in pending.items())}")
+        for event in waiting:
+            event.set()
+
+    def start(self):
+        """Serve on a daemon thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        control = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def send_json(self, status, body):
+                data = json.dumps(body, default=str).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                control.stats['requests'] += 1
+                if self.path == '/stats':
+                    self.send_json(200, control.snapshot())
+                elif self.path == '/config':
+                    self.send_json(200, control.config())
+                else:
+                    self.send_json(404, {'error': 'try GET /stats, GET /config or POST /config'})
+
+            def do_POST(self):
+                control.stats['requests'] += 1
+                if self.path != '/config':
+                    self.send_json(404, {'error': 'only POST /config'})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    applied = control.stage(json.loads(self.rfile.read(length) or b'null'))
+                except ValueError as e:  # Includes bad JSON
+                    control.stats['rejected'] += 1
+                    self.send_json(400, {'error': str(e)})
+                    return
+                if applied.wait(APPLY_TIMEOUT):
+                    self.send_json(200, control.config())
+                else:
+                    self.send_json(202, {'status': 'staged - applies at the next frame'})
+
+            def log_message(self, format, *args):
+                pass  # Keep the console for commentary
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, name='control', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
@@ -0,0 +1,281 @@
+"""
+CPU governor - keep the announcer inside a CPU budget so GSPro keeps its frame rate
+Measures this process's CPU (including the OCR pool workers and the
+Tesseract runs they start) over a sliding window and steps through LEVELS:
+each level captures less often, diffs smaller frames, OCRs fewer HUD
+regions, splits full-screen OCR over fewer workers and allows fewer OCR jobs
+in flight. Over budget -> one level cheaper; well under budget for a while
+-> one level back. Decisions go to the announcers' stats and are printed.
+
+Budget is a fraction of one core, e.g. 0.10 = 10% of one core:
+    python gspro_ai_trigger.py --cpu-budget 10
+    python multi_bay.py --bay bay1 --bay bay2 --cpu-budget 25
+
+Check the meter sees OCR pool work on this machine:
+    python cpu_governor.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+
+# Cheapest last. compare_size must stay a multiple of the animation-mask tile.
+# ocr_bands caps how many pool workers one full-screen read is split across.
+LEVELS = [
+    {'interval_scale': 1.0, 'compare_size': (400, 300), 'max_regions': None, 'ocr_slots': None,
+     'ocr_bands': 2},
+    {'interval_scale': 1.5, 'compare_size': (400, 300), 'max_regions': None, 'ocr_slots': 2,
+     'ocr_bands': 1},
+    {'interval_scale': 2.0, 'compare_size': (200, 150), 'max_regions': 2, 'ocr_slots': 2,
+     'ocr_bands': 1},
+    {'interval_scale': 3.0, 'compare_size': (200, 150), 'max_regions': 1, 'ocr_slots': 1,
+     'ocr_bands': 1},
+    {'interval_scale': 5.0, 'compare_size': (200, 150), 'max_regions': 1, 'ocr_slots': 1,
+     'ocr_bands': 1},
+]
+
+
+def _proc_cpu_seconds(pid):
+    """CPU time of a process and its finished children from /proc (0 where there's none)"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # Fields after the command name: utime, stime, cutime, cstime are 14-17
+            fields = f.read().rsplit(')', 1)[1].split()
+        return sum(int(value) for value in fields[11:15]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+def cpu_seconds():
+    """CPU time used by this process and its children so far
+
+    OCR pool workers never exit, so their time - and that of the Tesseract
+    runs they wait for, which lands in their children times - is read per
+    worker: with psutil for every running child, otherwise from /proc for
+    the pool workers (Linux). Without either only finished children count.
+    """
+    try:
+        import psutil
+    except ImportError:
+        from ocr_pool import worker_pids
+        times = os.times()
+        total = times.user + times.system + times.children_user + times.children_system
+        return total + sum(_proc_cpu_seconds(pid) for pid in worker_pids())
+
+    process = psutil.Process()
+    times = process.cpu_times()
+    total = times.user + times.system
+    total += getattr(times, 'children_user', 0) + getattr(times, 'children_system', 0)
+    for child in process.children(recursive=True):
+        try:
+            child_times = child.cpu_times()
+            total += child_times.user + child_times.system
+            total += (getattr(child_times, 'children_user', 0) +
+                      getattr(child_times, 'children_system', 0))
+        except psutil.Error:
+            pass
+    return total
+
+
+def lower_priority():
+    """Drop this process (and children it starts) to below-normal priority
+
+    Returns True if the priority was changed. On POSIX the nice value is
+    set to 10 (not raised by 10), so children that call this again - OCR
+    pool workers - end up at the same level as their parent.
+    """
+    try:
+        import psutil
+        psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if os.name == 'nt' else 10)
+        return True
+    except ImportError:
+        pass
+    except Exception:
+        return False
+
+    if os.name == 'nt':
+        import ctypes
+        below_normal = 0x4000
+        kernel32 = ctypes.windll.kernel32
+        return bool(kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), below_normal))
+    try:
+        current = os.getpriority(os.PRIO_PROCESS, 0)
+        os.setpriority(os.PRIO_PROCESS, 0, max(current, 10))
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+class CpuMeter:
+    """CPU use as a fraction of one core over a sliding window"""
+
+    def __init__(self, window=10.0, min_interval=0.5, clock=time.monotonic, cpu=cpu_seconds):
+        self.window = window
+        self.min_interval = min_interval
+        self.clock = clock
+        self.cpu = cpu
+        self.samples = deque()
+        self._used = 0.0
+
+    def sample(self):
+        """Record a sample (rate-limited) and return current usage, or None if too early"""
+        now = self.clock()
+        if not self.samples or now - self.samples[-1][0] >= self.min_interval:
+            cpu = self.cpu()
+            if self.samples:
+                # Exited children can take their time with them - never count backwards
+                self._used += max(0.0, cpu - self.samples[-1][2])
+            self.samples.append((now, self._used, cpu))
+            while len(self.samples) > 2 and now - self.samples[1][0] >= self.window:
+                self.samples.popleft()
+        return self.usage()
+
+    def usage(self):
+        if len(self.samples) < 2:
+            return None
+        (start, used_start, _), (end, used_end, _) = self.samples[0], self.samples[-1]
+        if end - start <= 0:
+            return None
+        return (used_end - used_start) / (end - start)
+
+
+class CpuGovernor:
+    """Step announcer settings through LEVELS to stay under a CPU budget
+
+    announcers get interval_scale, max_ocr_regions and set_compare_size();
+    supervisor (multi_bay) gets ocr_slots and the OCR pool gets ocr_bands.
+    Level 0 is applied straight away. hold is the minimum time between
+    decisions, so each level is measured over a full window before the next.
+    """
+
+    def __init__(self, budget=0.10, announcers=(), supervisor=None, window=10.0,
+                 hold=None, meter=None, verbose=True):
+        self.budget = budget
+        self.announcers = list(announcers)
+        self.supervisor = supervisor
+        self.meter = meter or CpuMeter(window)
+        self.hold = window if hold is None else hold
+        self.verbose = verbose
+        self.level = 0
+        self.usage = None
+        self.changes = 0
+        self.decisions = deque(maxlen=50)
+        self._last_change = self.meter.clock()
+        self.apply(LEVELS[0])
+
+    def update(self):
+        """Measure and, if due, move one level; call once per loop iteration"""
+        usage = self.meter.sample()
+        if usage is None:
+            return self.level
+        self.usage = usage
+
+        now = self.meter.clock()
+        if now - self._last_change >= self.hold:
+            if usage > self.budget and self.level < len(LEVELS) - 1:
+                self.set_level(self.level + 1, usage)
+            elif usage < self.budget * 0.5 and self.level > 0:
+                self.set_level(self.level - 1, usage)
+        self.publish()
+        return self.level
+
+    def set_level(self, level, usage=None):
+        """Apply a level to every announcer (and the supervisor)"""
+        old, self.level = self.level, level
+        self.changes += 1
+        self._last_change = self.meter.clock()
+        self.apply(LEVELS[level])
+
+        self.decisions.append({'time': time.time(), 'usage': usage, 'from': old, 'to': level})
+        if self.verbose:
+            arrow = "🐢" if level > old else "🐇"
+            measured = f"CPU {usage * 100:.1f}% vs {self.budget * 100:.0f}% budget - " if usage is not None else ""
+            print(f"{arrow} {measured}level {old} -> {level}: {self.describe(level)}")
+
+    def apply(self, settings):
+        """Push one level's settings to the announcers, supervisor and OCR pool"""
+        from ocr_pool import limit_bands
+        for announcer in self.announcers:
+            announcer.interval_scale = settings['interval_scale']
+            announcer.max_ocr_regions = settings['max_regions']
+            announcer.set_compare_size(settings['compare_size'])
+        if self.supervisor is not None:
+            self.supervisor.ocr_slots = settings['ocr_slots']
+        limit_bands(settings['ocr_bands'])
+
+    def describe(self, level=None):
+        """One-line summary of a level's settings"""
+        settings = LEVELS[self.level if level is None else level]
+        width, height = settings['compare_size']
+        parts = [f"capture every {settings['interval_scale']:g}x interval",
+                 f"{width}x{height} diffs"]
+        if settings['max_regions']:
+            parts.append(f"{settings['max_regions']} HUD region(s)")
+        if settings['ocr_slots']:
+            parts.append(f"{settings['ocr_slots']} OCR job(s) in flight")
+        parts.append(f"full-screen OCR on {settings['ocr_bands']} worker(s)")
+        return ", ".join(parts)
+
+    def publish(self):
+        """Expose the current state in each announcer's stats"""
+        for announcer in self.announcers:
+            announcer.stats['cpu_percent'] = round(self.usage * 100, 1) if self.usage else 0.0
+            announcer.stats['cpu_level'] = self.level
+            announcer.stats['cpu_level_changes'] = self.changes
+
+
+def _burn_in_child(seconds):
+    """Spin a grandchild process for seconds of CPU, the way Tesseract runs (pool job)"""
+    code = ("import time\n"
+            f"end = time.process_time() + {seconds}\n"
+            "while time.process_time() < end: pass")
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def check_meter(seconds=1.0, jobs=2):
+    """Run a burst of OCR-like jobs on the OCR pool; True if the meter saw their CPU"""
+    from ocr_pool import get_ocr_pool, shutdown_ocr_pool
+
+    pool = get_ocr_pool(max_workers=jobs)
+    try:
+        for future in [pool.submit(os.getpid) for _ in range(jobs)]:
+            future.result()  # Workers started (and their start-up CPU spent) up front
+        meter = CpuMeter(window=3600.0, min_interval=0.0)
+        meter.sample()
+        for future in [pool.submit(_burn_in_child, seconds) for _ in range(jobs)]:
+            future.result()
+        usage = meter.sample()
+        measured = meter.samples[-1][1]
+    finally:
+        shutdown_ocr_pool()
+    print(f"OCR pool burst: {jobs} x {seconds:g}s of Tesseract-like CPU, "
+          f"meter saw {measured:.2f}s ({usage * 100:.0f}% of one core)")
+    return measured >= jobs * seconds * 0.8
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Check the CPU meter counts OCR pool work',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--seconds', type=float, default=1.0,
+                        help='CPU seconds each job burns (default: 1.0)')
+    parser.add_argument('--jobs', type=int, default=2,
+                        help='Jobs (and pool workers) in the burst (default: 2)')
+    args = parser.parse_args()
+
+    if check_meter(args.seconds, args.jobs):
+        print("✅ OCR pool CPU is on the meter")
+        return 0
+    print("❌ The meter missed OCR pool CPU - install psutil")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
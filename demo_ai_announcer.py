@@ -5,110 +5,106 @@ Simulates various golf scenarios
 """
 
 import os
-import time
-from anthropic import Anthropic
-import pyttsx3
-import json
+from shared_resources import get_client, warm_up
+from speech_service import get_speech_service
+import llm_transport
+from personality_registry import get_registry
+from commentary_matrix import run_matrix, print_matrix_table
+
+DEMO_SCENARIOS = [
+    {
+        "name": "Opening Tee",
+        "context": "New hole #1, par 4, 387 yards. First shot of the round."
+    },
+    {
+        "name": "Good Position",
+        "context": "Current distance: 145 yards. Perfect wedge distance. Second shot on hole."
+    },
+    {
+        "name": "Trouble",
+        "context": "Current distance: 200 yards. Third shot on a par 4. Things not going well."
+    },
+    {
+        "name": "Windy Conditions",
+        "context": "Current distance: 165 yards. Wind: 18 mph crosswind. Challenging conditions."
+    },
+    {
+        "name": "Short Game",
+        "context": "Current distance: 50 yards. Fourth shot on par 4. Need to get up and down."
+    },
+    {
+        "name": "New Hole - Easy",
+        "context": "New hole #3, par 3, 147 yards. Should be makeable."
+    },
+    {
+        "name": "New Hole - Monster",
+        "context": "New hole #8, par 5, 587 yards. The longest hole on the course."
+    },
+    {
+        "name": "Pressure Putt",
+        "context": "Current distance: 15 yards. On the green for potential birdie. Don't mess it up."
+    }
+]
+
+COMPARE_SCENARIO = {
+    "name": "Approach",
+    "context": "Current distance: 145 yards. Second shot on a par 4."
+}
+
+
+def build_demo_prompt(context):
+    """User message for a demo scenario (instructions live in the cached system prompt)"""
+    return f"Golf situation: {context}"
+
+
+# Comparison runs drop the "match your personality" nudge
+COMPARE_STYLE_RULES = "Provide brief announcer commentary (1-2 sentences max)."
+
 
 class AnnouncerDemo:
     def __init__(self, personality_mode="smartass", api_key=None):
         """Initialize demo"""
         self.personality_mode = personality_mode
-        self.client = Anthropic(api_key=api_key or os.environ.get("ANTHROPIC_API_KEY"))
+        self.client = get_client(api_key)
+        self.voice_rate = 160
         
-        # Initialize TTS with error handling
-        try:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty('rate', 160)
-            self.engine.setProperty('volume', 0.9)
-            self.tts_available = True
-        except Exception as e:
-            print(f"⚠️  Warning: TTS engine failed to initialize: {e}")
-            print("📝 Will print commentary instead of speaking")
-            self.engine = None
-            self.tts_available = False
+        # Spoken by the speech service's audio thread (it owns the TTS engine);
+        # if the engine fails, commentary is printed instead
+        self.tts_available = True
         
         # Load personality
         self.personality_prompt = self.load_personality(personality_mode)
         
         print(f"🎭 Testing {personality_mode.upper()} mode")
-        if not self.tts_available:
-            print("⚠️  TTS disabled - commentary will be printed only")
     
     def load_personality(self, mode):
-        """Load personality from JSON"""
-        if os.path.exists('personalities.json'):
-            with open('personalities.json', 'r') as f:
-                data = json.load(f)
-                personalities = data.get('personalities', {})
-                if mode in personalities:
-                    return personalities[mode]['prompt']
+        """Load personality from the shared registry"""
+        personality = get_registry().get(mode)
+        if personality:
+            self.voice_rate = personality['voice_rate']
+            return personality['prompt']
         return "Professional golf announcer. 1-2 sentences max."
     
+    def set_personality(self, mode):
+        """Switch personality, reusing the client and TTS engine"""
+        self.personality_mode = mode
+        self.personality_prompt = self.load_personality(mode)
+    
     def speak(self, text):
         """Speak text"""
         print(f"\n🔊 {text}")
         
-        if self.tts_available and self.engine:
-            try:
-                self.engine.say(text)
-                self.engine.runAndWait()
-            except Exception as e:
-                print(f"⚠️  TTS error: {e}")
-                print("📝 (Commentary printed above)")
+        if self.tts_available:
+            # One line at a time - wait for it before the next scenario
+            service = get_speech_service()
+            service.say(text, rate=self.voice_rate)
+            service.wait()
         else:
             print("📝 (TTS not available - commentary printed only)")
     
-    def get_commentary(self, scenario):
-        """Generate AI commentary for scenario"""
-        try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=150,
-                temperature=0.8,
-                system=self.personality_prompt,
-                messages=[{"role": "user", "content": scenario}]
-            )
-            return message.content[0].text.strip()
-        except Exception as e:
-            return f"Error: {e}"
-    
-    def demo_scenarios(self):
+    def demo_scenarios(self, max_workers=4):
         """Run through demo scenarios"""
-        scenarios = [
-            {
-                "name": "Opening Tee",
-                "context": "New hole #1, par 4, 387 yards. First shot of the round."
-            },
-            {
-                "name": "Good Position",
-                "context": "Current distance: 145 yards. Perfect wedge distance. Second shot on hole."
-            },
-            {
-                "name": "Trouble",
-                "context": "Current distance: 200 yards. Third shot on a par 4. Things not going well."
-            },
-            {
-                "name": "Windy Conditions",
-                "context": "Current distance: 165 yards. Wind: 18 mph crosswind. Challenging conditions."
-            },
-            {
-                "name": "Short Game",
-                "context": "Current distance: 50 yards. Fourth shot on par 4. Need to get up and down."
-            },
-            {
-                "name": "New Hole - Easy",
-                "context": "New hole #3, par 3, 147 yards. Should be makeable."
-            },
-            {
-                "name": "New Hole - Monster",
-                "context": "New hole #8, par 5, 587 yards. The longest hole on the course."
-            },
-            {
-                "name": "Pressure Putt",
-                "context": "Current distance: 15 yards. On the green for potential birdie. Don't mess it up."
-            }
-        ]
+        scenarios = DEMO_SCENARIOS
         
         print("\n" + "="*60)
         print("🏌️  AI ANNOUNCER DEMO - TESTING SCENARIOS")
@@ -116,31 +112,32 @@ class AnnouncerDemo:
         print(f"Mode: {self.personality_mode.upper()}")
         print("="*60 + "\n")
         
-        for i, scenario in enumerate(scenarios, 1):
+        # Generate every scenario up front, concurrently
+        print(f"🤖 Generating commentary for {len(scenarios)} scenarios...")
+        results, wall_time = run_matrix(
+            self.client,
+            {self.personality_mode: self.personality_prompt},
+            scenarios,
+            build_demo_prompt,
+            max_workers=max_workers
+        )
+        
+        completed = 0
+        for i, (scenario, result) in enumerate(zip(scenarios, results), 1):
             try:
                 print(f"\n{'='*60}")
                 print(f"Scenario {i}/{len(scenarios)}: {scenario['name']}")
                 print(f"{'='*60}")
                 print(f"📋 Context: {scenario['context']}")
                 
-                # Generate commentary
-                print("🤖 Generating commentary...")
-                commentary = self.get_commentary(
-                    f"Golf situation: {scenario['context']}\n\n"
-                    "Provide brief announcer commentary (1-2 sentences max). "
-                    "Be entertaining and match your personality."
-                )
-                
                 # Speak it
-                if commentary:
-                    self.speak(commentary)
+                if result['text']:
+                    self.speak(result['text'])
+                elif result['error']:
+                    print(f"❌ Error: {result['error']}")
                 else:
                     print("⚠️  No commentary generated")
-                
-                # Pause between scenarios
-                if i < len(scenarios):
-                    print("\n⏸️  Pausing before next scenario...")
-                    time.sleep(2)
+                completed = i
                     
             except KeyboardInterrupt:
                 print("\n\n⚠️  Demo interrupted by user")
@@ -150,39 +147,61 @@ class AnnouncerDemo:
                 continue
         
         print("\n" + "="*60)
+        print_matrix_table(results, wall_time)
+        print("="*60)
         print("✅ Demo complete!")
-        print(f"Completed {i} of {len(scenarios)} scenarios")
+        print(f"Completed {completed} of {len(scenarios)} scenarios")
         print("="*60)
 
 
-def compare_personalities():
-    """Compare different personalities on same scenario"""
-    scenario = "Current distance: 145 yards. Second shot on a par 4."
+def compare_personalities(no_speech=False, api_key=None, max_workers=4, all_scenarios=False):
+    """Compare different personalities on the same scenarios"""
+    if all_scenarios:
+        scenarios = DEMO_SCENARIOS
+    else:
+        scenarios = [COMPARE_SCENARIO]
     
-    personalities = ['normal', 'smartass', 'hype', 'zen', 'pirate', 'british']
+    personalities = get_registry().names()
     
     print("\n" + "="*60)
     print("🎭 PERSONALITY COMPARISON")
     print("="*60)
-    print(f"Scenario: {scenario}")
+    for scenario in scenarios:
+        print(f"Scenario: {scenario['context']}")
     print("="*60 + "\n")
     
+    # One demo instance - client and TTS engine are reused across personalities
+    demo = AnnouncerDemo(personality_mode=personalities[0], api_key=api_key)
+    if no_speech:
+        demo.tts_available = False
+    
+    prompts = {}
+    voice_rates = {}
     for personality in personalities:
+        prompts[personality] = demo.load_personality(personality)
+        voice_rates[personality] = demo.voice_rate
+    
+    # Fan out over personalities x scenarios
+    results, wall_time = run_matrix(
+        demo.client, prompts, scenarios, build_demo_prompt, max_workers=max_workers,
+        style_rules=COMPARE_STYLE_RULES
+    )
+    
+    for result in results:
         print(f"\n{'='*60}")
-        print(f"🎤 {personality.upper()} MODE")
+        print(f"🎤 {result['personality'].upper()} MODE - {result['scenario']}")
         print("="*60)
         
-        try:
-            demo = AnnouncerDemo(personality_mode=personality)
-            commentary = demo.get_commentary(
-                f"Golf situation: {scenario}\n\n"
-                "Provide brief announcer commentary (1-2 sentences max)."
-            )
-            print(f"💬 {commentary}")
-            demo.speak(commentary)
-            time.sleep(1)
-        except Exception as e:
-            print(f"❌ Error: {e}")
+        if result['error']:
+            print(f"❌ Error: {result['error']}")
+            continue
+        print(f"💬 {result['text']}")
+        demo.voice_rate = voice_rates[result['personality']]
+        demo.speak(result['text'])
+    
+    print("\n" + "="*60)
+    print_matrix_table(results, wall_time)
+    print("="*60)
 
 
 def main():
@@ -194,29 +213,40 @@ def main():
                         help='Personality mode to test')
     parser.add_argument('--compare', action='store_true',
                         help='Compare all personalities on same scenario')
+    parser.add_argument('--all-scenarios', action='store_true',
+                        help='With --compare, run every demo scenario (full matrix)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent API requests (default: 4)')
     parser.add_argument('--no-speech', action='store_true',
                         help='Skip text-to-speech (print only - faster testing)')
     parser.add_argument('--api-key', type=str,
                         help='Anthropic API key')
+    llm_transport.add_transport_arguments(parser)
     
     args = parser.parse_args()
+    llm_transport.configure_from_args(args)
     
     # Check for API key
-    if not args.api_key and not os.environ.get("ANTHROPIC_API_KEY"):
+    if (llm_transport.requires_api_key() and
+            not args.api_key and not os.environ.get("ANTHROPIC_API_KEY")):
         print("❌ Error: Anthropic API key required!")
         print("\nSet it via:")
         print("  export ANTHROPIC_API_KEY='your-key'")
         print("\nGet your key at: https://console.anthropic.com/")
         return
     
+    # Open the API connection and load TTS voices while we set up
+    warm_up(args.api_key, tts=not args.no_speech)
+    
     if args.compare:
-        compare_personalities(no_speech=args.no_speech)
+        compare_personalities(no_speech=args.no_speech, api_key=args.api_key,
+                              max_workers=args.workers, all_scenarios=args.all_scenarios)
     else:
         demo = AnnouncerDemo(personality_mode=args.mode, api_key=args.api_key)
         if args.no_speech:
             demo.tts_available = False
             print("📝 TTS disabled - commentary will be printed only (faster)")
-        demo.demo_scenarios()
+        demo.demo_scenarios(max_workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""
+Shared-memory frame ring buffer between capture and analysis processes
+The capture side writes frames into fixed slots; analysis workers attach by
+name and read them as zero-copy NumPy views instead of unpickling full frames
+from a multiprocessing.Queue
+
+Layout of the shared block:
+  header   int64[4]      write_seq, slots, height, width
+  slot_seq int64[slots]  sequence number held by each slot (0 = empty, -1 = writing)
+  slot_ts  float64[slots] capture time of each slot
+  frames   uint8[slots, height, width, 3]
+
+Handoff uses sequence numbers with overwrite-oldest semantics: the writer never
+waits for readers. Frame seq lives in slot seq % slots; a reader holding a view
+checks still_valid(seq) after using it to detect that the writer lapped it.
+"""
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_HEADER_FIELDS = 4
+CHANNELS = 3
+
+
+def _layout(slots, height, width):
+    """Byte offsets of each section for a ring of this shape"""
+    header = _HEADER_FIELDS * 8
+    slot_seq = header
+    slot_ts = slot_seq + slots * 8
+    frames = slot_ts + slots * 8
+    # Align frame data to 64 bytes so each slot starts on a cache line
+    frames = (frames + 63) // 64 * 64
+    total = frames + slots * height * width * CHANNELS
+    return slot_seq, slot_ts, frames, total
+
+
+class FrameRing:
+    """Fixed-slot frame ring in shared memory (one writer, many readers)"""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        slots, height, width = (int(v) for v in header[1:4])
+        slot_seq, slot_ts, frames, _ = _layout(slots, height, width)
+
+        self.header = header
+        self.slots = slots
+        self.shape = (height, width, CHANNELS)
+        self.slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=slot_seq)
+        self.slot_ts = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=slot_ts)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8,
+                                 buffer=shm.buf, offset=frames)
+
+    @classmethod
+    def create(cls, height, width, slots=4, name=None):
+        """Allocate a new ring (capture side)"""
+        _, _, _, total = _layout(slots, height, width)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=total)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (0, slots, height, width)
+        ring = cls(shm, owner=True)
+        ring.slot_seq[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        """Map an existing ring by name (analysis side)"""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: an unrelated process gets its own resource
+            # tracker, which would unlink the creator's block when this
+            # process exits. Pool workers share the creator's tracker.
+            import multiprocessing
+            shm = shared_memory.SharedMemory(name=name)
+            if multiprocessing.parent_process() is None:
+                try:
+                    from multiprocessing import resource_tracker
+                    resource_tracker.unregister(shm._name, 'shared_memory')
+                except Exception:
+                    pass
+        return cls(shm, owner=False)
+
+    @property
+    def write_seq(self):
+        """Sequence number of the newest complete frame (0 if none yet)"""
+        return int(self.header[0])
+
+    def write(self, frame):
+        """Copy a frame (PIL image or HxWx3 array) into the next slot; returns its seq"""
+        array = np.asarray(frame, dtype=np.uint8)
+        if array.shape != self.shape:
+            raise ValueError(f"frame shape {array.shape} != ring shape {self.shape}")
+
+        seq = self.write_seq + 1
+        slot = seq % self.slots
+        # Mark the slot as being written so readers can't mistake a torn frame
+        self.slot_seq[slot] = -1
+        np.copyto(self.frames[slot], array)
+        self.slot_ts[slot] = time.time()
+        self.slot_seq[slot] = seq
+        self.header[0] = seq
+        return seq
+
+    def view(self, seq):
+        """Zero-copy view of frame seq, or None if it has been overwritten"""
+        if seq <= 0:
+            return None
+        slot = seq % self.slots
+        if self.slot_seq[slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def still_valid(self, seq):
+        """True if frame seq hasn't been overwritten since it was read"""
+        return seq > 0 and self.slot_seq[seq % self.slots] == seq
+
+    def latest(self):
+        """(seq, view) of the newest frame, or (0, None) if the ring is empty"""
+        seq = self.write_seq
+        return seq, self.view(seq)
+
+    def wait_newer(self, last_seq, timeout=1.0, poll=0.002):
+        """Block until a frame newer than last_seq is written; returns its seq or 0"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            seq = self.write_seq
+            if seq > last_seq:
+                return seq
+            time.sleep(poll)
+        return 0
+
+    def close(self):
+        """Unmap the ring; the creator also frees the shared block"""
+        # Drop views before closing or the buffer can't be released
+        self.header = self.slot_seq = self.slot_ts = self.frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -3,36 +3,37 @@ GSPro AI Announcer - Voice commentary with personality
 Uses Claude API for intelligent, contextual golf commentary
 """
 
-import pytesseract
-from PIL import ImageGrab
-import pyttsx3
 import re
 import time
 import os
-import json
+from contextlib import nullcontext
 from datetime import datetime
-from anthropic import Anthropic
+from ocr_pool import ocr_text
+from shared_resources import get_client, save_debug_image, warm_up
+from speech_service import get_speech_service
+import llm_transport
+import model_router
+from personality_registry import get_registry
+from api_telemetry import ApiTelemetry, TokenPolicy, trim_to_sentence
+from prompt_builder import DEFAULT_MAX_TOKENS, commentary_request
+from round_context import RoundContext
 
-# Configure Tesseract path for Windows
-# If Tesseract is installed in the default location, set the path
-if os.name == 'nt':  # Windows
-    tesseract_path = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
-    if os.path.exists(tesseract_path):
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+# Finished holes kept in game_state (six rounds) so long sessions stay bounded
+MAX_HOLE_HISTORY = 108
 
 class GSProAIAnnouncer:
-    def __init__(self, personality_mode="normal", debug_mode=False, api_key=None):
+    def __init__(self, personality_mode="normal", debug_mode=False, api_key=None,
+                 context_budget=200):
         """Initialize the AI announcer"""
         self.debug_mode = debug_mode
         self.personality_mode = personality_mode
         
-        # Initialize Anthropic client
-        self.client = Anthropic(api_key=api_key or os.environ.get("ANTHROPIC_API_KEY"))
+        # Shared Anthropic client (one connection pool per process)
+        self.client = get_client(api_key)
         
-        # Initialize TTS
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 160)
-        self.engine.setProperty('volume', 0.9)
+        # Speech goes through the process-wide speech service (started by the
+        # startup warm-up); voice rate is applied per utterance
+        self.voice_rate = 160
         
         # Game state tracking
         self.game_state = {
@@ -46,8 +47,24 @@ class GSProAIAnnouncer:
             'last_announced': None
         }
         
-        # Conversation history for context
-        self.conversation_history = []
+        # Announcement class of the current commentary (speech queue priority)
+        self.speech_kind = 'other'
+        
+        # Token/cost/latency accounting and the adaptive max_tokens budget
+        self.telemetry = ApiTelemetry()
+        self.token_policy = TokenPolicy()
+        
+        # Model tier per announcement class
+        self.router = model_router.get_router()
+        
+        # Pre-generated lines for common situations (commentary_bank.CommentaryBank)
+        self.bank = None
+        
+        # Bands for full-screen OCR on the process pool (None = auto, 1 = one Tesseract)
+        self.ocr_bands = None
+        
+        # Round memory for commentary, kept under a fixed token budget
+        self.round_context = RoundContext(budget_tokens=context_budget)
         
         # Load personality
         self.personality_prompt = self.load_personality(personality_mode)
@@ -62,23 +79,14 @@ class GSProAIAnnouncer:
     
     def load_personality(self, mode):
         """Load personality prompt based on mode"""
-        # Try to load from personalities.json first
-        if os.path.exists('personalities.json'):
-            try:
-                with open('personalities.json', 'r') as f:
-                    data = json.load(f)
-                    personalities = data.get('personalities', {})
-                    
-                if mode in personalities:
-                    personality = personalities[mode]
-                    
-                    # Set voice rate if specified
-                    if 'voice_rate' in personality:
-                        self.engine.setProperty('rate', personality['voice_rate'])
-                    
-                    return personality['prompt']
-            except Exception as e:
-                print(f"⚠️  Warning: Could not load personalities.json: {e}")
+        # Try the shared personalities.json registry first
+        registry = get_registry()
+        personality = registry.get(mode)
+        self.personality_version = registry.version
+        if personality:
+            # Voice rate is applied on the next utterance
+            self.voice_rate = personality['voice_rate']
+            return personality['prompt']
         
         # Fallback to built-in default
         return """You are a professional golf announcer providing live commentary. 
@@ -86,19 +94,28 @@ Your style is informative, enthusiastic, and respectful.
 Keep commentary concise (1-2 sentences max). 
 Focus on the shot at hand and provide helpful context."""
     
-    def speak(self, text):
-        """Speak text out loud"""
+    def refresh_personality(self):
+        """Hot reload: pick up edits to personalities.json before announcing"""
+        registry = get_registry()
+        registry.reload_if_changed()
+        if registry.version != self.personality_version:
+            self.personality_prompt = self.load_personality(self.personality_mode)
+            print(f"🔄 Personality '{self.personality_mode}' reloaded")
+    
+    def speak(self, text, kind='other'):
+        """Queue text on the speech thread (returns at once, never waits on audio)"""
         print(f"🔊 {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
+        get_speech_service().say(text, kind, rate=self.voice_rate, channel=id(self))
     
     def capture_screen(self):
         """Capture the full screen"""
+        from PIL import ImageGrab
+        
         try:
             screenshot = ImageGrab.grab()
             if self.debug_mode:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot.save(f'debug_screenshots/screen_{timestamp}.png')
+                save_debug_image(screenshot, f'screen_{timestamp}.png')
             return screenshot
         except Exception as e:
             print(f"❌ Error capturing screen: {e}")
@@ -107,7 +124,7 @@ Focus on the shot at hand and provide helpful context."""
     def ocr_screen(self, screenshot):
         """Perform OCR on screenshot"""
         try:
-            text = pytesseract.image_to_string(screenshot)
+            text = ocr_text(screenshot, bands=self.ocr_bands)
             if self.debug_mode:
                 print("\n" + "="*50)
                 print("📝 OCR OUTPUT:")
@@ -133,10 +150,15 @@ Focus on the shot at hand and provide helpful context."""
             if new_hole != self.game_state['current_hole']:
                 # New hole
                 if self.game_state['current_hole']:
-                    self.game_state['hole_history'].append({
+                    history = self.game_state['hole_history']
+                    history.append({
                         'hole': self.game_state['current_hole'],
                         'shots': self.game_state['shots_on_hole']
                     })
+                    del history[:-MAX_HOLE_HISTORY]
+                    self.round_context.finish_hole(self.game_state['current_hole'],
+                                                   self.game_state['current_par'],
+                                                   self.game_state['shots_on_hole'])
                 self.game_state['current_hole'] = new_hole
                 self.game_state['shots_on_hole'] = 0
         
@@ -155,31 +177,49 @@ Focus on the shot at hand and provide helpful context."""
             self.game_state['last_distance'] and
             abs(int(self.game_state['current_distance']) - int(self.game_state['last_distance'])) > 20):
             self.game_state['shots_on_hole'] += 1
+            self.token_policy.note_shot()
     
     def generate_commentary(self):
         """Generate AI commentary based on game state"""
+        # Round memory so far (before this situation is recorded into it)
+        round_memory = self.round_context.render()
+        
         # Build context message
         context = self.build_context_message()
         
         if not context:
             return None
         
+        # Apply any personality edits made since the last announcement
+        self.refresh_personality()
+        
+        # Common situations come from the bank with the live numbers filled in
+        if self.bank is not None:
+            banked = self.bank.lookup(self.personality_prompt, self.speech_kind, self.game_state)
+            if banked:
+                self.round_context.record_commentary(banked)
+                return banked
+        
         try:
-            # Call Claude API
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=150,
-                temperature=0.8,
-                system=self.personality_prompt,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": context
-                    }
-                ]
-            )
+            # Call Claude API - personality and style rules are a cached prefix,
+            # round memory and the situation are the only new input
+            max_tokens = self.token_policy.max_tokens(self.telemetry)
+            with self.router.slot(self.speech_kind) as tier:
+                start = time.perf_counter()
+                message = self.client.messages.create(
+                    **commentary_request(self.personality_prompt, context,
+                                         model=tier.model, max_tokens=max_tokens,
+                                         round_memory=round_memory)
+                )
+                latency = time.perf_counter() - start
+            self.router.record(tier, message, latency)
+            self.telemetry.record(message, latency)
+            self.token_policy.update(self.telemetry)
             
             commentary = message.content[0].text.strip()
+            if getattr(message, 'stop_reason', None) == 'max_tokens':
+                commentary = trim_to_sentence(commentary)
+            self.round_context.record_commentary(commentary)
             
             if self.debug_mode:
                 print(f"\n🤖 AI Generated: {commentary}\n")
@@ -196,6 +236,7 @@ Focus on the shot at hand and provide helpful context."""
         
         # Determine what changed and needs commentary
         messages = []
+        kinds = []
         
         # New hole announcement
         if gs['current_hole'] and gs['current_hole'] != gs.get('last_announced_hole'):
@@ -205,6 +246,7 @@ Focus on the shot at hand and provide helpful context."""
             if gs['current_distance']:
                 msg += f", {gs['current_distance']} yards"
             messages.append(msg)
+            kinds.append('hole')
             gs['last_announced_hole'] = gs['current_hole']
         
         # Distance update (if changed significantly and not a new hole)
@@ -215,6 +257,7 @@ Focus on the shot at hand and provide helpful context."""
             if gs['shots_on_hole'] > 0:
                 msg += f" (shot #{gs['shots_on_hole']} on this hole)"
             messages.append(msg)
+            kinds.append('distance')
             gs['last_announced_distance'] = gs['current_distance']
         
         # Wind announcement (if significant and changed)
@@ -222,16 +265,18 @@ Focus on the shot at hand and provide helpful context."""
             int(gs['wind_speed']) >= 10 and
             gs['wind_speed'] != gs.get('last_announced_wind')):
             messages.append(f"Wind: {gs['wind_speed']} mph")
+            kinds.append('wind')
             gs['last_announced_wind'] = gs['wind_speed']
         
         if not messages:
             return None
         
-        # Combine into prompt
-        context = "Golf situation: " + ". ".join(messages)
-        context += "\n\nProvide brief announcer commentary (1-2 sentences max). Be entertaining and match your personality."
+        self.speech_kind = kinds[0]
+        for msg in messages:
+            self.round_context.record_event(msg)
         
-        return context
+        # Combine into prompt (style instructions are in the cached system prompt)
+        return "Golf situation: " + ". ".join(messages)
     
     def run(self, interval=3):
         """Main loop"""
@@ -260,36 +305,30 @@ Focus on the shot at hand and provide helpful context."""
                 # Generate and speak commentary
                 commentary = self.generate_commentary()
                 if commentary:
-                    self.speak(commentary)
+                    self.speak(commentary, self.speech_kind)
                 
                 time.sleep(interval)
                 
         except KeyboardInterrupt:
             print("\n\n⛳ Stopping AI Announcer...")
             print(f"Final stats: {len(self.game_state['hole_history'])} holes tracked")
+            for line in self.telemetry.report() + self.router.report():
+                print(line)
             print("Thanks for playing! 🏌️")
 
 
 def main():
     """Entry point"""
     import argparse
+    from startup_profile import StartupProfiler
     
     # Load available personalities
-    available_modes = ['normal', 'smartass', 'hype', 'zen', 'pirate', 'british']
-    personality_descriptions = {}
-    
-    if os.path.exists('personalities.json'):
-        try:
-            with open('personalities.json', 'r') as f:
-                data = json.load(f)
-                personalities = data.get('personalities', {})
-                available_modes = list(personalities.keys())
-                personality_descriptions = {
-                    k: v.get('name', k) 
-                    for k, v in personalities.items()
-                }
-        except:
-            pass
+    personalities = get_registry().all()
+    available_modes = get_registry().names()
+    personality_descriptions = {
+        k: v.get('name', k) 
+        for k, v in personalities.items()
+    }
     
     parser = argparse.ArgumentParser(
         description='GSPro AI Announcer - Personality-driven golf commentary',
@@ -319,26 +358,44 @@ Create custom personalities:
                         help='Seconds between screen captures')
     parser.add_argument('--api-key', type=str,
                         help='Anthropic API key (or set ANTHROPIC_API_KEY env var)')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print startup phase timings')
+    parser.add_argument('--context-budget', type=int, default=200,
+                        help='Token budget for round memory in each prompt (default: 200)')
+    parser.add_argument('--ocr-bands', type=int, metavar='N',
+                        help='Split full-screen OCR into N bands read in parallel '
+                             '(default: by frame height and cores, 1 = off)')
+    parser.add_argument('--bank', type=str, metavar='FILE',
+                        help='Pre-generated commentary bank (commentary_bank.py) for common situations')
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS,
+                        help=f'Commentary length budget (default: {DEFAULT_MAX_TOKENS})')
+    parser.add_argument('--latency-slo', type=float, metavar='SECONDS',
+                        help='Shrink max_tokens while p95 API latency is above this')
+    llm_transport.add_transport_arguments(parser)
+    model_router.add_router_arguments(parser)
     
     args = parser.parse_args()
+    llm_transport.configure_from_args(args)
+    try:
+        model_router.configure_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
     
     # List modes if requested
     if args.list_modes:
         print("\n🎭 Available Personality Modes:")
         print("="*60)
-        if os.path.exists('personalities.json'):
-            with open('personalities.json', 'r') as f:
-                data = json.load(f)
-                for mode, pdata in data['personalities'].items():
-                    print(f"\n🎤 {mode.upper()}")
-                    print(f"   Name: {pdata['name']}")
-                    if pdata.get('examples'):
-                        print(f"   Example: \"{pdata['examples'][0]}\"")
+        for mode, pdata in personalities.items():
+            print(f"\n🎤 {mode.upper()}")
+            print(f"   Name: {pdata['name']}")
+            if pdata.get('examples'):
+                print(f"   Example: \"{pdata['examples'][0]}\"")
         print("\n")
         return
     
     # Check for API key
-    if not args.api_key and not os.environ.get("ANTHROPIC_API_KEY"):
+    if (llm_transport.requires_api_key() and
+            not args.api_key and not os.environ.get("ANTHROPIC_API_KEY")):
         print("❌ Error: Anthropic API key required!")
         print("\nSet it via:")
         print("  1. Environment variable: export ANTHROPIC_API_KEY='your-key'")
@@ -346,12 +403,30 @@ Create custom personalities:
         print("\nGet your API key at: https://console.anthropic.com/")
         return
     
+    profiler = StartupProfiler() if args.profile_startup else None
+    
+    # Open the API connection and load TTS voices while we set up
+    warm_up_thread = warm_up(args.api_key)
+    
     # Initialize and run
-    announcer = GSProAIAnnouncer(
-        personality_mode=args.mode,
-        debug_mode=args.debug,
-        api_key=args.api_key
-    )
+    with profiler.phase('construct announcer') if profiler else nullcontext():
+        announcer = GSProAIAnnouncer(
+            personality_mode=args.mode,
+            debug_mode=args.debug,
+            api_key=args.api_key,
+            context_budget=args.context_budget
+        )
+    
+    announcer.token_policy = TokenPolicy(base=args.max_tokens, slo_p95=args.latency_slo)
+    if args.bank:
+        from commentary_bank import CommentaryBank
+        announcer.bank = CommentaryBank.load(args.bank)
+    announcer.ocr_bands = args.ocr_bands
+    
+    if profiler:
+        profiler.wait_for('background warm-up done', warm_up_thread)
+        profiler.report()
+    
     announcer.run(interval=args.interval)
 
 
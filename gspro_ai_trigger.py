@@ -4,38 +4,56 @@ Only activates when screen changes are detected
 More efficient - saves API calls and reduces cost
 """
 
-import pytesseract
-from PIL import ImageGrab, ImageChops
-import pyttsx3
 import re
 import time
 import os
-import json
 import hashlib
-import numpy as np
+import queue
+import threading
+from contextlib import nullcontext
 from datetime import datetime
-from anthropic import Anthropic
+from ocr_pool import ocr_text
+from shared_resources import get_client, save_debug_image, warm_up
+from speech_service import get_speech_service, speech_kind
+import llm_transport
+import model_router
+from personality_registry import get_registry
+from api_telemetry import ApiTelemetry, TokenPolicy, trim_to_sentence
+from control_server import StageTimings
+from prompt_builder import DEFAULT_MAX_TOKENS, commentary_request
+
+# Long-lived state is capped so a 12-hour session runs in flat memory
+MAX_HOLE_HISTORY = 108   # Guard only - history is cleared at the end of each round
+MAX_HOLE_DISTANCES = 64  # Distance readings kept for the hole in progress
+
+# Stats counted per round for the analytics store
+ROUND_COUNTERS = ('screenshots_taken', 'changes_detected', 'api_calls_made',
+                  'cache_hits', 'cost_usd')
+
+
+def _hole_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
 
-# Configure Tesseract path for Windows
-# If Tesseract is installed in the default location, set the path
-if os.name == 'nt':  # Windows
-    tesseract_path = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
-    if os.path.exists(tesseract_path):
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
 
 class TriggerBasedAnnouncer:
-    def __init__(self, personality_mode="normal", debug_mode=False, api_key=None):
+    def __init__(self, personality_mode="normal", debug_mode=False, api_key=None,
+                 commentary_cache=None):
         """Initialize trigger-based announcer"""
         self.debug_mode = debug_mode
         self.personality_mode = personality_mode
         
-        # Initialize Anthropic client
-        self.client = Anthropic(api_key=api_key or os.environ.get("ANTHROPIC_API_KEY"))
+        # Optional commentary cache shared between announcers (multi-bay)
+        self.commentary_cache = commentary_cache
         
-        # Initialize TTS
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 160)
-        self.engine.setProperty('volume', 0.9)
+        # Shared Anthropic client (one connection pool per process)
+        self.client = get_client(api_key)
+        
+        # Speech goes through the process-wide speech service (started by the
+        # startup warm-up); voice rate is applied per utterance
+        self.voice_rate = 160
         
         # Game state tracking
         self.game_state = {
@@ -46,13 +64,80 @@ class TriggerBasedAnnouncer:
             'wind_speed': None,
             'shots_on_hole': 0,
             'hole_history': [],
+            'current_club': None,
+            'last_shot': None,
+            'hole_started': None,
+            'hole_distances': [],
+            'round_started': None,
+            'round_base': {},  # ROUND_COUNTERS when the round began
         }
+        self.state_lock = threading.RLock()
+        
+        # Fields currently supplied by a live data feed (GSPro Connect)
+        # rather than OCR, and the changes it has queued for announcement
+        self.feed_fields = frozenset()
+        self.feed_changes = queue.Queue()
+        
+        # Optional session journal for crash resume
+        self.journal = None
+        
+        # Optional shot analytics store (shot_analytics.AnalyticsStore); rounds
+        # are written as they finish
+        self.analytics = None
+        self.analytics_bay = ''
+        self._finished_rounds = []
+        
+        # Course description, sent as part of the cached system prompt
+        self.course_context = None
+        
+        # Announcement class of the last commentary (speech queue priority)
+        self.last_speech_kind = 'other'
+        
+        # Token/cost/latency accounting and the adaptive max_tokens budget
+        self.telemetry = ApiTelemetry()
+        self.token_policy = TokenPolicy()
+        
+        # Model tier per announcement class (shared limits across announcers)
+        self.router = model_router.get_router()
+        
+        # Pre-generated lines for common situations (commentary_bank.CommentaryBank)
+        self.bank = None
+        
+        # Learned HUD regions (hud_calibration.HudCalibrator) - None = full-screen OCR
+        self.hud = None
+        
+        # Bands for full-screen OCR on the process pool (None = auto, 1 = one Tesseract)
+        self.ocr_bands = None
         
-        # Screen change detection
+        # Screen change detection (last_screenshot is kept at compare_size only)
+        self.compare_size = (400, 300)
+        
+        # CPU budget knobs (set by cpu_governor.CpuGovernor when --cpu-budget is used)
+        self.governor = None
+        self.interval_scale = 1.0
+        self.max_ocr_regions = None
         self.last_screenshot = None
         self.last_screenshot_hash = None
         self.change_threshold = 5.0  # Percentage of pixels that need to change
         
+        # Learned mask of always-animated tiles (flags, water, camera sway),
+        # created on the first diff; set learn_animation False for plain diffs
+        self.learn_animation = True
+        self.animation_mask = None
+        
+        # Scene labelling (scene_classifier, opt-in with --scene-filter) - skips
+        # OCR on menus, flyovers and the scorecard and picks which HUD fields to read
+        self.classify_scenes = False
+        self.scene_classifier = None
+        self.scene = None
+        
+        # Capture loop settings (changeable at runtime through control_server);
+        # capture_region None = full screen
+        self.check_interval = 1.0
+        self.capture_region = None
+        self.control = None
+        self.timings = StageTimings()
+        
         # Region of interest (ROI) for monitoring
         # These are the screen areas where golf info typically appears
         self.roi_regions = {
@@ -70,6 +155,9 @@ class TriggerBasedAnnouncer:
             'screenshots_taken': 0,
             'changes_detected': 0,
             'api_calls_made': 0,
+            'cache_hits': 0,
+            'bank_hits': 0,
+            'ocr_skipped': 0,
             'start_time': time.time()
         }
         
@@ -81,32 +169,37 @@ class TriggerBasedAnnouncer:
         print(f"🎯 Trigger mode: Only announces on changes")
     
     def load_personality(self, mode):
-        """Load personality from JSON"""
-        if os.path.exists('personalities.json'):
-            try:
-                with open('personalities.json', 'r') as f:
-                    data = json.load(f)
-                    personalities = data.get('personalities', {})
-                if mode in personalities:
-                    personality = personalities[mode]
-                    if 'voice_rate' in personality:
-                        self.engine.setProperty('rate', personality['voice_rate'])
-                    return personality['prompt']
-            except Exception as e:
-                if self.debug_mode:
-                    print(f" Could not load personalities.json: {e}")
+        """Load personality from the shared registry"""
+        registry = get_registry()
+        personality = registry.get(mode)
+        self.personality_version = registry.version
+        if personality:
+            self.voice_rate = personality['voice_rate']
+            return personality['prompt']
+        
+        if self.debug_mode and registry.error:
+            print(f" Could not load personalities.json: {registry.error}")
         
         return """You are a professional golf announcer providing live commentary. 
 Keep commentary concise (1-2 sentences max)."""
     
-    def speak(self, text):
-        """Speak text out loud"""
+    def refresh_personality(self):
+        """Hot reload: pick up edits to personalities.json before announcing"""
+        registry = get_registry()
+        registry.reload_if_changed()
+        if registry.version != self.personality_version:
+            self.personality_prompt = self.load_personality(self.personality_mode)
+            print(f"🔄 Personality '{self.personality_mode}' reloaded")
+    
+    def speak(self, text, kind='other'):
+        """Queue text on the speech thread (returns at once, never waits on audio)"""
         print(f"🔊 {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
+        get_speech_service().say(text, kind, rate=self.voice_rate, channel=id(self))
     
     def capture_screen(self, region=None):
         """Capture screen or region"""
+        from PIL import ImageGrab
+        
         try:
             if region:
                 screenshot = ImageGrab.grab(bbox=region)
@@ -133,8 +226,11 @@ Keep commentary concise (1-2 sentences max)."""
     
     def detect_screen_change(self, current_screenshot):
         """Detect if screen has changed significantly"""
+        import numpy as np
+        from PIL import ImageChops
+        
         if self.last_screenshot is None:
-            self.last_screenshot = current_screenshot
+            self.last_screenshot = current_screenshot.resize(self.compare_size)
             self.last_screenshot_hash = self.calculate_image_hash(current_screenshot)
             return True, 100.0  # First run always triggers
         
@@ -145,34 +241,51 @@ Keep commentary concise (1-2 sentences max)."""
         
         # If hash differs, calculate actual difference
         try:
-            # Resize for faster comparison
-            size = (400, 300)
-            img1 = self.last_screenshot.resize(size)
-            img2 = current_screenshot.resize(size)
-            
-            # Calculate difference
-            diff = ImageChops.difference(img1, img2)
-            diff_array = np.array(diff)
-            
-            # Calculate percentage of changed pixels
-            changed_pixels = np.sum(diff_array > 20)  # Threshold for "changed"
-            total_pixels = diff_array.size
-            change_percentage = (changed_pixels / total_pixels) * 100
+            if self.learn_animation and self.animation_mask is None:
+                from animation_mask import AnimationMask
+                self.animation_mask = AnimationMask(size=self.compare_size)
+            mask = self.animation_mask if self.learn_animation else None
+            if mask is not None:
+                # Learn what is always moving, then score only the static tiles
+                frame = mask.prepare(current_screenshot)
+                mask.observe(frame)
+                if mask.reference is None:
+                    mask.reference = mask.prepare(self.last_screenshot)
+                change_percentage = mask.score(frame, mask.reference)
+                diff = None
+            else:
+                # Resize for faster comparison
+                img1 = self.last_screenshot
+                img2 = current_screenshot.resize(self.compare_size)
+                
+                # Calculate difference
+                diff = ImageChops.difference(img1, img2)
+                diff_array = np.array(diff)
+                
+                # Calculate percentage of changed pixels
+                changed_pixels = np.sum(diff_array > 20)  # Threshold for "changed"
+                total_pixels = diff_array.size
+                change_percentage = (changed_pixels / total_pixels) * 100
             
             if self.debug_mode:
                 print(f"📊 Change detected: {change_percentage:.2f}% of pixels changed")
             
             # Update last screenshot if significant change
             if change_percentage >= self.change_threshold:
-                self.last_screenshot = current_screenshot
+                self.last_screenshot = current_screenshot.resize(self.compare_size)
                 self.last_screenshot_hash = current_hash
+                if mask is not None:
+                    mask.reference = frame
                 self.stats['changes_detected'] += 1
                 
                 # Save change image if debug
                 if self.debug_mode:
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    current_screenshot.save(f'debug_screenshots/change_{timestamp}.png')
-                    diff.save(f'debug_screenshots/diff_{timestamp}.png')
+                    save_debug_image(current_screenshot, f'change_{timestamp}.png')
+                    if diff is not None:
+                        save_debug_image(diff, f'diff_{timestamp}.png')
+                    else:
+                        save_debug_image(mask.mask_image(), f'mask_{timestamp}.png')
                 
                 return True, change_percentage
             
@@ -183,10 +296,60 @@ Keep commentary concise (1-2 sentences max)."""
                 print(f"⚠️  Error in change detection: {e}")
             return True, 0.0  # Assume change on error
     
+    def set_compare_size(self, size):
+        """Change the diff resolution (restarts the animation mask at the new size)"""
+        size = tuple(size)
+        if size == self.compare_size:
+            return
+        self.compare_size = size
+        self.animation_mask = None
+        if self.last_screenshot is not None:
+            self.last_screenshot = self.last_screenshot.resize(size)
+    
+    def classify_scene(self, screenshot):
+        """Label a changed frame; True if it is worth OCRing
+
+        Menus, flyovers and the scorecard are counted in stats['ocr_skipped'].
+        """
+        if not self.classify_scenes:
+            self.scene = None
+            return True
+        from scene_classifier import GAMEPLAY_SCENES, SceneClassifier
+        if self.scene_classifier is None:
+            self.scene_classifier = SceneClassifier()
+        
+        with self.state_lock:
+            first_shot = None
+            if self.game_state['current_hole']:
+                first_shot = self.game_state['shots_on_hole'] == 0
+        self.scene = self.scene_classifier.classify(screenshot, first_shot=first_shot)
+        if self.scene in GAMEPLAY_SCENES:
+            return True
+        self.stats['ocr_skipped'] += 1
+        if self.debug_mode:
+            print(f"🎬 Scene: {self.scene} - skipping OCR")
+        return False
+    
     def ocr_screen(self, screenshot):
         """Perform OCR on screenshot"""
         try:
-            text = pytesseract.image_to_string(screenshot)
+            if self.hud is not None:
+                # Only the learned HUD regions (full frame while calibrating),
+                # narrowed to the fields this scene shows
+                from hud_calibration import FIELD_PATTERNS
+                from scene_classifier import SCENE_FIELDS
+                fields = SCENE_FIELDS.get(self.scene)
+                if self.max_ocr_regions:
+                    # CPU governor: only the most important fields, but never
+                    # drop hole_info - a missed hole change sticks
+                    fields = tuple(fields or FIELD_PATTERNS)[:self.max_ocr_regions]
+                    if 'hole_info' not in fields:
+                        fields += ('hole_info',)
+                text = self.hud.read(screenshot, fields)
+                self.hud.report(screenshot.size, bool(self.extract_observations(text)))
+            else:
+                # Under a CPU budget the governor caps the bands (ocr_pool.limit_bands)
+                text = ocr_text(screenshot, bands=self.ocr_bands)
             if self.debug_mode:
                 print("\n" + "="*50)
                 print("📝 OCR OUTPUT:")
@@ -197,58 +360,197 @@ Keep commentary concise (1-2 sentences max)."""
             print(f"OCR error: {e}")
             return ""
     
+    def extract_observations(self, text):
+        """Pull raw field values (strings) out of OCR text"""
+        observations = {}
+        
+        # Distance
+        distance_match = re.search(r'(\d{1,3})\s*(?:yards?|yds?|Y)', text, re.IGNORECASE)
+        if distance_match:
+            observations['distance'] = distance_match.group(1)
+        
+        # Hole
+        hole_match = re.search(r'hole[:\s]*(\d{1,2})', text, re.IGNORECASE)
+        if hole_match:
+            observations['hole'] = hole_match.group(1)
+        
+        # Par
+        par_match = re.search(r'par[:\s]*(\d)', text, re.IGNORECASE)
+        if par_match:
+            observations['par'] = par_match.group(1)
+        
+        # Wind
+        wind_match = re.search(r'(\d{1,2})\s*mph', text, re.IGNORECASE)
+        if wind_match:
+            observations['wind'] = wind_match.group(1)
+        
+        return observations
+    
     def parse_game_state(self, text):
         """Extract game information from OCR text"""
+        observations = self.extract_observations(text)
+        
+        # Fields a live data feed is providing are not taken from OCR
+        for field in self.feed_fields:
+            observations.pop(field, None)
+        
+        return self.apply_observations(observations)
+    
+    def apply_observations(self, observations):
+        """Update game state from observed field values; returns the changes"""
+        with self.state_lock:
+            changes = self._apply_observations(observations)
+            if changes and self.journal is not None:
+                self.journal.append('state', changes=changes,
+                                    game_state=self.game_state, stats=self.stats)
+        if self._finished_rounds:
+            self.save_rounds()
+        return changes
+    
+    def current_hole_record(self):
+        """hole_history entry for the hole being played"""
+        gs = self.game_state
+        return {
+            'hole': gs['current_hole'],
+            'shots': gs['shots_on_hole'],
+            'par': gs['current_par'],
+            'started': gs['hole_started'],
+            'ended': time.time(),
+            'distances': list(gs['hole_distances']),
+        }
+    
+    def round_record(self, ended=None, in_progress=True):
+        """The round so far: its holes (plus the one being played) and stats since it began"""
+        gs = self.game_state
+        ended = ended or time.time()
+        holes = list(gs['hole_history'])
+        if in_progress and gs['current_hole']:
+            holes.append(self.current_hole_record())
+        base = gs['round_base']
+        started = (gs['round_started'] or (holes[0].get('started') if holes else None)
+                   or self.stats['start_time'])
+        return {'holes': holes, 'started': started, 'ended': ended,
+                'stats': {name: self.stats[name] - base.get(name, 0)
+                          for name in ROUND_COUNTERS if name in self.stats}}
+    
+    def _end_round(self, ended):
+        """Close the round whose last hole was just recorded and start the next"""
+        gs = self.game_state
+        if self.analytics is not None:
+            self._finished_rounds.append(self.round_record(ended, in_progress=False))
+        gs['hole_history'] = []
+        gs['round_started'] = ended
+        gs['round_base'] = {name: self.stats[name] for name in ROUND_COUNTERS
+                            if name in self.stats}
+    
+    def save_rounds(self, final=False):
+        """Write finished rounds to the analytics store (and the one in progress if final)"""
+        with self.state_lock:
+            rounds, self._finished_rounds = self._finished_rounds, []
+            if final:
+                rounds.append(self.round_record())
+        saved = 0
+        for record in rounds:
+            if self.analytics.add_round(record, bay=self.analytics_bay,
+                                        personality=self.personality_mode):
+                saved += 1
+        return saved
+    
+    def attach_journal(self, journal, resume=True):
+        """Journal committed changes; optionally resume the round it holds"""
+        self.journal = journal
+        recovered = journal.recovered
+        if resume and recovered['game_state']:
+            with self.state_lock:
+                self.game_state.update(recovered['game_state'])
+                if recovered['stats']:
+                    # Counters carry on; runtime is this process's, not the crashed one's
+                    started = self.stats['start_time']
+                    self.stats.update(recovered['stats'])
+                    self.stats['start_time'] = started
+            gs = self.game_state
+            print(f"📓 Resumed round: hole {gs['current_hole'] or '?'}, "
+                  f"{gs['current_distance'] or '?'} yards, "
+                  f"{recovered['announcements']} announcements so far")
+        elif not resume:
+            journal.new_round()
+    
+    def _apply_observations(self, observations):
         changes = []
         
+        # Club in hand (no announcement of its own, used for shot context)
+        if observations.get('club'):
+            self.game_state['current_club'] = observations['club']
+        
         # Distance
-        distance_match = re.search(r'(\d{1,3})\s*(?:yards?|yds?|Y)', text, re.IGNORECASE)
-        if distance_match:
-            new_distance = distance_match.group(1)
+        new_distance = observations.get('distance')
+        if new_distance:
             if new_distance != self.game_state['current_distance']:
                 self.game_state['last_distance'] = self.game_state['current_distance']
                 self.game_state['current_distance'] = new_distance
+                distances = self.game_state['hole_distances']
+                distances.append(int(new_distance))
+                del distances[:-MAX_HOLE_DISTANCES]
                 changes.append(('distance', new_distance))
         
         # Hole
-        hole_match = re.search(r'hole[:\s]*(\d{1,2})', text, re.IGNORECASE)
-        if hole_match:
-            new_hole = hole_match.group(1)
+        new_hole = observations.get('hole')
+        if new_hole:
             if new_hole != self.game_state['current_hole']:
-                if self.game_state['current_hole']:
-                    self.game_state['hole_history'].append({
-                        'hole': self.game_state['current_hole'],
-                        'shots': self.game_state['shots_on_hole']
-                    })
+                old_hole = self.game_state['current_hole']
+                if old_hole:
+                    record = self.current_hole_record()
+                    if changes and changes[0][0] == 'distance':
+                        # That distance belongs to the new hole
+                        record['distances'] = record['distances'][:-1]
+                    history = self.game_state['hole_history']
+                    history.append(record)
+                    del history[:-MAX_HOLE_HISTORY]
+                    # Hole number went back (hole 1 after 18, or a restart) - new round
+                    if _hole_number(new_hole) < _hole_number(old_hole):
+                        self._end_round(record['ended'])
                 self.game_state['current_hole'] = new_hole
                 self.game_state['shots_on_hole'] = 0
+                self.game_state['last_shot'] = None
+                self.game_state['hole_started'] = time.time()
+                # The distance read alongside the new hole is its tee distance
+                self.game_state['hole_distances'] = (
+                    [int(new_distance)] if new_distance else []
+                )
                 changes.append(('hole', new_hole))
         
         # Par
-        par_match = re.search(r'par[:\s]*(\d)', text, re.IGNORECASE)
-        if par_match:
-            new_par = par_match.group(1)
+        new_par = observations.get('par')
+        if new_par:
             if new_par != self.game_state['current_par']:
                 self.game_state['current_par'] = new_par
                 changes.append(('par', new_par))
         
         # Wind
-        wind_match = re.search(r'(\d{1,2})\s*mph', text, re.IGNORECASE)
-        if wind_match:
-            new_wind = wind_match.group(1)
+        new_wind = observations.get('wind')
+        if new_wind:
             if new_wind != self.game_state['wind_speed']:
                 self.game_state['wind_speed'] = new_wind
                 if int(new_wind) >= 10:  # Only announce significant wind
                     changes.append(('wind', new_wind))
         
-        # Detect shot (distance changed significantly)
-        if (self.game_state['current_distance'] and 
-            self.game_state['last_distance']):
+        # Shot reported directly by a launch monitor feed
+        if observations.get('shot'):
+            self.game_state['shots_on_hole'] += 1
+            self.game_state['last_shot'] = observations['shot']
+            changes.append(('shot', self.game_state['shots_on_hole']))
+        
+        # Detect shot (distance changed significantly) - unless a feed reports shots
+        elif ('shot' not in self.feed_fields and
+              self.game_state['current_distance'] and 
+              self.game_state['last_distance']):
             try:
                 dist_change = abs(int(self.game_state['current_distance']) - 
                                 int(self.game_state['last_distance']))
                 if dist_change > 20:
                     self.game_state['shots_on_hole'] += 1
+                    # No launch monitor numbers for this one
+                    self.game_state['last_shot'] = None
                     changes.append(('shot', self.game_state['shots_on_hole']))
             except:
                 pass
@@ -280,31 +582,81 @@ Keep commentary concise (1-2 sentences max)."""
             
             elif change_type == 'wind':
                 context_parts.append(f"Wind: {value} mph")
+            
+            elif change_type == 'shot' and gs['last_shot']:
+                # Launch monitor data from the GSPro Connect feed
+                shot = gs['last_shot']
+                msg = f"Shot #{value}"
+                if gs['current_club']:
+                    msg += f" with {gs['current_club']}"
+                details = []
+                if shot.get('ball_speed'):
+                    details.append(f"{shot['ball_speed']:.0f} mph ball speed")
+                if shot.get('launch_angle'):
+                    details.append(f"{shot['launch_angle']:.1f}° launch")
+                if shot.get('total_spin'):
+                    details.append(f"{shot['total_spin']:.0f} rpm spin")
+                if shot.get('carry'):
+                    details.append(f"{shot['carry']:.0f} yards carry")
+                if shot.get('club_speed'):
+                    details.append(f"{shot['club_speed']:.0f} mph club speed")
+                if details:
+                    msg += ": " + ", ".join(details)
+                context_parts.append(msg)
         
         if not context_parts:
             return None
         
-        context = "Golf situation: " + ". ".join(context_parts)
-        context += "\n\nProvide brief announcer commentary (1-2 sentences max). Be entertaining."
-        
-        return context
+        # Style instructions are part of the cached system prompt
+        return "Golf situation: " + ". ".join(context_parts)
     
-    def generate_commentary(self, context):
-        """Generate AI commentary"""
+    def generate_commentary(self, context, kind='other'):
+        """Generate AI commentary on the model tier routed for this announcement class"""
         if not context:
             return None
         
+        # Apply any personality edits made since the last announcement
+        self.refresh_personality()
+        
+        # Common situations come from the bank with the live numbers filled in
+        if self.bank is not None:
+            with self.state_lock:
+                banked = self.bank.lookup(self.personality_prompt, kind, self.game_state)
+            if banked:
+                self.stats['bank_hits'] += 1
+                if self.debug_mode:
+                    print(f"\n📚 Bank: {banked}\n")
+                return banked
+        
+        # Identical situations (e.g. across bays) can reuse a recent line
+        if self.commentary_cache is not None:
+            cached = self.commentary_cache.get(self.personality_prompt, context)
+            if cached:
+                self.stats['cache_hits'] += 1
+                return cached
+        
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=150,
-                temperature=0.8,
-                system=self.personality_prompt,
-                messages=[{"role": "user", "content": context}]
-            )
+            max_tokens = self.token_policy.max_tokens(self.telemetry)
+            with self.router.slot(kind) as tier:
+                start = time.perf_counter()
+                message = self.client.messages.create(
+                    **commentary_request(self.personality_prompt, context,
+                                         model=tier.model, max_tokens=max_tokens,
+                                         course_context=self.course_context)
+                )
+                latency = time.perf_counter() - start
             
             self.stats['api_calls_made'] += 1
+            self.router.record(tier, message, latency)
+            self.telemetry.record(message, latency)
+            self.telemetry.publish(self.stats)
+            self.token_policy.update(self.telemetry)
             commentary = message.content[0].text.strip()
+            if getattr(message, 'stop_reason', None) == 'max_tokens':
+                commentary = trim_to_sentence(commentary)
+            
+            if self.commentary_cache is not None:
+                self.commentary_cache.put(self.personality_prompt, context, commentary)
             
             if self.debug_mode:
                 print(f"\n🤖 AI: {commentary}\n")
@@ -315,6 +667,57 @@ Keep commentary concise (1-2 sentences max)."""
             print(f"❌ AI error: {e}")
             return None
     
+    def handle_ocr_text(self, text, speak=True):
+        """Parse OCR text, then generate (and optionally speak) commentary"""
+        # Parse what changed
+        changes = self.parse_game_state(text)
+        return self.announce_changes(changes, speak=speak)
+    
+    def announce_changes(self, changes, speak=True, context=None):
+        """Generate (and optionally speak) commentary for game state changes"""
+        if not changes:
+            return None
+        
+        print(f"📋 Changes: {changes}")
+        if any(kind == 'shot' for kind, _ in changes):
+            self.token_policy.note_shot()
+        
+        # Build context and generate commentary
+        with self.state_lock:
+            launch = self.game_state['last_shot']
+        if context is None:
+            context = self.build_context_from_changes(changes)
+        self.last_speech_kind = speech_kind(changes)
+        commentary = self.generate_commentary(context, self.last_speech_kind)
+        if launch is not None and any(kind == 'shot' for kind, _ in changes):
+            # Those launch numbers are said - don't attach them to the next shot
+            with self.state_lock:
+                if self.game_state['last_shot'] is launch:
+                    self.game_state['last_shot'] = None
+        if commentary and self.journal is not None:
+            self.journal.append('announce', changes=changes, text=commentary,
+                                stats=self.stats)
+        if commentary and speak:
+            self.speak(commentary, self.last_speech_kind)
+        return commentary
+    
+    def wait_for_feed(self, timeout):
+        """Sleep until the next check, announcing feed changes as they arrive"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                item = self.feed_changes.get(timeout=remaining)
+            except queue.Empty:
+                return
+            if item is None:
+                return  # Woken for staged control changes
+            changes, context = item
+            print("\n📡 GSPro Connect")
+            self.announce_changes(changes, context=context)
+    
     def print_stats(self):
         """Print efficiency statistics"""
         runtime = time.time() - self.stats['start_time']
@@ -327,7 +730,29 @@ Keep commentary concise (1-2 sentences max)."""
         print(f"📸 Screenshots: {self.stats['screenshots_taken']}")
         print(f"🎯 Changes detected: {self.stats['changes_detected']}")
         print(f"🤖 API calls: {self.stats['api_calls_made']}")
-        print(f"💰 Estimated cost: ${self.stats['api_calls_made'] * 0.0001:.4f}")
+        for line in self.telemetry.report() + self.router.report():
+            print(line)
+        if self.bank is not None:
+            print(f"📚 Bank hits: {self.stats['bank_hits']} "
+                  f"(vs {self.stats['api_calls_made']} API calls)")
+        if self.token_policy.slo_p95 is not None:
+            print(f"🎚️  max_tokens: {self.token_policy.budget} of {self.token_policy.base} "
+                  f"(p95 SLO {self.token_policy.slo_p95:g}s)")
+        if self.scene_classifier is not None:
+            seen = ", ".join(f"{scene} {count}"
+                             for scene, count in self.scene_classifier.counts.items() if count)
+            print(f"🎬 Scenes: {seen or 'none'} ({self.stats['ocr_skipped']} OCR passes skipped)")
+        if self.governor is not None:
+            print(f"🖥️  CPU: {self.stats.get('cpu_percent', 0.0):.1f}% of one core "
+                  f"(budget {self.governor.budget * 100:g}%), level {self.governor.level}, "
+                  f"{self.governor.changes} adjustment(s)")
+        stages = self.timings.report()
+        if stages:
+            print("⏲️  Stages (p50/p95 ms): " + ", ".join(
+                f"{name} {t['p50_ms']:g}/{t['p95_ms']:g}" for name, t in stages.items()))
+        if self.animation_mask is not None:
+            print(f"🌊 Animated screen masked: {self.animation_mask.masked_fraction() * 100:.1f}% "
+                  f"({self.animation_mask.frames} frames learned)")
         
         if self.stats['screenshots_taken'] > 0:
             trigger_rate = (self.stats['changes_detected'] / 
@@ -350,41 +775,46 @@ Keep commentary concise (1-2 sentences max)."""
         print("⌨️  Press Ctrl+C to stop")
         print("="*60 + "\n")
         
+        self.check_interval = check_interval
+        timings = self.timings
         try:
             while True:
+                # Settings changed through the control server take effect here
+                if self.control is not None:
+                    self.control.apply_pending()
+                frame_start = time.perf_counter()
+                
                 # Capture screen
-                screenshot = self.capture_screen()
+                with timings.stage('capture'):
+                    screenshot = self.capture_screen(self.capture_region)
                 if screenshot is None:
-                    time.sleep(check_interval)
+                    self.wait_for_feed(self.check_interval * self.interval_scale)
                     continue
                 
                 # Check if screen changed
-                changed, change_pct = self.detect_screen_change(screenshot)
+                with timings.stage('diff'):
+                    changed, change_pct = self.detect_screen_change(screenshot)
                 
                 if changed:
                     print(f"\n🎯 TRIGGER! Screen changed {change_pct:.1f}%")
                     
-                    # Perform OCR only on change
-                    text = self.ocr_screen(screenshot)
-                    
-                    # Parse what changed
-                    changes = self.parse_game_state(text)
-                    
-                    if changes:
-                        print(f"📋 Changes: {changes}")
-                        
-                        # Build context and generate commentary
-                        context = self.build_context_from_changes(changes)
-                        if context:
-                            commentary = self.generate_commentary(context)
-                            if commentary:
-                                self.speak(commentary)
+                    # Perform OCR only on change, and only on gameplay screens
+                    with timings.stage('scene'):
+                        gameplay = self.classify_scene(screenshot)
+                    if gameplay:
+                        with timings.stage('ocr'):
+                            text = self.ocr_screen(screenshot)
+                        with timings.stage('announce'):
+                            self.handle_ocr_text(text)
                 else:
                     # No change - just wait
                     if self.debug_mode:
                         print(".", end="", flush=True)
+                timings.record('frame', time.perf_counter() - frame_start)
                 
-                time.sleep(check_interval)
+                if self.governor is not None:
+                    self.governor.update()
+                self.wait_for_feed(self.check_interval * self.interval_scale)
                 
         except KeyboardInterrupt:
             print("\n\n⛳ Stopping AI Announcer...")
@@ -395,17 +825,7 @@ Keep commentary concise (1-2 sentences max)."""
 def main():
     """Entry point"""
     import argparse
-    
-    # Load available personalities
-    available_modes = ['normal', 'smartass', 'hype', 'zen', 'pirate', 'british']
-    
-    if os.path.exists('personalities.json'):
-        try:
-            with open('personalities.json', 'r') as f:
-                data = json.load(f)
-                available_modes = list(data.get('personalities', {}).keys())
-        except:
-            pass
+    from startup_profile import StartupProfiler
     
     parser = argparse.ArgumentParser(
         description='GSPro Trigger-Based AI Announcer - Efficient commentary',
@@ -420,12 +840,12 @@ Examples:
   python gspro_ai_trigger.py --mode smartass
   python gspro_ai_trigger.py --mode hype --threshold 3.0
   python gspro_ai_trigger.py --mode zen --interval 0.5 --debug
+  python gspro_ai_trigger.py --gspro-relay 9211   (connector -> :9211 -> GSPro :921)
         """
     )
     
     parser.add_argument('--mode', type=str, default='normal',
-                        choices=available_modes,
-                        help='Announcer personality mode')
+                        help='Announcer personality mode (see personalities.json)')
     parser.add_argument('--debug', action='store_true',
                         help='Enable debug mode')
     parser.add_argument('--interval', type=float, default=1.0,
@@ -434,31 +854,167 @@ Examples:
                         help='Change threshold percentage (default: 5.0)')
     parser.add_argument('--api-key', type=str,
                         help='Anthropic API key')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print startup phase timings')
+    parser.add_argument('--gspro-connect', type=str, metavar='HOST:PORT',
+                        help='Read ball/club data from a GSPro Connect message stream')
+    parser.add_argument('--gspro-relay', type=int, metavar='PORT',
+                        help='Relay the launch monitor connector to GSPro and read its shot data')
+    parser.add_argument('--gspro-upstream', type=str, default='127.0.0.1:921',
+                        help='GSPro Open Connect address for --gspro-relay (default: 127.0.0.1:921)')
+    parser.add_argument('--cpu-budget', type=float, metavar='PCT',
+                        help='Stay under PCT%% of one core (adapts capture rate, diff size, '
+                             'OCR regions) and run at below-normal priority')
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS,
+                        help=f'Commentary length budget (default: {DEFAULT_MAX_TOKENS})')
+    parser.add_argument('--latency-slo', type=float, metavar='SECONDS',
+                        help='Shrink max_tokens while p95 API latency is above this')
+    parser.add_argument('--bank', type=str, metavar='FILE',
+                        help='Pre-generated commentary bank (commentary_bank.py) for common situations')
+    parser.add_argument('--scene-filter', action='store_true',
+                        help='Skip OCR on frames labelled menu, flyover or scorecard '
+                             '(check the labels with scene_classifier.py first)')
+    parser.add_argument('--no-animation-mask', action='store_true',
+                        help='Score every pixel instead of masking learned animated areas')
+    parser.add_argument('--hud', action='store_true',
+                        help='OCR only learned HUD regions (auto-calibrates per resolution)')
+    parser.add_argument('--hud-profiles', type=str, default='hud_profiles.json',
+                        help='HUD region profiles file (default: hud_profiles.json)')
+    parser.add_argument('--ocr-bands', type=int, metavar='N',
+                        help='Split full-screen OCR into N bands read in parallel '
+                             '(default: by frame height and cores, 1 = off)')
+    parser.add_argument('--control', type=int, metavar='PORT',
+                        help='Serve live stats and runtime settings on localhost:PORT')
+    parser.add_argument('--course', type=str, metavar='TEXT',
+                        help='Course being played, e.g. "Pebble Beach, links, windy"')
+    parser.add_argument('--journal', type=str, metavar='FILE',
+                        help='Session journal - resume the round after a crash or restart')
+    parser.add_argument('--new-round', action='store_true',
+                        help='Start a new round instead of resuming the journal')
+    parser.add_argument('--analytics', type=str, metavar='DIR',
+                        help='Add each round to this shot analytics store as it finishes')
+    llm_transport.add_transport_arguments(parser)
+    model_router.add_router_arguments(parser)
     
     args = parser.parse_args()
+    llm_transport.configure_from_args(args)
+    try:
+        model_router.configure_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Validate the mode here rather than via argparse choices, so --help
+    # doesn't have to read personalities.json
+    available_modes = get_registry().names()
+    if args.mode not in available_modes:
+        parser.error(f"argument --mode: invalid choice: '{args.mode}' "
+                     f"(choose from {', '.join(available_modes)})")
     
     # Check for API key
-    if not args.api_key and not os.environ.get("ANTHROPIC_API_KEY"):
+    if (llm_transport.requires_api_key() and
+            not args.api_key and not os.environ.get("ANTHROPIC_API_KEY")):
         print("❌ Error: Anthropic API key required!")
         print("\nSet it via:")
         print("  export ANTHROPIC_API_KEY='your-key'")
         print("\nGet your key at: https://console.anthropic.com/")
         return
     
+    profiler = StartupProfiler() if args.profile_startup else None
+    
+    # Open the API connection and load TTS voices while we set up
+    warm_up_thread = warm_up(args.api_key)
+    
     # Initialize
-    announcer = TriggerBasedAnnouncer(
-        personality_mode=args.mode,
-        debug_mode=args.debug,
-        api_key=args.api_key
-    )
+    with profiler.phase('construct announcer') if profiler else nullcontext():
+        announcer = TriggerBasedAnnouncer(
+            personality_mode=args.mode,
+            debug_mode=args.debug,
+            api_key=args.api_key
+        )
+    
+    # Pick up where a crashed or restarted session left off
+    journal = None
+    if args.journal:
+        from session_journal import SessionJournal
+        with profiler.phase('replay journal') if profiler else nullcontext():
+            journal = SessionJournal(args.journal)
+            announcer.attach_journal(journal, resume=not args.new_round)
+    
+    if profiler:
+        profiler.wait_for('background warm-up done', warm_up_thread)
+        profiler.report()
+    
+    # Ball data from GSPro Connect instead of OCR
+    if args.gspro_connect or args.gspro_relay:
+        from gspro_connect import ConnectFeed, parse_address
+        ConnectFeed(
+            announcer,
+            tap=parse_address(args.gspro_connect) if args.gspro_connect else None,
+            relay_port=args.gspro_relay,
+            upstream=parse_address(args.gspro_upstream)
+        ).start()
+    
+    if args.course:
+        announcer.course_context = args.course
+    
+    if args.bank:
+        from commentary_bank import CommentaryBank
+        announcer.bank = CommentaryBank.load(args.bank)
+        covered = announcer.bank.covers(announcer.personality_prompt)
+        print(f"📚 Commentary bank: {args.bank}"
+              f"{'' if covered else ' (not built for this personality - live AI only)'}")
+    
+    if args.no_animation_mask:
+        announcer.learn_animation = False
+    
+    if args.scene_filter:
+        announcer.classify_scenes = True
+    
+    announcer.token_policy = TokenPolicy(base=args.max_tokens, slo_p95=args.latency_slo)
+    if args.latency_slo:
+        print(f"⏱️  Latency SLO: p95 {args.latency_slo:g}s (max_tokens {args.max_tokens} and down)")
+    
+    if args.cpu_budget:
+        from cpu_governor import CpuGovernor, lower_priority
+        announcer.governor = CpuGovernor(args.cpu_budget / 100, announcers=[announcer])
+        # Tesseract runs as a child process and inherits this
+        lowered = lower_priority()
+        print(f"🖥️  CPU budget: {args.cpu_budget:g}% of one core"
+              f"{' (below-normal priority)' if lowered else ''}")
+    
+    if args.hud:
+        from hud_calibration import HudCalibrator
+        announcer.hud = HudCalibrator(args.hud_profiles, bands=args.ocr_bands)
+        print(f"📐 HUD regions: {args.hud_profiles} "
+              f"({len(announcer.hud.profiles)} resolution profile(s) saved)")
+    
+    announcer.ocr_bands = args.ocr_bands
     
     # Set threshold if specified
     if args.threshold:
         announcer.change_threshold = args.threshold
         print(f"🎯 Change threshold set to: {args.threshold}%")
     
+    if args.analytics:
+        from shot_analytics import AnalyticsStore
+        announcer.analytics = AnalyticsStore(args.analytics)
+    
+    if args.control:
+        from control_server import ControlServer
+        announcer.control = ControlServer(announcer, args.control).start()
+        print(f"🎛️  Control: http://127.0.0.1:{args.control}/stats (POST /config to tune)")
+    
     # Run
-    announcer.run(check_interval=args.interval)
+    try:
+        announcer.run(check_interval=args.interval)
+    finally:
+        if journal:
+            try:
+                journal.close()
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Journal not saved: {e}")
+        if announcer.analytics is not None and announcer.save_rounds(final=True):
+            print(f"📊 Round saved to {args.analytics}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,330 @@
+"""
+GSPro Connect shot-data ingest - take ball and club data straight from the
+GSPro Open Connect JSON stream instead of reading it off the screen
+
+Launch monitor connectors send shot messages to GSPro (TCP port 921) and GSPro
+answers with player information (club, distance to target). The feed turns
+those into the same observations OCR produces, so the announcer only needs
+OCR for fields the feed doesn't carry (hole, par, wind).
+
+Two ways to listen:
+  tap    connect to HOST:PORT and read a stream of Connect messages
+         (a relay that mirrors the traffic, or the fake server below)
+  relay  sit between the launch monitor connector and GSPro: the connector
+         points at --relay PORT, traffic is forwarded to GSPro unchanged and
+         a copy of every message is parsed (and optionally recorded)
+
+Examples:
+  python gspro_connect.py --fake-server shots.jsonl --port 9210 --loop
+  python gspro_connect.py --tap 127.0.0.1:9210
+  python gspro_connect.py --relay 9211 --upstream 127.0.0.1:921 --record shots.jsonl
+  python gspro_ai_trigger.py --gspro-connect 127.0.0.1:9210
+"""
+
+import json
+import socket
+import threading
+import time
+
+# Fields the feed supplies once it's connected - OCR values for these are ignored
+FEED_FIELDS = frozenset({'distance', 'shot', 'club'})
+
+_decoder = json.JSONDecoder()
+
+
+def parse_connect_message(message):
+    """Turn one Open Connect message into announcer observations ({} if none)"""
+    observations = {}
+
+    # GSPro -> connector: player information after each shot / club change
+    player = message.get('Player')
+    if message.get('Code') == 201 and isinstance(player, dict):
+        if player.get('DistanceToTarget') is not None:
+            observations['distance'] = str(int(round(player['DistanceToTarget'])))
+        if player.get('Club'):
+            observations['club'] = player['Club']
+
+    # Connector -> GSPro: shot data (heartbeats carry no shot)
+    options = message.get('ShotDataOptions') or {}
+    ball = message.get('BallData') or {}
+    if (ball and options.get('ContainsBallData', True)
+            and not options.get('IsHeartBeat', False)):
+        shot = {
+            'shot_number': message.get('ShotNumber'),
+            'ball_speed': ball.get('Speed'),
+            'launch_angle': ball.get('VLA'),
+            'direction': ball.get('HLA'),
+            'total_spin': ball.get('TotalSpin'),
+            'spin_axis': ball.get('SpinAxis'),
+            'carry': ball.get('CarryDistance'),
+        }
+        club = message.get('ClubData') or {}
+        if club and options.get('ContainsClubData', True):
+            shot['club_speed'] = club.get('Speed')
+            shot['club_path'] = club.get('Path')
+            shot['face_to_target'] = club.get('FaceToTarget')
+        observations['shot'] = shot
+
+    return observations
+
+
+def iter_messages(sock, tap=None):
+    """Yield JSON objects from a socket carrying back-to-back Connect messages
+
+    Connectors don't delimit messages, so objects are split with raw_decode.
+    tap, if given, receives every raw chunk before it is parsed.
+    """
+    buffer = ''
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return
+        if tap:
+            tap(chunk)
+        buffer += chunk.decode('utf-8', errors='replace')
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            try:
+                message, end = _decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if len(buffer) > 1 << 20:
+                    buffer = ''  # Garbage - resync on the next object
+                break  # Incomplete object - wait for more data
+            buffer = buffer[end:]
+            if isinstance(message, dict):
+                yield message
+
+
+class ConnectFeed:
+    """Background ingest of GSPro Connect messages into an announcer
+
+    Observations are applied to the announcer's game state on the feed thread;
+    the resulting changes are queued on announcer.feed_changes so commentary
+    and speech stay on the announcer's own loop. Without an announcer the
+    observations are just printed.
+    """
+
+    def __init__(self, announcer, tap=None, relay_port=None,
+                 upstream=('127.0.0.1', 921), record=None, reconnect_delay=2.0):
+        self.announcer = announcer
+        self.tap = tap
+        self.relay_port = relay_port
+        self.upstream = upstream
+        self.record_path = record
+        self.reconnect_delay = reconnect_delay
+        self.running = False
+        self._record_lock = threading.Lock()
+        self.stats = {'messages': 0, 'shots': 0, 'connections': 0}
+
+    def start(self):
+        """Start the feed thread"""
+        self.running = True
+        target = self._relay_loop if self.relay_port else self._tap_loop
+        thread = threading.Thread(target=target, name='gspro-connect', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.running = False
+
+    def _set_connected(self, connected):
+        """Hand the feed's fields over to (or back from) OCR"""
+        if self.announcer is None:
+            return
+        with self.announcer.state_lock:
+            self.announcer.feed_fields = FEED_FIELDS if connected else frozenset()
+            if not connected:
+                # The last launch numbers don't belong to shots OCR sees next
+                self.announcer.game_state['last_shot'] = None
+
+    def handle_message(self, message):
+        """Apply one Connect message to the announcer"""
+        self.stats['messages'] += 1
+        self._record(message)
+        observations = parse_connect_message(message)
+        if not observations:
+            return
+        if 'shot' in observations:
+            self.stats['shots'] += 1
+        if self.announcer is None:
+            print(observations)
+            return
+        announcer = self.announcer
+        with announcer.state_lock:
+            changes = announcer.apply_observations(observations)
+            # Build the context now - the state may move on before it's announced
+            context = announcer.build_context_from_changes(changes) if changes else None
+        if changes:
+            announcer.feed_changes.put((changes, context))
+
+    def _record(self, message):
+        if not self.record_path:
+            return
+        with self._record_lock:
+            with open(self.record_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(message) + "\n")
+
+    def _tap_loop(self):
+        """Connect to a Connect message stream, reconnecting if it drops"""
+        while self.running:
+            try:
+                with socket.create_connection(self.tap, timeout=5.0) as sock:
+                    sock.settimeout(None)
+                    self.stats['connections'] += 1
+                    self._set_connected(True)
+                    print(f"🔌 GSPro Connect feed: {self.tap[0]}:{self.tap[1]}")
+                    for message in iter_messages(sock):
+                        self.handle_message(message)
+                        if not self.running:
+                            break
+            except OSError:
+                pass
+            self._set_connected(False)
+            time.sleep(self.reconnect_delay)
+
+    def _relay_loop(self):
+        """Accept the launch monitor connector and forward it to GSPro"""
+        with socket.create_server(('127.0.0.1', self.relay_port)) as server:
+            print(f"🔌 GSPro Connect relay: :{self.relay_port} -> "
+                  f"{self.upstream[0]}:{self.upstream[1]}")
+            while self.running:
+                client, _ = server.accept()
+                try:
+                    gspro = socket.create_connection(self.upstream)
+                except OSError as e:
+                    print(f"⚠️  GSPro Connect relay: can't reach GSPro ({e})")
+                    client.close()
+                    continue
+                self.stats['connections'] += 1
+                self._set_connected(True)
+                # Connector -> GSPro carries shots, GSPro -> connector player info
+                back = threading.Thread(target=self._pump, args=(gspro, client),
+                                        daemon=True)
+                back.start()
+                self._pump(client, gspro)
+                back.join(timeout=1.0)
+                self._set_connected(False)
+
+    def _pump(self, source, destination):
+        """Forward bytes unchanged while parsing a copy of the stream"""
+        try:
+            for message in iter_messages(source, tap=destination.sendall):
+                self.handle_message(message)
+        except OSError:
+            pass
+        finally:
+            for sock in (source, destination):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                sock.close()
+
+
+class FakeConnectServer:
+    """Replays recorded Connect messages (JSONL) to every client that connects"""
+
+    def __init__(self, path, host='127.0.0.1', port=9210, interval=2.0, loop=False):
+        with open(path, 'r', encoding='utf-8') as f:
+            self.messages = [json.loads(line) for line in f if line.strip()]
+        self.interval = interval
+        self.loop = loop
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()
+
+    def _serve(self, sock):
+        try:
+            with sock:
+                while True:
+                    for message in self.messages:
+                        # No delimiter, like a real connector
+                        sock.sendall(json.dumps(message).encode('utf-8'))
+                        time.sleep(self.interval)
+                    if not self.loop:
+                        break
+        except OSError:
+            pass
+
+    def serve_forever(self):
+        while True:
+            sock, _ = self.server.accept()
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def start(self):
+        """Serve in the background (for tests and demos)"""
+        thread = threading.Thread(target=self.serve_forever, name='fake-gspro', daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.server.close()
+
+
+def parse_address(spec, default_host='127.0.0.1'):
+    """HOST:PORT (or just PORT) -> (host, port)"""
+    host, _, port = spec.rpartition(':')
+    return host or default_host, int(port)
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='GSPro Connect feed tools: fake server, tap and relay',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--fake-server', type=str, metavar='FILE',
+                        help='Replay recorded messages from a JSONL file')
+    parser.add_argument('--port', type=int, default=9210,
+                        help='Fake server port (default: 9210)')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Seconds between replayed messages (default: 2.0)')
+    parser.add_argument('--loop', action='store_true',
+                        help='Replay the recording forever')
+    parser.add_argument('--tap', type=str, metavar='HOST:PORT',
+                        help='Print observations from a Connect message stream')
+    parser.add_argument('--relay', type=int, metavar='PORT',
+                        help='Relay a launch monitor connector to GSPro and print observations')
+    parser.add_argument('--upstream', type=str, default='127.0.0.1:921',
+                        help='GSPro Open Connect address for --relay (default: 127.0.0.1:921)')
+    parser.add_argument('--record', type=str, metavar='FILE',
+                        help='Append relayed messages to a JSONL file')
+
+    args = parser.parse_args()
+
+    if args.fake_server:
+        server = FakeConnectServer(args.fake_server, port=args.port,
+                                   interval=args.interval, loop=args.loop)
+        print(f"🏌️  Fake GSPro Connect server on {server.address[0]}:{server.address[1]} "
+              f"({len(server.messages)} messages)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.close()
+        return
+
+    if not args.tap and not args.relay:
+        parser.error("one of --fake-server, --tap or --relay is required")
+
+    feed = ConnectFeed(
+        None,
+        tap=parse_address(args.tap) if args.tap else None,
+        relay_port=args.relay,
+        upstream=parse_address(args.upstream),
+        record=args.record
+    )
+    thread = feed.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        feed.stop()
+    print(f"📊 {feed.stats['messages']} messages, {feed.stats['shots']} shots")
+
+
+if __name__ == "__main__":
+    main()
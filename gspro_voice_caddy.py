@@ -3,30 +3,22 @@ GSPro Voice Caddy - OCR-based assistant
 Captures screen, reads text, and announces golf information via TTS
 """
 
-import pytesseract
-from PIL import ImageGrab, Image
-import pyttsx3
 import re
 import time
 import os
 from datetime import datetime
-
-# Configure Tesseract path for Windows
-# If Tesseract is installed in the default location, set the path
-if os.name == 'nt':  # Windows
-    tesseract_path = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
-    if os.path.exists(tesseract_path):
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+from shared_resources import get_tesseract, save_debug_image, warm_up
+from speech_service import get_speech_service
 
 class GSProVoiceCaddy:
     def __init__(self, debug_mode=False):
         """Initialize the voice caddy"""
         self.debug_mode = debug_mode
-        self.engine = pyttsx3.init()
         
         # Configure TTS voice (adjust speed and volume)
-        self.engine.setProperty('rate', 150)  # Speed of speech
-        self.engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
+        # The engine itself lives on the speech service's audio thread
+        self.voice_rate = 150  # Speed of speech
+        self.volume = 0.9  # Volume (0.0 to 1.0)
         
         # Track last announced values to avoid repeats
         self.last_distance = None
@@ -43,18 +35,21 @@ class GSProVoiceCaddy:
     def speak(self, text):
         """Speak text out loud"""
         print(f"🔊 Speaking: {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
+        service = get_speech_service()
+        service.say(text, rate=self.voice_rate, volume=self.volume)
+        service.wait()
     
     def capture_screen(self):
         """Capture the full screen"""
+        from PIL import ImageGrab
+        
         try:
             screenshot = ImageGrab.grab()
             
             # Save debug screenshot if enabled
             if self.debug_mode:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot.save(f'debug_screenshots/screen_{timestamp}.png')
+                save_debug_image(screenshot, f'screen_{timestamp}.png')
             
             return screenshot
         except Exception as e:
@@ -64,7 +59,7 @@ class GSProVoiceCaddy:
     def ocr_screen(self, screenshot):
         """Perform OCR on screenshot"""
         try:
-            text = pytesseract.image_to_string(screenshot)
+            text = get_tesseract().image_to_string(screenshot)
             
             if self.debug_mode:
                 print("\n" + "="*50)
@@ -224,6 +219,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Load TTS voices in the background while we start up
+    warm_up(client=False)
+    
     # Initialize and run
     caddy = GSProVoiceCaddy(debug_mode=args.debug)
     caddy.run(interval=args.interval)
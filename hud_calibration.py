@@ -0,0 +1,265 @@
+"""
+HUD auto-calibration - learn where GSPro draws distance, hole/par and wind
+Runs Tesseract's image_to_data on a few full frames, finds the word boxes of
+the HUD fields and saves them per resolution profile. Later sessions OCR only
+those regions, stacked into one small strip (one Tesseract call instead of
+a full-screen pass), and re-calibrate on their own when reads keep failing.
+
+Examples:
+  python hud_calibration.py --frames 5             (calibrate from live screens)
+  python hud_calibration.py --images tee.png green.png
+  python hud_calibration.py --list
+  python gspro_ai_trigger.py --hud
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from ocr_pool import data_to_text, line_words, ocr_data
+from shared_resources import get_tesseract
+
+DEFAULT_PROFILES = 'hud_profiles.json'
+
+# What each HUD region must contain, matched against one OCR line at a time
+FIELD_PATTERNS = {
+    'distance': re.compile(r'(\d{1,3})\s*(?:yards?|yds?|Y)\b', re.IGNORECASE),
+    'hole_info': re.compile(r'hole[:\s]*\d{1,2}|par[:\s]*\d', re.IGNORECASE),
+    'wind': re.compile(r'(\d{1,2})\s*mph', re.IGNORECASE),
+}
+
+
+def find_field_boxes(data):
+    """Boxes (x1, y1, x2, y2) of the words that matched each HUD field"""
+    boxes = {}
+    for words in line_words(data).values():
+        # Map character offsets in the joined line back to word indexes
+        text = ""
+        spans = []
+        for i in words:
+            if text:
+                text += " "
+            spans.append((len(text), len(text) + len(data['text'][i]), i))
+            text += data['text'][i]
+
+        for field, pattern in FIELD_PATTERNS.items():
+            for match in pattern.finditer(text):
+                hit = [i for start, end, i in spans
+                       if start < match.end() and end > match.start()]
+                box = (min(data['left'][i] for i in hit),
+                       min(data['top'][i] for i in hit),
+                       max(data['left'][i] + data['width'][i] for i in hit),
+                       max(data['top'][i] + data['height'][i] for i in hit))
+                boxes[field] = _union(boxes.get(field), box)
+    return boxes
+
+
+def _union(a, b):
+    if a is None:
+        return b
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def pad_box(box, size):
+    """Grow a word box so longer values (125 vs 9) still fit, clamped to the frame"""
+    x1, y1, x2, y2 = box
+    height = y2 - y1
+    pad_x, pad_y = 2 * height, max(4, height // 2)
+    return (max(0, x1 - pad_x), max(0, y1 - pad_y),
+            min(size[0], x2 + pad_x), min(size[1], y2 + pad_y))
+
+
+def profile_key(size):
+    """Resolution profile name for a frame size"""
+    return f"{size[0]}x{size[1]}"
+
+
+class HudCalibrator:
+    """Learned HUD regions per resolution, with automatic re-calibration
+
+    read() either OCRs the learned regions of the frame or, while a profile is
+    (re)calibrating, does a full-frame image_to_data pass that both returns the
+    text and collects word boxes. After calibration_frames frames in which every
+    field was seen, the regions are saved and used from the next frame on.
+    bands is passed to ocr_pool.ocr_data for the full-frame pass.
+    """
+
+    def __init__(self, path=DEFAULT_PROFILES, calibration_frames=3, max_failures=8,
+                 bands=None):
+        self.path = path
+        self.bands = bands
+        self.calibration_frames = calibration_frames
+        self.max_failures = max_failures
+        self.profiles = self.load()
+        self.samples = {}
+        self.failures = 0
+        self._lock = threading.Lock()
+        self.stats = {'region_reads': 0, 'full_reads': 0, 'calibrations': 0}
+
+    def load(self):
+        """Saved profiles ({} if none yet)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self):
+        """Write profiles atomically so a crash can't leave a half-written file"""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.profiles, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def regions_for(self, size):
+        """Learned regions for this resolution, or None if not calibrated"""
+        profile = self.profiles.get(profile_key(size))
+        return profile['regions'] if profile else None
+
+    def read(self, image, fields=None):
+        """OCR text for a frame - learned regions if available, else full frame
+
+        fields limits the region read to those HUD fields (None = all).
+        """
+        regions = self.regions_for(image.size)
+        if regions and fields:
+            regions = {name: box for name, box in regions.items() if name in fields} or regions
+        if regions:
+            self.stats['region_reads'] += 1
+            return self.read_regions(image, regions)
+        return self.calibration_pass(image)
+
+    def read_regions(self, image, regions):
+        """Stack the HUD regions into one strip and OCR it in a single call"""
+        from PIL import Image
+
+        crops = [image.crop(tuple(box)) for box in regions.values()]
+        gap = 10
+        width = max(c.width for c in crops)
+        height = sum(c.height for c in crops) + gap * (len(crops) + 1)
+        strip = Image.new('RGB', (width, height), (255, 255, 255))
+        y = gap
+        for crop in crops:
+            strip.paste(crop.convert('RGB'), (0, y))
+            y += crop.height + gap
+        return get_tesseract().image_to_string(strip, config='--psm 6')
+
+    def calibration_pass(self, image):
+        """Full-frame OCR that also collects HUD word boxes for this resolution"""
+        data = ocr_data(image, bands=self.bands)
+        self.stats['full_reads'] += 1
+        self.add_sample(image.size, find_field_boxes(data))
+        return data_to_text(data)
+
+    def add_sample(self, size, boxes):
+        """Add one frame's field boxes; save the profile once every field is covered"""
+        key = profile_key(size)
+        with self._lock:
+            samples = self.samples.setdefault(key, [])
+            if boxes:
+                samples.append(boxes)
+            found = set().union(*samples) if samples else set()
+            if len(samples) < self.calibration_frames:
+                return False
+            # Settle for the fields seen so far if one never shows (e.g. no wind)
+            if found != set(FIELD_PATTERNS) and len(samples) < 4 * self.calibration_frames:
+                return False
+
+            regions = {}
+            for field in sorted(found):
+                box = None
+                for sample in samples:
+                    if field in sample:
+                        box = _union(box, sample[field])
+                regions[field] = list(pad_box(box, size))
+
+            self.profiles[key] = {
+                'regions': regions,
+                'frames': len(samples),
+                'calibrated_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            self.samples[key] = []
+            self.failures = 0
+            self.stats['calibrations'] += 1
+            self.save()
+        print(f"📐 HUD calibrated for {key}: "
+              + ", ".join(f"{name} {box}" for name, box in regions.items()))
+        return True
+
+    def report(self, size, found_fields):
+        """Track region reads that found nothing; re-calibrate after too many"""
+        if not self.regions_for(size):
+            return
+        if found_fields:
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            print(f"📐 HUD reads failing ({self.failures} in a row) - re-calibrating "
+                  f"{profile_key(size)}")
+            with self._lock:
+                self.profiles.pop(profile_key(size), None)
+            self.failures = 0
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Learn GSPro HUD regions for faster, targeted OCR',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--frames', type=int, default=5,
+                        help='Live frames to capture (default: 5)')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Seconds between live captures (default: 2.0)')
+    parser.add_argument('--images', nargs='+', metavar='PNG',
+                        help='Calibrate from saved screenshots instead of the screen')
+    parser.add_argument('--profiles', type=str, default=DEFAULT_PROFILES,
+                        help=f'Profiles file (default: {DEFAULT_PROFILES})')
+    parser.add_argument('--list', action='store_true',
+                        help='Show saved profiles')
+
+    args = parser.parse_args()
+    calibrator = HudCalibrator(args.profiles, calibration_frames=1)
+
+    if args.list:
+        if not calibrator.profiles:
+            print("No HUD profiles saved yet")
+        for key, profile in calibrator.profiles.items():
+            print(f"{key} (calibrated {profile['calibrated_at']}, {profile['frames']} frames)")
+            for name, box in profile['regions'].items():
+                print(f"   {name:<10} {box}")
+        return
+
+    from PIL import Image, ImageGrab
+
+    # Start this resolution from scratch, using every frame given
+    calibrator.calibration_frames = len(args.images) if args.images else args.frames
+    for n in range(calibrator.calibration_frames):
+        if args.images:
+            image = Image.open(args.images[n]).convert('RGB')
+        else:
+            if n:
+                time.sleep(args.interval)
+            image = ImageGrab.grab()
+        if n == 0:
+            calibrator.profiles.pop(profile_key(image.size), None)
+        data = ocr_data(image)
+        boxes = find_field_boxes(data)
+        print(f"Frame {n + 1} ({profile_key(image.size)}): "
+              f"found {', '.join(sorted(boxes)) or 'nothing'}")
+        calibrator.add_sample(image.size, boxes)
+
+    if not calibrator.stats['calibrations']:
+        print("❌ Could not find every HUD field - try frames showing distance, "
+              "hole/par and wind")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Pluggable LLM transport for the announcers
+live   - talk to the Anthropic API (default)
+record - talk to the API and save every request/response pair with its timing
+replay - serve recorded pairs (or synthetic replies) locally, no network needed
+
+Every transport exposes client.messages.create(...) and with_options(...) so it
+is a drop-in replacement for the Anthropic client.
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from prompt_builder import MIN_CACHEABLE_TOKENS, cached_prefix, validate_request
+
+MODES = ('live', 'record', 'replay')
+DEFAULT_CASSETTE = 'llm_cassette.jsonl'
+
+# Process-wide transport settings (env vars give defaults, CLI flags override)
+_config = {
+    'mode': os.environ.get('VOICE_CADDY_LLM_MODE', 'live'),
+    'cassette': os.environ.get('VOICE_CADDY_CASSETTE', DEFAULT_CASSETTE),
+    'latency': os.environ.get('VOICE_CADDY_REPLAY_LATENCY', 'recorded'),
+}
+
+
+def configure(mode=None, cassette=None, latency=None):
+    """Override the transport settings before any client is created"""
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM mode '{mode}' (choose from {', '.join(MODES)})")
+        _config['mode'] = mode
+    if cassette is not None:
+        _config['cassette'] = cassette
+    if latency is not None:
+        parse_latency(latency)  # Validate early
+        _config['latency'] = latency
+
+
+def current_mode():
+    """Return the configured transport mode"""
+    return _config['mode']
+
+
+def requires_api_key():
+    """Replay runs fully offline and needs no API key"""
+    return _config['mode'] != 'replay'
+
+
+def add_transport_arguments(parser):
+    """Add --llm-mode/--cassette/--replay-latency to an argparse parser"""
+    parser.add_argument('--llm-mode', type=str, choices=MODES, default=None,
+                        help='LLM transport: live (default), record or replay')
+    parser.add_argument('--cassette', type=str, default=None,
+                        help=f'Record/replay file (default: {DEFAULT_CASSETTE})')
+    parser.add_argument('--replay-latency', type=str, default=None,
+                        help='Replay latency: recorded, none, fixed:S, '
+                             'uniform:LO,HI or lognormal:MU,SIGMA')
+
+
+def configure_from_args(args):
+    """Apply the transport arguments added by add_transport_arguments"""
+    configure(mode=args.llm_mode, cassette=args.cassette, latency=args.replay_latency)
+
+
+def create_transport(api_key=None):
+    """Build the client for the configured mode"""
+    mode = _config['mode']
+    if mode == 'replay':
+        return ReplayTransport(_config['cassette'], latency=_config['latency'])
+
+    from anthropic import Anthropic
+    client = Anthropic(api_key=api_key)
+    if mode == 'record':
+        return RecordingTransport(client, _config['cassette'])
+    return client
+
+
+def request_key(kwargs):
+    """Stable key for a messages.create request"""
+    relevant = {
+        'model': kwargs.get('model'),
+        'system': kwargs.get('system'),
+        'messages': kwargs.get('messages'),
+        'max_tokens': kwargs.get('max_tokens'),
+        'temperature': kwargs.get('temperature'),
+    }
+    blob = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def parse_latency(spec):
+    """Parse a latency spec into a sampler(rng, recorded) -> seconds"""
+    spec = (spec or 'recorded').strip().lower()
+    name, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(',') if v.strip()]
+
+    if name == 'recorded':
+        return lambda rng, recorded: recorded or 0.0
+    if name == 'none':
+        return lambda rng, recorded: 0.0
+    if name == 'fixed' and len(values) == 1:
+        return lambda rng, recorded: values[0]
+    if name == 'uniform' and len(values) == 2:
+        return lambda rng, recorded: rng.uniform(values[0], values[1])
+    if name == 'lognormal' and len(values) == 2:
+        return lambda rng, recorded: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Bad latency spec '{spec}'")
+
+
+def _estimate_tokens(text):
+    """Rough token count (~4 characters per token)"""
+    return max(1, math.ceil(len(text) / 4))
+
+
+class TextBlock:
+    """Stand-in for an API text content block"""
+
+    def __init__(self, text):
+        self.type = 'text'
+        self.text = text
+
+
+class Usage:
+    """Stand-in for the API usage block"""
+
+    def __init__(self, input_tokens=0, output_tokens=0,
+                 cache_creation_input_tokens=0, cache_read_input_tokens=0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_creation_input_tokens = cache_creation_input_tokens
+        self.cache_read_input_tokens = cache_read_input_tokens
+
+
+class Message:
+    """Stand-in for an API message response"""
+
+    def __init__(self, text, model, usage, stop_reason='end_turn'):
+        self.content = [TextBlock(text)]
+        self.model = model
+        self.usage = usage
+        self.stop_reason = stop_reason
+        self.role = 'assistant'
+
+
+def _usage_to_dict(usage):
+    """Pull the token counts out of a usage block"""
+    if usage is None:
+        return {}
+    fields = ('input_tokens', 'output_tokens',
+              'cache_creation_input_tokens', 'cache_read_input_tokens')
+    return {f: getattr(usage, f, 0) or 0 for f in fields}
+
+
+class _Messages:
+    """messages namespace that forwards create() to the transport"""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def create(self, **kwargs):
+        return self._transport.create_message(**kwargs)
+
+
+class RecordingTransport:
+    """Forward to the real client and append each exchange to a cassette"""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self._lock = threading.Lock()
+        self.messages = _Messages(self)
+
+    def with_options(self, **kwargs):
+        return RecordingTransport(self.client.with_options(**kwargs), self.path)
+
+    def create_message(self, **kwargs):
+        start = time.perf_counter()
+        message = self.client.messages.create(**kwargs)
+        latency = time.perf_counter() - start
+
+        record = {
+            'key': request_key(kwargs),
+            'request': kwargs,
+            'response': {
+                'text': message.content[0].text,
+                'model': getattr(message, 'model', kwargs.get('model')),
+                'stop_reason': getattr(message, 'stop_reason', None),
+                'usage': _usage_to_dict(getattr(message, 'usage', None)),
+            },
+            'latency': round(latency, 4),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+        return message
+
+
+class ReplayTransport:
+    """Serve recorded responses locally, or synthetic ones for unknown requests
+
+    Responses and latencies are deterministic: repeated requests cycle through
+    their recordings in order, and synthetic latency is seeded from the
+    request key, so benchmark runs are reproducible without a network.
+
+    Requests are validated like the API would (ValueError instead of a 400),
+    and synthetic usage models prompt caching: the first request with a
+    cacheable prefix writes it, later ones read it.
+    """
+
+    def __init__(self, path=None, latency='recorded', seed=0):
+        self.path = path
+        self.sample_latency = parse_latency(latency)
+        self.seed = seed
+        self.recordings = {}
+        self.stats = {'hits': 0, 'misses': 0, 'cache_writes': 0, 'cache_reads': 0}
+        self._seen = {}
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self.messages = _Messages(self)
+
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    self.recordings.setdefault(record['key'], []).append(record)
+
+    def with_options(self, **kwargs):
+        return self
+
+    def create_message(self, **kwargs):
+        validate_request(kwargs)
+        key = request_key(kwargs)
+        with self._lock:
+            records = self.recordings.get(key)
+            occurrence = 0
+            if records:
+                # Only recorded keys need counting (misses would grow without bound)
+                occurrence = self._seen.get(key, 0)
+                self._seen[key] = occurrence + 1
+            self.stats['hits' if records else 'misses'] += 1
+
+        rng = random.Random(f"{self.seed}:{key}:{occurrence}")
+        if records:
+            record = records[occurrence % len(records)]
+            response = record['response']
+            message = Message(
+                response['text'],
+                response.get('model') or kwargs.get('model'),
+                Usage(**response.get('usage', {})),
+                response.get('stop_reason') or 'end_turn'
+            )
+            delay = self.sample_latency(rng, record.get('latency'))
+        else:
+            message = self._synthetic_message(kwargs)
+            delay = self.sample_latency(rng, None)
+
+        if delay > 0:
+            time.sleep(delay)
+        return message
+
+    def _synthetic_message(self, kwargs):
+        """Build a plausible reply for a request that was never recorded"""
+        messages = kwargs.get('messages') or [{}]
+        content = messages[-1].get('content', '')
+        if isinstance(content, list):
+            content = ' '.join(block.get('text', '') for block in content)
+        situation = content.split('\n')[0].strip()
+
+        text = f"[replay] {situation[:80]}"
+        system = kwargs.get('system') or ''
+        if isinstance(system, list):
+            system = ' '.join(block.get('text', '') for block in system)
+        input_tokens = _estimate_tokens(system) + _estimate_tokens(content)
+        cache_write = cache_read = 0
+        prefix = cached_prefix(kwargs)
+        if prefix and _estimate_tokens(prefix) >= MIN_CACHEABLE_TOKENS:
+            cached = _estimate_tokens(prefix)
+            digest = hashlib.sha1(f"{kwargs.get('model')}\x00{prefix}".encode()).hexdigest()
+            with self._lock:
+                hit = digest in self._cached_prefixes
+                self._cached_prefixes.add(digest)
+                self.stats['cache_reads' if hit else 'cache_writes'] += 1
+            if hit:
+                cache_read = cached
+            else:
+                cache_write = cached
+            # Like the API, input_tokens excludes the cached part
+            input_tokens = max(0, input_tokens - cached)
+
+        usage = Usage(
+            input_tokens=input_tokens,
+            output_tokens=_estimate_tokens(text),
+            cache_creation_input_tokens=cache_write,
+            cache_read_input_tokens=cache_read
+        )
+        return Message(text, kwargs.get('model'), usage)
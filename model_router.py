@@ -0,0 +1,217 @@
+"""
+Model router - pick a model tier per announcement class
+Most announcements are routine distance and wind callouts that a small, fast
+model handles well; hole intros, shot results and round recaps are worth the
+larger model. Each tier has its own model and a limit on calls in flight
+(shared by every announcer and bay in the process).
+
+A call falls back to the faster tier when its own tier is busy (all slots
+taken), or when the tier's p95 latency is over the SLO. After a latency
+fallback the slow tier is left alone for a cooldown, then tried again with
+a fresh latency window.
+
+    python gspro_ai_trigger.py --fast-model claude-3-5-haiku-20241022 --route shot=fast
+    python gspro_ai_trigger.py --single-model          (everything on --model)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from api_telemetry import ApiTelemetry
+from prompt_builder import DEFAULT_MODEL
+
+FAST_MODEL = "claude-3-5-haiku-20241022"
+
+# Tier -> model and calls allowed in flight
+TIERS = {
+    'fast': {'model': FAST_MODEL, 'limit': 4},
+    'standard': {'model': DEFAULT_MODEL, 'limit': 2},
+}
+
+# Announcement class (speech_service.PRIORITIES, plus round recaps) -> tier
+ROUTES = {
+    'hole': 'standard',
+    'shot': 'standard',
+    'recap': 'standard',
+    'distance': 'fast',
+    'wind': 'fast',
+    'other': 'fast',
+}
+
+# Where a tier's calls go under pressure
+FALLBACK = {'standard': 'fast'}
+
+# Process-wide router settings (CLI flags override)
+_config = {'tiers': None, 'routes': None, 'slo_p95': None, 'single': False}
+
+_router = None
+_router_lock = threading.Lock()
+
+
+class Tier:
+    """One model tier: its model, call slots and latency window"""
+
+    def __init__(self, name, model, limit, window=20):
+        self.name = name
+        self.model = model
+        self.limit = limit
+        self.slots = threading.BoundedSemaphore(limit)
+        self.telemetry = ApiTelemetry(window)
+        self.backoff_until = 0.0
+
+
+class ModelRouter:
+    """Route announcement classes to tiers with per-tier concurrency limits"""
+
+    def __init__(self, tiers=None, routes=None, fallback=None, slo_p95=None,
+                 cooldown=30.0, min_samples=5):
+        tiers = tiers or TIERS
+        self.tiers = {name: Tier(name, spec['model'], spec['limit'])
+                      for name, spec in tiers.items()}
+        self.routes = dict(ROUTES if routes is None else routes)
+        self.fallback = {tier: to for tier, to in (FALLBACK if fallback is None else fallback).items()
+                         if tier in self.tiers and to in self.tiers}
+        self.slo_p95 = slo_p95
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self.stats = {'calls': {name: 0 for name in self.tiers},
+                      'fallback_busy': 0, 'fallback_latency': 0}
+
+    def tier_for(self, kind):
+        """Tier a class is routed to, before any fallback"""
+        default = next(iter(self.tiers))
+        name = self.routes.get(kind, self.routes.get('other', default))
+        return self.tiers.get(name) or self.tiers[default]
+
+    def acquire(self, kind):
+        """Take a slot for kind's tier (or its fallback); returns the Tier"""
+        tier = self.tier_for(kind)
+        fallback = self.tiers.get(self.fallback.get(tier.name))
+        reason = None
+        if fallback is not None and time.monotonic() < tier.backoff_until:
+            tier, reason = fallback, 'fallback_latency'
+            tier.slots.acquire()
+        elif not tier.slots.acquire(blocking=False):
+            if fallback is not None and fallback.slots.acquire(blocking=False):
+                tier, reason = fallback, 'fallback_busy'
+            else:
+                tier.slots.acquire()
+
+        with self._lock:
+            if reason is not None:
+                self.stats[reason] += 1
+            self.stats['calls'][tier.name] += 1
+        return tier
+
+    @contextmanager
+    def slot(self, kind):
+        """with router.slot(kind) as tier: call tier.model, then self.record(...)"""
+        tier = self.acquire(kind)
+        try:
+            yield tier
+        finally:
+            tier.slots.release()
+
+    def record(self, tier, message, latency):
+        """Account a finished call and back the tier off if it is over the SLO"""
+        with self._lock:
+            tier.telemetry.record(message, latency, tier.model)
+            if (self.slo_p95 is not None and tier.name in self.fallback and
+                    len(tier.telemetry.latencies) >= self.min_samples and
+                    tier.telemetry.p95() > self.slo_p95):
+                tier.backoff_until = time.monotonic() + self.cooldown
+                tier.telemetry.latencies.clear()
+
+    def report(self):
+        """Human-readable lines for print_stats"""
+        lines = []
+        for tier in self.tiers.values():
+            totals = tier.telemetry.totals
+            if not totals['calls']:
+                continue
+            p50 = tier.telemetry.p50()
+            latency = f"p50 {p50:.2f}s, " if p50 is not None else ""
+            lines.append(f"🧭 {tier.name} ({tier.model}): {totals['calls']} calls, "
+                         f"{latency}${totals['cost_usd']:.4f}")
+        if self.stats['fallback_busy'] or self.stats['fallback_latency']:
+            lines.append(f"↪️  Fallbacks: {self.stats['fallback_busy']} busy, "
+                         f"{self.stats['fallback_latency']} over latency SLO")
+        return lines
+
+
+def configure(tiers=None, routes=None, slo_p95=None, single=None):
+    """Override router settings before the router is first used"""
+    if tiers is not None:
+        _config['tiers'] = tiers
+    if routes is not None:
+        _config['routes'] = routes
+    if slo_p95 is not None:
+        _config['slo_p95'] = slo_p95
+    if single is not None:
+        _config['single'] = single
+
+
+def parse_route(spec):
+    """Parse KIND=TIER (or TIER=N) into a pair"""
+    kind, sep, tier = spec.partition('=')
+    if not sep or not kind or not tier:
+        raise ValueError(f"Bad setting '{spec}' (expected NAME=VALUE, e.g. shot=fast)")
+    return kind.strip(), tier.strip()
+
+
+def add_router_arguments(parser):
+    """Add --model/--fast-model/--route/--tier-limit/--single-model to a parser"""
+    parser.add_argument('--model', type=str, default=None,
+                        help=f'Model for hole intros, shots and recaps (default: {DEFAULT_MODEL})')
+    parser.add_argument('--fast-model', type=str, default=None,
+                        help=f'Model for distance, wind and other callouts (default: {FAST_MODEL})')
+    parser.add_argument('--route', type=str, action='append', metavar='KIND=TIER',
+                        help='Send an announcement class to a tier, e.g. shot=fast (repeatable)')
+    parser.add_argument('--tier-limit', type=str, action='append', metavar='TIER=N',
+                        help='Calls allowed in flight per tier, e.g. standard=1 (repeatable)')
+    parser.add_argument('--single-model', action='store_true',
+                        help='Send every announcement to --model (no routing)')
+
+
+def configure_from_args(args):
+    """Apply the arguments added by add_router_arguments
+
+    Also picks up --latency-slo when the script has one.
+    """
+    tiers = {name: dict(spec) for name, spec in TIERS.items()}
+    if args.model:
+        tiers['standard']['model'] = args.model
+    if args.fast_model:
+        tiers['fast']['model'] = args.fast_model
+    for spec in args.tier_limit or ():
+        name, limit = parse_route(spec)
+        if name not in tiers:
+            raise ValueError(f"Unknown tier '{name}' (choose from {', '.join(tiers)})")
+        tiers[name]['limit'] = max(1, int(limit))
+
+    routes = dict(ROUTES)
+    for spec in args.route or ():
+        kind, tier = parse_route(spec)
+        if tier not in tiers:
+            raise ValueError(f"Unknown tier '{tier}' (choose from {', '.join(tiers)})")
+        routes[kind] = tier
+
+    configure(tiers=tiers, routes=routes, slo_p95=getattr(args, 'latency_slo', None),
+              single=args.single_model)
+
+
+def get_router():
+    """Return the process-wide router (tier limits apply across announcers)"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            tiers = _config['tiers'] or TIERS
+            routes = _config['routes']
+            if _config['single']:
+                standard = tiers['standard']
+                tiers = {'standard': standard}
+                routes = {'other': 'standard'}
+            _router = ModelRouter(tiers, routes, slo_p95=_config['slo_p95'])
+    return _router
@@ -0,0 +1,383 @@
+"""
+Multi-bay supervisor - monitor several GSPro simulator bays from one process
+Each bay keeps its own game state, personality and speech channel; the OCR
+worker pool, LLM client, commentary cache and audio output are shared across
+bays (pyttsx3 allows one engine per process, so bays take turns on it)
+
+Examples:
+  python multi_bay.py --bay bay1:normal:0,0,1920,1080 --bay bay2:hype:1920,0,3840,1080
+  python multi_bay.py --bay bay1:zen --bay remote:pirate:folder=//bay3/frames
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import llm_transport
+import model_router
+from api_telemetry import TokenPolicy
+from commentary_cache import get_commentary_cache
+from gspro_ai_trigger import TriggerBasedAnnouncer
+from ocr_pool import get_ocr_pool, ocr_image, ocr_ring_frame, pool_workers, shutdown_ocr_pool
+from personality_registry import get_registry
+from shared_resources import warm_up
+
+
+class ScreenSource:
+    """Grab a screen region - a whole monitor or a window's on-screen rectangle"""
+
+    def __init__(self, bbox=None, all_screens=False):
+        self.bbox = bbox
+        self.all_screens = all_screens
+
+    def grab(self):
+        from PIL import ImageGrab
+        return ImageGrab.grab(bbox=self.bbox, all_screens=self.all_screens)
+
+    def __repr__(self):
+        return f"screen {self.bbox}" if self.bbox else "screen (full)"
+
+
+class FolderSource:
+    """Frames dropped into a folder by a remote feed (newest file wins)"""
+
+    def __init__(self, path, pattern='*.png'):
+        self.path = path
+        self.pattern = pattern
+        self.last_mtime = 0.0
+
+    def grab(self):
+        from PIL import Image
+
+        files = glob.glob(os.path.join(self.path, self.pattern))
+        if not files:
+            return None
+        newest = max(files, key=os.path.getmtime)
+        mtime = os.path.getmtime(newest)
+        if mtime <= self.last_mtime:
+            return None  # Nothing new from the feed
+        self.last_mtime = mtime
+        with Image.open(newest) as image:
+            return image.convert('RGB')
+
+    def __repr__(self):
+        return f"folder {self.path}"
+
+
+class Bay:
+    """One simulator bay: a capture source plus its own announcer state"""
+
+    def __init__(self, name, source, announcer, interval=1.0):
+        self.name = name
+        self.source = source
+        self.announcer = announcer
+        self.interval = interval
+        self.next_due = 0.0
+        self.ocr_future = None
+        self.announce_future = None
+        self.pending_text = None
+        self.ring = None
+        self.stats = {'frames': 0, 'ocr_runs': 0, 'stale_dropped': 0}
+
+
+class BaySupervisor:
+    """Round-robin scheduler over bays sharing one OCR pool and LLM client
+
+    Fairness: bays are visited in rotating order, and each bay has at most one
+    OCR job and one announcement in flight, so a busy bay can't starve the
+    others. OCR throughput scales with the pool's worker processes.
+    """
+
+    def __init__(self, bays, ocr_workers=None, speak=True, shared_memory=False):
+        self.bays = bays
+        self.speak_enabled = speak
+        self.shared_memory = shared_memory
+        self.ocr_workers = ocr_workers
+        self.ocr_pool = get_ocr_pool(ocr_workers)
+        self.announce_pool = ThreadPoolExecutor(
+            max_workers=max(1, len(bays)), thread_name_prefix='announce'
+        )
+        self._rotation = 0
+        self.start_time = time.time()
+        
+        # Max OCR jobs in flight across bays (None = pool size); set by the CPU governor
+        self.ocr_slots = None
+        self.governor = None
+
+    def _announce(self, bay, text):
+        """Parse OCR text and speak the commentary (runs on the announce pool)"""
+        commentary = bay.announcer.handle_ocr_text(text, speak=False)
+        if commentary and self.speak_enabled:
+            # Each bay is its own channel on the process-wide speech queue: lines
+            # are ranked by announcement class, but never drop or cut off another bay's
+            print(f"[{bay.name}]", end=" ")
+            bay.announcer.speak(commentary, bay.announcer.last_speech_kind)
+        elif commentary:
+            print(f"[{bay.name}] 🔊 {commentary}")
+
+    def _submit_ocr(self, bay, frame):
+        """Send a frame to the OCR pool - via the bay's shared-memory ring if enabled"""
+        if not self.shared_memory:
+            return self.ocr_pool.submit(ocr_image, frame)
+
+        from frame_ring import FrameRing
+
+        height, width = frame.size[1], frame.size[0]
+        if bay.ring is None or bay.ring.shape[:2] != (height, width):
+            if bay.ring is not None:
+                bay.ring.close()
+            bay.ring = FrameRing.create(height, width)
+        seq = bay.ring.write(frame.convert('RGB'))
+        return self.ocr_pool.submit(ocr_ring_frame, bay.ring.name, seq)
+
+    def poll(self, bay, now):
+        """Capture and change-detect a bay if it's due and has no OCR in flight"""
+        if bay.ocr_future is not None or now < bay.next_due:
+            return
+        if self.ocr_slots is not None:
+            in_flight = sum(1 for b in self.bays if b.ocr_future is not None)
+            if in_flight >= self.ocr_slots:
+                return
+        bay.next_due = now + bay.interval * bay.announcer.interval_scale
+
+        try:
+            frame = bay.source.grab()
+        except Exception as e:
+            print(f"[{bay.name}] Error capturing: {e}")
+            return
+        if frame is None:
+            return
+
+        bay.stats['frames'] += 1
+        bay.announcer.stats['screenshots_taken'] += 1
+        changed, change_pct = bay.announcer.detect_screen_change(frame)
+        if changed and bay.announcer.classify_scene(frame):
+            print(f"\n[{bay.name}] 🎯 TRIGGER! Screen changed {change_pct:.1f}%")
+            try:
+                bay.ocr_future = self._submit_ocr(bay, frame)
+            except BrokenProcessPool:
+                # A worker died - start a fresh pool and retry on the next pass
+                print(f"[{bay.name}] ⚠️  OCR pool restarted")
+                shutdown_ocr_pool(wait=False)
+                self.ocr_pool = get_ocr_pool(self.ocr_workers)
+                bay.next_due = now
+                return
+            bay.stats['ocr_runs'] += 1
+
+    def collect(self, bay):
+        """Hand finished OCR to the bay's announcer, one announcement at a time"""
+        if bay.ocr_future is not None and bay.ocr_future.done():
+            try:
+                text = bay.ocr_future.result()
+            except Exception as e:
+                print(f"[{bay.name}] OCR error: {e}")
+                text = None
+            bay.ocr_future = None
+            if text:
+                if bay.pending_text is not None:
+                    bay.stats['stale_dropped'] += 1
+                bay.pending_text = text
+
+        busy = bay.announce_future is not None and not bay.announce_future.done()
+        if bay.pending_text is not None and not busy:
+            bay.announce_future = self.announce_pool.submit(self._announce, bay, bay.pending_text)
+            bay.pending_text = None
+
+    def step(self):
+        """One scheduling pass over every bay, starting from a rotating offset"""
+        now = time.monotonic()
+        count = len(self.bays)
+        order = [self.bays[(self._rotation + i) % count] for i in range(count)]
+        self._rotation = (self._rotation + 1) % count
+
+        for bay in order:
+            self.collect(bay)
+            self.poll(bay, now)
+
+        # Sleep until the next bay is due (or briefly, if OCR is in flight)
+        next_due = min(bay.next_due for bay in self.bays)
+        in_flight = any(bay.ocr_future is not None or bay.pending_text is not None
+                        for bay in self.bays)
+        delay = max(0.0, next_due - time.monotonic())
+        time.sleep(min(delay, 0.02) if in_flight else delay)
+
+    def run(self):
+        """Main loop"""
+        print("\n" + "="*60)
+        print("🏌️  MULTI-BAY AI ANNOUNCER - ACTIVE")
+        print("="*60)
+        for bay in self.bays:
+            print(f"   {bay.name:<12} {bay.announcer.personality_mode:<14} {bay.source}")
+        print(f"🔍 OCR workers: {pool_workers()} (shared)")
+        print("⌨️  Press Ctrl+C to stop")
+        print("="*60 + "\n")
+
+        try:
+            while True:
+                self.step()
+                if self.governor is not None:
+                    self.governor.update()
+        except KeyboardInterrupt:
+            print("\n\n⛳ Stopping multi-bay announcer...")
+            self.print_stats()
+        finally:
+            self.announce_pool.shutdown(wait=False, cancel_futures=True)
+            shutdown_ocr_pool(wait=False)
+            for bay in self.bays:
+                if bay.ring is not None:
+                    bay.ring.close()
+
+    def print_stats(self):
+        """Per-bay and shared statistics"""
+        runtime_min = (time.time() - self.start_time) / 60
+        cache = get_commentary_cache()
+
+        print("\n" + "="*60)
+        print("📊 MULTI-BAY STATS")
+        print("="*60)
+        print(f"⏱️  Runtime: {runtime_min:.1f} minutes")
+        for bay in self.bays:
+            stats = bay.announcer.stats
+            print(f"   {bay.name:<12} frames {bay.stats['frames']:>6}  "
+                  f"OCR {bay.stats['ocr_runs']:>5}  "
+                  f"skipped {stats['ocr_skipped']:>4}  "
+                  f"API {stats['api_calls_made']:>4}  "
+                  f"cache hits {stats['cache_hits']:>3}  "
+                  f"bank {stats['bank_hits']:>4}  "
+                  f"${stats.get('cost_usd', 0.0):.4f}  "
+                  f"p95 {stats.get('latency_p95_s') or 0.0:.2f}s  "
+                  f"stale dropped {bay.stats['stale_dropped']:>3}")
+        if self.governor is not None:
+            print(f"🖥️  CPU: {self.governor.usage * 100 if self.governor.usage else 0:.1f}% "
+                  f"of one core (budget {self.governor.budget * 100:g}%), "
+                  f"level {self.governor.level}, {self.governor.changes} adjustment(s)")
+        for line in model_router.get_router().report():
+            print(line)
+        print(f"🗃️  Shared commentary cache: {len(cache)} entries, "
+              f"{cache.stats['hits']} hits / {cache.stats['misses']} misses")
+        print("="*60 + "\n")
+
+
+def parse_bay_spec(spec):
+    """Parse NAME[:MODE[:x1,y1,x2,y2 | folder=PATH]] into (name, mode, source)"""
+    parts = spec.split(':', 2)
+    name = parts[0]
+    mode = parts[1] if len(parts) > 1 and parts[1] else 'normal'
+    source = ScreenSource()
+    if len(parts) > 2 and parts[2]:
+        where = parts[2]
+        if where.startswith('folder='):
+            source = FolderSource(where[len('folder='):])
+        else:
+            bbox = tuple(int(v) for v in where.split(','))
+            if len(bbox) != 4:
+                raise ValueError(f"bay '{name}': bbox needs 4 values")
+            source = ScreenSource(bbox=bbox, all_screens=True)
+    return name, mode, source
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Monitor several GSPro bays from one process',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--bay', action='append', required=True,
+                        help='NAME[:MODE[:x1,y1,x2,y2 | folder=PATH]] (repeatable)')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Seconds between change checks per bay (default: 1.0)')
+    parser.add_argument('--threshold', type=float, default=5.0,
+                        help='Change threshold percentage (default: 5.0)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='OCR worker processes (default: cores - 1)')
+    parser.add_argument('--no-speech', action='store_true',
+                        help='Print commentary instead of speaking it')
+    parser.add_argument('--shared-memory', action='store_true',
+                        help='Hand frames to OCR workers through shared memory instead of pickling')
+    parser.add_argument('--cpu-budget', type=float, metavar='PCT',
+                        help='Keep all bays plus OCR workers under PCT%% of one core')
+    parser.add_argument('--bank', type=str, metavar='FILE',
+                        help='Pre-generated commentary bank (commentary_bank.py) shared by all bays')
+    parser.add_argument('--latency-slo', type=float, metavar='SECONDS',
+                        help='Shrink each bay\'s max_tokens while its p95 API latency is above this')
+    parser.add_argument('--analytics', type=str, metavar='DIR',
+                        help='Add each bay\'s rounds to this shot analytics store as they finish')
+    parser.add_argument('--debug', action='store_true',
+                        help='Enable debug mode')
+    parser.add_argument('--api-key', type=str,
+                        help='Anthropic API key')
+    llm_transport.add_transport_arguments(parser)
+    model_router.add_router_arguments(parser)
+
+    args = parser.parse_args()
+    llm_transport.configure_from_args(args)
+
+    try:
+        model_router.configure_from_args(args)
+        specs = [parse_bay_spec(spec) for spec in args.bay]
+    except ValueError as e:
+        parser.error(str(e))
+
+    available_modes = get_registry().names()
+    for name, mode, _ in specs:
+        if mode not in available_modes:
+            parser.error(f"bay '{name}': unknown mode '{mode}' "
+                         f"(choose from {', '.join(available_modes)})")
+
+    # Check for API key
+    if (llm_transport.requires_api_key() and
+            not args.api_key and not os.environ.get("ANTHROPIC_API_KEY")):
+        print("❌ Error: Anthropic API key required!")
+        print("\nSet it via:")
+        print("  export ANTHROPIC_API_KEY='your-key'")
+        print("\nGet your key at: https://console.anthropic.com/")
+        return
+
+    # One connection pool and TTS engine for every bay
+    warm_up(args.api_key, tts=not args.no_speech)
+
+    cache = get_commentary_cache()
+    bank = None
+    if args.bank:
+        from commentary_bank import CommentaryBank
+        bank = CommentaryBank.load(args.bank)
+    bays = []
+    for name, mode, source in specs:
+        announcer = TriggerBasedAnnouncer(
+            personality_mode=mode,
+            debug_mode=args.debug,
+            api_key=args.api_key,
+            commentary_cache=cache
+        )
+        announcer.change_threshold = args.threshold
+        announcer.token_policy = TokenPolicy(slo_p95=args.latency_slo)
+        announcer.bank = bank
+        bays.append(Bay(name, source, announcer, interval=args.interval))
+
+    supervisor = BaySupervisor(bays, ocr_workers=args.workers, speak=not args.no_speech,
+                               shared_memory=args.shared_memory)
+    if args.cpu_budget:
+        from cpu_governor import CpuGovernor
+        supervisor.governor = CpuGovernor(args.cpu_budget / 100,
+                                          announcers=[bay.announcer for bay in bays],
+                                          supervisor=supervisor)
+    if args.analytics:
+        from shot_analytics import AnalyticsStore
+        store = AnalyticsStore(args.analytics)
+        for bay in bays:
+            bay.announcer.analytics = store
+            bay.announcer.analytics_bay = bay.name
+    supervisor.run()
+
+    if args.analytics:
+        for bay in bays:
+            bay.announcer.save_rounds(final=True)
+
+
+if __name__ == "__main__":
+    main()
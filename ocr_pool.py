@@ -0,0 +1,235 @@
+"""
+Shared OCR worker pool
+Tesseract runs in worker processes, so OCR for several bays uses every core
+instead of queueing behind one process
+
+A single full-screen pass can use the pool too: ocr_data() cuts a tall
+frame into overlapping horizontal bands, OCRs them in parallel and merges
+the word boxes back into full-frame coordinates. Each band keeps only the
+lines centred in its own half of the overlaps, and drops lines cut off at
+an inner edge, so a line crossing a seam is read once, from the band that
+holds all of it.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_lock = threading.Lock()
+_pool = None
+_pool_workers = 0
+
+# Most bands one read may use (None = no cap); set by the CPU governor
+_max_bands = None
+
+# Shared-memory frame rings attached by this worker process, by name
+_rings = {}
+
+# Frames shorter than two bands of this height are OCR'd in one piece
+MIN_BAND_HEIGHT = 270
+
+# Lines touching an inner band edge (within this many pixels) were cut off
+EDGE_MARGIN = 2
+
+# Band i's Tesseract blocks are renumbered from i * BLOCK_STRIDE to keep band order
+BLOCK_STRIDE = 10000
+
+
+def default_workers():
+    """Leave one core for GSPro and the main process"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def _init_worker():
+    """Configure Tesseract once per worker process, below the game's priority"""
+    from cpu_governor import lower_priority
+    from shared_resources import get_tesseract
+    lower_priority()
+    # One thread per Tesseract run - parallelism comes from the workers
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    try:
+        get_tesseract()
+    except Exception:
+        pass  # Reported per job instead - a failed initializer breaks the pool
+
+
+def ocr_image(image, config=''):
+    """Run Tesseract on a PIL image (executes inside a worker process)"""
+    from shared_resources import get_tesseract
+    return get_tesseract().image_to_string(image, config=config)
+
+
+def ocr_image_data(image, config=''):
+    """Run Tesseract's image_to_data on a PIL image (executes inside a worker process)"""
+    from shared_resources import get_tesseract
+    tesseract = get_tesseract()
+    return tesseract.image_to_data(image, config=config, output_type=tesseract.Output.DICT)
+
+
+def ocr_ring_frame(ring_name, seq, config=''):
+    """OCR frame seq straight out of a shared-memory ring (executes inside a worker)
+
+    Returns None if the writer overwrote the slot before it could be read.
+    """
+    from PIL import Image
+    from frame_ring import FrameRing
+    from shared_resources import get_tesseract
+
+    ring = _rings.get(ring_name)
+    if ring is None:
+        ring = _rings[ring_name] = FrameRing.attach(ring_name)
+
+    view = ring.view(seq)
+    if view is None:
+        return None
+    image = Image.fromarray(view)
+    if not ring.still_valid(seq):
+        return None  # Lapped while copying - the image may be torn
+    return get_tesseract().image_to_string(image, config=config)
+
+
+def line_words(data):
+    """Group image_to_data words into lines: {(block, par, line): [word indexes]}"""
+    lines = {}
+    for i, text in enumerate(data['text']):
+        if not text.strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, []).append(i)
+    return lines
+
+
+def data_to_text(data):
+    """Rebuild plain OCR text (one line per Tesseract line) from image_to_data"""
+    lines = line_words(data)
+    return "\n".join(" ".join(data['text'][i] for i in words)
+                     for _, words in sorted(lines.items()))
+
+
+def band_edges(height, count, overlap):
+    """(top, bottom) of count horizontal bands covering height, overlapping by overlap"""
+    step = height / count
+    return [(max(0, round(i * step) - overlap // 2),
+             min(height, round((i + 1) * step) + overlap - overlap // 2))
+            for i in range(count)]
+
+
+def band_count(height, workers):
+    """How many bands a frame of this height is worth splitting into"""
+    return max(1, min(workers, height // MIN_BAND_HEIGHT))
+
+
+def limit_bands(bands):
+    """Cap the bands (pool workers) any one read is split across; None = no cap"""
+    global _max_bands
+    _max_bands = bands
+
+
+def _bands(height, bands):
+    """Bands to use: auto for None, never more than the governor allows"""
+    if bands is None:
+        bands = band_count(height, pool_workers() or default_workers())
+    if _max_bands is not None:
+        bands = min(bands, _max_bands)
+    return bands
+
+
+def merge_band_data(edges, band_data):
+    """Merge per-band image_to_data dicts into one in full-frame coordinates"""
+    merged = {key: [] for key in band_data[0]} if band_data else {}
+    last = len(edges) - 1
+    for i, ((top, bottom), data) in enumerate(zip(edges, band_data)):
+        # Seams sit halfway through each overlap
+        own_top = (top + edges[i - 1][1]) / 2 if i > 0 else 0
+        own_bottom = (edges[i + 1][0] + bottom) / 2 if i < last else bottom
+        for words in line_words(data).values():
+            line_top = min(data['top'][w] for w in words)
+            line_bottom = max(data['top'][w] + data['height'][w] for w in words)
+            if i > 0 and line_top <= EDGE_MARGIN:
+                continue
+            if i < last and line_bottom >= bottom - top - EDGE_MARGIN:
+                continue
+            if not own_top <= top + (line_top + line_bottom) / 2 < own_bottom:
+                continue
+            for w in words:
+                for key, values in data.items():
+                    value = values[w]
+                    if key == 'top':
+                        value += top
+                    elif key == 'block_num':
+                        value += i * BLOCK_STRIDE
+                    merged[key].append(value)
+    return merged
+
+
+def ocr_data(image, config='', bands=None, overlap=None):
+    """Full-frame image_to_data, band-parallel on the OCR pool for tall frames
+
+    bands=None picks a count from the frame height and pool size, 0 or 1
+    OCRs the whole frame in this process; limit_bands() caps either.
+    overlap must exceed the tallest text line (default: 1/16 of the frame
+    height, at least 48 px).
+    """
+    width, height = image.size
+    bands = _bands(height, bands)
+    if bands <= 1:
+        return ocr_image_data(image, config)
+
+    overlap = overlap or max(48, height // 16)
+    edges = band_edges(height, bands, overlap)
+    # Tesseract works in grey anyway - a third of the bytes to pickle per band
+    gray = image.convert('L')
+    try:
+        # Started on the first banded read, no bigger than that read needs
+        pool = get_ocr_pool(max_workers=bands)
+        futures = [pool.submit(ocr_image_data, gray.crop((0, top, width, bottom)), config)
+                   for top, bottom in edges]
+        return merge_band_data(edges, [future.result() for future in futures])
+    except BrokenProcessPool:
+        # A worker died - fresh pool next time, this frame in one piece here
+        shutdown_ocr_pool(wait=False)
+        return ocr_image_data(image, config)
+
+
+def ocr_text(image, config='', bands=None):
+    """Full-frame OCR text, band-parallel for tall frames (see ocr_data)"""
+    bands = _bands(image.size[1], bands)
+    if bands <= 1:
+        return ocr_image(image, config)
+    return data_to_text(ocr_data(image, config, bands))
+
+
+def get_ocr_pool(max_workers=None):
+    """Return the process-wide OCR pool, creating it on first use"""
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is None:
+            _pool_workers = max_workers or default_workers()
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, initializer=_init_worker)
+    return _pool
+
+
+def pool_workers():
+    """Number of workers in the current pool (0 if not started)"""
+    return _pool_workers
+
+
+def worker_pids():
+    """Process ids of the running OCR workers"""
+    with _lock:
+        # ProcessPoolExecutor has no public list of its workers
+        return list(getattr(_pool, '_processes', None) or ())
+
+
+def shutdown_ocr_pool(wait=True):
+    """Stop the OCR workers"""
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait, cancel_futures=True)
+            _pool = None
+            _pool_workers = 0
+
+# Most bands one read may use (None = no cap); set by the CPU governor
+_max_bands = None
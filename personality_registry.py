@@ -0,0 +1,154 @@
+"""
+Personality registry - parses and validates personalities.json once
+Watches the file's mtime and swaps personalities in place, so prompt and
+voice-rate edits apply on the next announcement without a restart
+"""
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_PATH = 'personalities.json'
+
+# Used when personalities.json is missing or a mode isn't defined
+DEFAULT_PERSONALITY = {
+    'name': 'Professional Announcer',
+    'prompt': """You are a professional golf announcer providing live commentary.
+Your style is informative, enthusiastic, and respectful.
+Keep commentary concise (1-2 sentences max).
+Focus on the shot at hand and provide helpful context.""",
+    'voice_rate': 160,
+    'examples': [],
+}
+
+BUILTIN_MODES = ['normal', 'smartass', 'hype', 'zen', 'pirate', 'british']
+
+
+def validate_personalities(data):
+    """Validate parsed personalities.json and return normalized entries
+
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('personalities'), dict):
+        raise ValueError("expected an object with a 'personalities' object")
+
+    personalities = {}
+    for mode, entry in data['personalities'].items():
+        if not isinstance(entry, dict):
+            raise ValueError(f"'{mode}' must be an object")
+        prompt = entry.get('prompt')
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise ValueError(f"'{mode}' needs a non-empty 'prompt'")
+        voice_rate = entry.get('voice_rate', DEFAULT_PERSONALITY['voice_rate'])
+        if not isinstance(voice_rate, int) or not 50 <= voice_rate <= 400:
+            raise ValueError(f"'{mode}' voice_rate must be an integer 50-400")
+        examples = entry.get('examples', [])
+        if not isinstance(examples, list):
+            raise ValueError(f"'{mode}' examples must be a list")
+
+        normalized = dict(entry)
+        normalized['name'] = entry.get('name', mode)
+        normalized['voice_rate'] = voice_rate
+        normalized['examples'] = examples
+        personalities[mode] = normalized
+
+    if not personalities:
+        raise ValueError("no personalities defined")
+    return personalities
+
+
+class PersonalityRegistry:
+    """Cached, validated view of personalities.json with mtime-based reload"""
+
+    def __init__(self, path=DEFAULT_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.version = 0
+        self.error = None
+        self._personalities = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload_if_changed(force=True)
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload_if_changed(self, force=False):
+        """Re-parse the file if its mtime changed; returns True if swapped
+
+        A file that fails to parse or validate leaves the current
+        personalities in place so a half-saved edit can't break a round.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            self._last_check = now
+            mtime = self._stat_mtime()
+            if not force and mtime == self._mtime:
+                return False
+            self._mtime = mtime
+
+            if mtime is None:
+                personalities = {}
+            else:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        personalities = validate_personalities(json.load(f))
+                except (OSError, ValueError) as e:
+                    self.error = str(e)
+                    print(f"⚠️  Warning: Could not load {self.path}: {e}")
+                    return False
+
+            self.error = None
+            self._personalities = personalities
+            self.version += 1
+            return True
+
+    def get(self, mode):
+        """Return the personality for a mode (or None if undefined)"""
+        self.reload_if_changed()
+        personality = self._personalities.get(mode)
+        return dict(personality) if personality else None
+
+    def get_or_default(self, mode):
+        """Return the personality for a mode, falling back to the built-in default"""
+        return self.get(mode) or dict(DEFAULT_PERSONALITY)
+
+    def names(self):
+        """Available mode names (the built-in list if the file is missing)"""
+        self.reload_if_changed()
+        return list(self._personalities) or list(BUILTIN_MODES)
+
+    def all(self):
+        """All personalities as {mode: personality}"""
+        self.reload_if_changed()
+        return {mode: dict(p) for mode, p in self._personalities.items()}
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def _resolve(path):
+    """Find the file in the working directory, then next to this module"""
+    if os.path.isabs(path) or os.path.exists(path):
+        return os.path.abspath(path)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def get_registry(path=DEFAULT_PATH):
+    """Return the process-wide registry for a personalities file"""
+    path = _resolve(path)
+    with _registries_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            registry = PersonalityRegistry(path)
+            _registries[path] = registry
+    return registry
@@ -0,0 +1,137 @@
+"""
+Commentary request builder with prompt caching
+Every announcement used to resend the whole personality prompt plus the
+instruction suffix. Requests are now laid out stable-first:
+
+  system   personality prompt + style rules + course context   (cached)
+  user     round memory (optional) + the short situation line  (new each call)
+
+The stable system block carries cache_control, so within a round the API
+reads it from the prompt cache instead of processing it again. That cuts
+time-to-first-token and input cost. The API only caches prefixes above a
+minimum length (MIN_CACHEABLE_TOKENS). Shorter prompts are simply not cached
+and still work.
+"""
+
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+
+# Commentary length budget (api_telemetry.TokenPolicy may lower it per call)
+DEFAULT_MAX_TOKENS = 150
+
+# Announcer instructions that used to be appended to every situation
+STYLE_RULES = ("Provide brief announcer commentary (1-2 sentences max). "
+               "Be entertaining and match your personality.")
+
+# Smallest prefix the API will cache for Sonnet/Opus models
+MIN_CACHEABLE_TOKENS = 1024
+
+# The API allows at most this many cache_control breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def system_blocks(personality_prompt, style_rules=STYLE_RULES, course_context=None,
+                  cache=True):
+    """Stable system prompt as one text block, marked for prompt caching"""
+    parts = [personality_prompt.strip()]
+    if style_rules:
+        parts.append(style_rules)
+    if course_context:
+        parts.append(f"Course: {course_context}")
+    block = {"type": "text", "text": "\n\n".join(parts)}
+    if cache:
+        block["cache_control"] = dict(CACHE_CONTROL)
+    return [block]
+
+
+def user_message(situation, round_memory=None):
+    """The per-call part: optional round memory, then the situation"""
+    content = situation
+    if round_memory:
+        content = round_memory + "\n\n" + situation
+    return {"role": "user", "content": content}
+
+
+def commentary_request(personality_prompt, situation, model=DEFAULT_MODEL,
+                       max_tokens=DEFAULT_MAX_TOKENS, temperature=0.8, style_rules=STYLE_RULES,
+                       course_context=None, round_memory=None, cache=True):
+    """Keyword arguments for client.messages.create(...) (temperature None = API default)"""
+    request = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "system": system_blocks(personality_prompt, style_rules, course_context, cache),
+        "messages": [user_message(situation, round_memory)],
+    }
+    if temperature is not None:
+        request["temperature"] = temperature
+    return request
+
+
+def _blocks(content):
+    """Content as a list of blocks (plain strings have none to check)"""
+    return content if isinstance(content, list) else []
+
+
+def validate_request(kwargs):
+    """Check a messages.create request the way the API would (ValueError if not)
+
+    Used by the local replay transport so request shape problems show up
+    offline instead of as 400s in the live API.
+    """
+    for field in ("model", "max_tokens", "messages"):
+        if field not in kwargs:
+            raise ValueError(f"missing required field '{field}'")
+
+    system = kwargs.get("system")
+    if system is not None and not isinstance(system, (str, list)):
+        raise ValueError("system must be a string or a list of text blocks")
+
+    breakpoints = 0
+    for block in _blocks(system):
+        if block.get("type") != "text" or not isinstance(block.get("text"), str):
+            raise ValueError("system blocks must be {'type': 'text', 'text': ...}")
+        breakpoints += _check_cache_control(block)
+
+    messages = kwargs["messages"]
+    if not messages:
+        raise ValueError("messages must not be empty")
+    for message in messages:
+        if message.get("role") not in ("user", "assistant"):
+            raise ValueError(f"bad message role {message.get('role')!r}")
+        content = message.get("content")
+        if not isinstance(content, (str, list)) or not content:
+            raise ValueError("message content must be a non-empty string or block list")
+        for block in _blocks(content):
+            breakpoints += _check_cache_control(block)
+
+    if breakpoints > MAX_CACHE_BREAKPOINTS:
+        raise ValueError(f"{breakpoints} cache_control blocks "
+                         f"(at most {MAX_CACHE_BREAKPOINTS} allowed)")
+
+
+def _check_cache_control(block):
+    """1 if the block is a valid cache breakpoint, 0 if it has none"""
+    control = block.get("cache_control")
+    if control is None:
+        return 0
+    if control.get("type") != "ephemeral" or control.get("ttl", "5m") not in ("5m", "1h"):
+        raise ValueError(f"bad cache_control {control!r}")
+    return 1
+
+
+def cached_prefix(kwargs):
+    """Text of the request up to and including its last cache breakpoint ('' if none)"""
+    prefix = []
+    cached = ''
+    system = kwargs.get("system")
+    sections = [_blocks(system) or ([{"type": "text", "text": system}] if system else [])]
+    for message in kwargs.get("messages", []):
+        content = message.get("content")
+        sections.append(_blocks(content) or [{"type": "text", "text": content or ""}])
+    for blocks in sections:
+        for block in blocks:
+            prefix.append(block.get("text", ""))
+            if block.get("cache_control"):
+                cached = "\n".join(prefix)
+    return cached
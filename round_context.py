@@ -0,0 +1,155 @@
+"""
+Rolling round context for commentary prompts
+Gives the announcer memory of the round (streaks, score vs par, what it just
+said) while keeping the prompt under a fixed token budget for all 18 holes
+
+Recent events on the current hole are kept verbatim. Finished holes are
+folded into a compact summary that is updated incrementally, one hole at a
+time, so nothing is ever re-summarized.
+"""
+
+from collections import deque
+
+# Rough token estimate for English prompt text (about 4 characters per token)
+CHARS_PER_TOKEN = 4
+
+SCORE_NAMES = {
+    -3: 'albatross',
+    -2: 'eagle',
+    -1: 'birdie',
+    0: 'par',
+    1: 'bogey',
+    2: 'double bogey',
+    3: 'triple bogey',
+}
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (no API round trip)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def score_name(vs_par):
+    """'birdie', 'bogey', ... for a score relative to par"""
+    if vs_par in SCORE_NAMES:
+        return SCORE_NAMES[vs_par]
+    return f"+{vs_par}" if vs_par > 0 else str(vs_par)
+
+
+class RoundContext:
+    """Token-budgeted memory of the round for commentary prompts"""
+
+    def __init__(self, budget_tokens=200, recent_events=6, recent_lines=2):
+        self.budget_tokens = budget_tokens
+        self.events = deque(maxlen=recent_events)
+        self.lines = deque(maxlen=recent_lines)
+
+        # Incremental summary of finished holes
+        self.holes_played = 0
+        self.total_shots = 0
+        self.total_par = 0
+        self.streak_name = None
+        self.streak_length = 0
+        self.best = None    # (vs_par, hole)
+        self.worst = None
+        self.scorecard = deque(maxlen=18)  # "H3 5/4" per hole, oldest dropped first
+
+    def record_event(self, text):
+        """Something that happened on the current hole (kept verbatim)"""
+        self.events.append(text)
+
+    def record_commentary(self, text):
+        """A line the announcer just said, so it doesn't repeat itself"""
+        self.lines.append(text)
+
+    def finish_hole(self, hole, par, shots):
+        """Fold a completed hole into the round summary"""
+        self.events.clear()
+        try:
+            par = int(par)
+        except (TypeError, ValueError):
+            par = None
+
+        self.holes_played += 1
+        if not par or not shots:
+            # Unknown par or no shots seen - can't score it
+            self.scorecard.append(f"H{hole} ?")
+            self.streak_name, self.streak_length = None, 0
+            return
+
+        vs_par = shots - par
+        self.total_shots += shots
+        self.total_par += par
+        self.scorecard.append(f"H{hole} {shots}/{par}")
+
+        name = score_name(vs_par)
+        if name == self.streak_name:
+            self.streak_length += 1
+        else:
+            self.streak_name, self.streak_length = name, 1
+
+        if self.best is None or vs_par < self.best[0]:
+            self.best = (vs_par, hole)
+        if self.worst is None or vs_par > self.worst[0]:
+            self.worst = (vs_par, hole)
+
+    def summary(self):
+        """One-line round summary (constant size regardless of holes played)"""
+        if not self.holes_played:
+            return ""
+        parts = [f"{self.holes_played} hole{'s' if self.holes_played != 1 else ''} played"]
+        if self.total_par:
+            vs_par = self.total_shots - self.total_par
+            parts.append(f"{'E' if vs_par == 0 else f'{vs_par:+d}'} "
+                         f"({self.total_shots} shots, par {self.total_par})")
+        if self.streak_length >= 2:
+            plural = f"{self.streak_name}s" if self.streak_name[0].isalpha() else self.streak_name
+            parts.append(f"{self.streak_length} {plural} in a row")
+        elif self.streak_name:
+            parts.append(f"last hole: {self.streak_name}")
+        if self.best and self.best[0] < 0:
+            parts.append(f"best: {score_name(self.best[0])} on hole {self.best[1]}")
+        if self.worst and self.worst[0] >= 2:
+            parts.append(f"worst: {score_name(self.worst[0])} on hole {self.worst[1]}")
+        return "Round so far: " + ", ".join(parts) + "."
+
+    def render(self):
+        """Round context block for the prompt, trimmed to the token budget
+
+        Trim order when over budget: oldest scorecard entries, then the
+        announcer's own recent lines, then the oldest events on this hole.
+        """
+        summary = self.summary()
+        scorecard = list(self.scorecard)
+        lines = list(self.lines)
+        events = list(self.events)
+
+        def build():
+            sections = []
+            if summary:
+                sections.append(summary)
+            if scorecard:
+                sections.append("Scorecard: " + ", ".join(scorecard) + ".")
+            if events:
+                sections.append("This hole: " + " | ".join(events) + ".")
+            if lines:
+                sections.append("You just said: " + " | ".join(f'"{l}"' for l in lines)
+                                + " (don't repeat yourself).")
+            return "\n".join(sections)
+
+        text = build()
+        while estimate_tokens(text) > self.budget_tokens:
+            if scorecard:
+                scorecard.pop(0)
+            elif lines:
+                lines.pop(0)
+            elif len(events) > 1:
+                events.pop(0)
+            else:
+                return text[:self.budget_tokens * CHARS_PER_TOKEN]
+            text = build()
+        return text
+
+    def reset(self):
+        """Start a new round"""
+        self.__init__(self.budget_tokens, self.events.maxlen, self.lines.maxlen)
@@ -0,0 +1,163 @@
+"""
+Scene classifier - label GSPro frames so OCR only runs on gameplay screens
+Menus, loading screens, flyovers and the scorecard all change most of the
+screen and used to cost a full OCR pass that found nothing. Each frame is
+shrunk to a 64x48 thumbnail and labelled from a few color and edge
+statistics (well under a millisecond):
+
+  tee, fairway, green       gameplay - OCR, reading the fields in SCENE_FIELDS
+  menu, flyover, scorecard  skip OCR
+
+The rules and THRESHOLDS are deliberately simple and only tuned on a few
+screens (bunker, snow or sky-heavy shots can look like a menu), so the
+trigger only uses them with --scene-filter. Check them against your own
+screens first with:
+  python scene_classifier.py --images tee.png menu.png scorecard.png
+"""
+
+import time
+
+import numpy as np
+
+THUMBNAIL = (64, 48)
+
+GAMEPLAY_SCENES = ('tee', 'fairway', 'green')
+SCENES = GAMEPLAY_SCENES + ('menu', 'flyover', 'scorecard')
+
+# HUD fields worth reading in each gameplay scene (hud_calibration field names).
+# hole_info is read everywhere: a new hole's tee is still labelled fairway
+# until the hole change is seen, and it is only seen through hole_info.
+SCENE_FIELDS = {
+    'tee': ('hole_info', 'distance', 'wind'),
+    'fairway': ('distance', 'hole_info', 'wind'),
+    'green': ('hole_info', 'distance'),
+}
+
+THRESHOLDS = {
+    'edge': 40,             # Gray step between neighbours that counts as an edge
+    'motion_pixel': 25,     # Gray change that counts as moved
+    'scorecard_white': 0.30,
+    'scorecard_lines': 0.08,
+    'menu_dark': 0.60,
+    'menu_green': 0.15,
+    'flyover_motion': 0.35,
+    'flyover_window': 3.0,  # Seconds between frames that still count as one camera move
+    'green_grass': 0.60,
+    'green_sky': 0.10,
+    'tee_sky': 0.35,
+}
+
+
+def thumbnail(image):
+    """64x48 RGB array of a PIL image (nearest neighbour - fast on full screens)"""
+    from PIL import Image
+
+    # Shrink before converting - converting a full screen alone costs ~1 ms
+    small = image.resize(THUMBNAIL, Image.NEAREST)
+    if small.mode != 'RGB':
+        small = small.convert('RGB')
+    return np.asarray(small, dtype=np.int16)
+
+
+def features(thumb, t=THRESHOLDS):
+    """Color and edge statistics of a thumbnail, each as a 0-1 fraction"""
+    r, g, b = thumb[..., 0], thumb[..., 1], thumb[..., 2]
+    high = thumb.max(axis=2)
+    low = thumb.min(axis=2)
+    gray = (r * 3 + g * 6 + b) // 10
+
+    horizontal = np.abs(np.diff(gray, axis=0)) > t['edge']
+    vertical = np.abs(np.diff(gray, axis=1)) > t['edge']
+    top = thumb.shape[0] // 2
+
+    return {
+        'grass': float(((g > r + 8) & (g > b + 8)).mean()),
+        'sky_top': float(((b > r + 15) & (b >= g))[:top].mean()),
+        'white': float((low > 200).mean()),
+        'dark': float((high < 40).mean()),
+        'edges': float((horizontal.mean() + vertical.mean()) / 2),
+        # Ruled table lines: rows/columns that are mostly edge
+        'lines': float(((horizontal.mean(axis=1) > 0.5).mean()
+                        + (vertical.mean(axis=0) > 0.5).mean()) / 2),
+        'gray': gray,
+    }
+
+
+class SceneClassifier:
+    """Rule-based frame labeller with a little memory for camera motion"""
+
+    def __init__(self, thresholds=None, clock=time.monotonic):
+        self.thresholds = dict(THRESHOLDS, **(thresholds or {}))
+        self.clock = clock  # Seconds; tests and soak runs use simulated time
+        self.previous = None
+        self.previous_time = None
+        self.moving = False
+        self.counts = {scene: 0 for scene in SCENES}
+
+    def motion(self, gray, now):
+        """Fraction of the thumbnail that moved since the last recent frame"""
+        t = self.thresholds
+        previous, previous_time = self.previous, self.previous_time
+        self.previous, self.previous_time = gray, now
+        if previous is None or now - previous_time > t['flyover_window']:
+            return 0.0
+        return float((np.abs(gray - previous) > t['motion_pixel']).mean())
+
+    def classify(self, image, first_shot=None, now=None):
+        """Scene label for a PIL image
+
+        first_shot separates tee from fairway when the caller knows the shot
+        count (True on the tee); otherwise a high horizon means tee.
+        """
+        t = self.thresholds
+        f = features(thumbnail(image), t)
+        moved = self.motion(f['gray'], self.clock() if now is None else now)
+
+        # A flyover is sustained camera motion over the course: two moving frames in a row
+        was_moving, self.moving = self.moving, moved >= t['flyover_motion']
+
+        if f['white'] >= t['scorecard_white'] and f['lines'] >= t['scorecard_lines']:
+            scene = 'scorecard'
+        elif f['dark'] >= t['menu_dark'] or f['grass'] < t['menu_green']:
+            scene = 'menu'
+        elif self.moving and was_moving:
+            scene = 'flyover'
+        elif f['grass'] >= t['green_grass'] and f['sky_top'] < t['green_sky']:
+            scene = 'green'
+        elif first_shot is not None:
+            scene = 'tee' if first_shot else 'fairway'
+        else:
+            scene = 'tee' if f['sky_top'] >= t['tee_sky'] else 'fairway'
+
+        self.counts[scene] += 1
+        return scene
+
+
+def main():
+    """Entry point"""
+    import argparse
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(
+        description='Label GSPro screenshots the way the trigger does',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--images', nargs='+', metavar='PNG', required=True,
+                        help='Screenshots to classify')
+    args = parser.parse_args()
+
+    classifier = SceneClassifier()
+    for n, path in enumerate(args.images):
+        image = Image.open(path)
+        start = time.perf_counter()
+        # Spread the images out in time so they never look like one camera move
+        scene = classifier.classify(image, now=n * 60.0)
+        elapsed = (time.perf_counter() - start) * 1000
+        f = features(thumbnail(image))
+        stats = "  ".join(f"{k} {v:.2f}" for k, v in f.items() if k != 'gray')
+        print(f"{path}: {scene:<9} ({elapsed:.2f} ms)  {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Append-only session journal - survive a crash or restart mid-round
+
+Committed game-state changes and announcements are appended as JSON lines.
+A writer thread group-commits them: everything queued since the last write
+goes out in one write + one fsync, so the announcer loop never waits on disk.
+
+On startup the journal is replayed to restore game_state and stats, so the
+restarted announcer doesn't announce the current hole all over again. A torn
+last line (crash mid-write) is ignored and trimmed off.
+
+The file is compacted so replay stays small: it is rewritten as a single
+checkpoint after replay, on close and whenever it grows past compact_bytes,
+and a new round starts it over. A write error stops journaling (with a
+warning) and is raised again by close().
+
+Record format (one JSON object per line):
+  {"t": time, "kind": "checkpoint", "game_state": {...}, "stats": {...}, "announcements": n}
+  {"t": time, "kind": "state",    "changes": [...], "game_state": {...}, "stats": {...}}
+  {"t": time, "kind": "announce", "changes": [...], "text": "...",       "stats": {...}}
+  {"t": time, "kind": "round"}    a new round starts here
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+_STOP = object()
+
+# Rewrite the journal as one checkpoint once it has grown by this much
+COMPACT_BYTES = 1 << 20
+
+
+def replay(path):
+    """Read a journal back into the state of the current round
+
+    Returns a dict with game_state (None if nothing committed), stats,
+    announcements (count), records (count) and valid_bytes (offset of the
+    end of the last complete record).
+    """
+    result = {'game_state': None, 'stats': None, 'announcements': 0,
+              'records': 0, 'valid_bytes': 0}
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return result
+
+    with f:
+        offset = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Torn write at the tail
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            offset += len(line)
+            result['records'] += 1
+
+            kind = record.get('kind')
+            if kind == 'round':
+                result.update(game_state=None, stats=None, announcements=0)
+            elif kind == 'checkpoint':
+                result.update(game_state=record['game_state'],
+                              announcements=record['announcements'])
+            elif kind == 'state':
+                result['game_state'] = record['game_state']
+            elif kind == 'announce':
+                result['announcements'] += 1
+            if record.get('stats') is not None:
+                result['stats'] = record['stats']
+        result['valid_bytes'] = offset
+    return result
+
+
+class SessionJournal:
+    """Append-only JSONL journal with a group-commit writer thread"""
+
+    def __init__(self, path, fsync=True, max_batch=512, compact_bytes=COMPACT_BYTES):
+        self.path = path
+        self.fsync = fsync
+        self.max_batch = max_batch
+        self.compact_bytes = compact_bytes
+        self.queue = queue.Queue()
+        self.stats = {'records': 0, 'commits': 0, 'bytes': 0, 'compactions': 0}
+        self.error = None
+
+        # What a checkpoint holds: the latest game_state and stats (as committed
+        # JSON, parsed only when compacting) and the announcement count
+        self.recovered = replay(path)
+        self._game_state = self.recovered['game_state']
+        self._stats = self.recovered['stats']
+        self._state_line = None
+        self._stats_line = None
+        self._announcements = self.recovered['announcements']
+        self._since_compact = 0
+
+        # Start from one checkpoint (this also trims a torn tail)
+        self.file = None
+        if self.recovered['records'] > 1 or (
+                os.path.exists(path) and os.path.getsize(path) > self.recovered['valid_bytes']):
+            self._compact()
+        else:
+            self.file = open(path, 'ab')
+        self.thread = threading.Thread(target=self._writer, name='journal', daemon=True)
+        self.thread.start()
+
+    def append(self, kind, **fields):
+        """Queue a record (serialized now, so later state changes can't leak in)"""
+        if self.error is not None:
+            return  # Journaling stopped; close() reports why
+        record = {'t': round(time.time(), 3), 'kind': kind}
+        record.update(fields)
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        self.queue.put((kind, fields.get('stats') is not None, line))
+
+    def new_round(self):
+        """Mark the start of a new round - the file starts over from here"""
+        self.append('round')
+
+    def _track(self, kind, has_stats, line):
+        """Keep what a checkpoint needs from a committed record; True on a new round"""
+        if kind == 'round':
+            self._game_state = self._stats = self._state_line = self._stats_line = None
+            self._announcements = 0
+            return True
+        if kind == 'state':
+            self._state_line = line
+        elif kind == 'announce':
+            self._announcements += 1
+        if has_stats:
+            self._stats_line = line
+        return False
+
+    def _compact(self):
+        """Replace the file with a single checkpoint of the latest state"""
+        if self._state_line is not None:
+            self._game_state = json.loads(self._state_line)['game_state']
+            self._state_line = None
+        if self._stats_line is not None:
+            self._stats = json.loads(self._stats_line)['stats']
+            self._stats_line = None
+        records = []
+        if self._game_state is not None or self._stats is not None:
+            records.append(json.dumps(
+                {'t': round(time.time(), 3), 'kind': 'checkpoint',
+                 'game_state': self._game_state, 'stats': self._stats,
+                 'announcements': self._announcements},
+                separators=(',', ':')).encode('utf-8') + b'\n')
+        temp = self.path + '.tmp'
+        with open(temp, 'wb') as f:
+            f.write(b''.join(records))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        if self.file is not None:
+            self.file.close()
+        os.replace(temp, self.path)
+        self.file = open(self.path, 'ab')
+        self._since_compact = 0
+        self.stats['compactions'] += 1
+
+    def _commit(self, batch):
+        data = b''.join(line for _, _, line in batch)
+        self.file.write(data)
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.stats['records'] += len(batch)
+        self.stats['commits'] += 1
+        self.stats['bytes'] += len(data)
+        self._since_compact += len(data)
+
+        new_round = False
+        for item in batch:
+            new_round = self._track(*item) or new_round
+        if new_round or self._since_compact >= self.compact_bytes:
+            self._compact()
+
+    def _writer(self):
+        """Write everything queued since the last commit, then fsync once"""
+        while True:
+            item = self.queue.get()
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch and self.error is None:
+                try:
+                    self._commit(batch)
+                except (OSError, ValueError) as e:
+                    # Keep draining the queue, but stop writing
+                    self.error = e
+                    print(f"⚠️  Journal write failed ({e}) - crash resume is off for this session")
+            if item is _STOP:
+                return
+
+    def close(self):
+        """Commit everything queued, compact and close the file
+
+        Raises the error that stopped journaling, if there was one.
+        """
+        self.queue.put(_STOP)
+        self.thread.join()
+        try:
+            if self.error is None:
+                self._compact()
+        except OSError as e:
+            self.error = e
+        finally:
+            self.file.close()
+        if self.error is not None:
+            raise self.error
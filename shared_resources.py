@@ -0,0 +1,114 @@
+"""
+Shared resources for the GSPro announcers
+One Anthropic client per process, warmed up in the background so the first
+real announcement doesn't pay TLS handshake cost, and the TTS engine, which
+is created on the speech service's audio thread (SAPI5 engines are COM
+objects and must stay on the thread that made them). Heavy dependencies
+(anthropic, pyttsx3, pytesseract) are imported on first use.
+"""
+
+import os
+import threading
+from collections import deque
+
+import llm_transport
+
+_lock = threading.Lock()
+_clients = {}
+_tesseract = None
+
+# Debug screenshots are rotated so a long --debug session can't fill the disk
+DEBUG_DIR = 'debug_screenshots'
+DEBUG_KEEP = 300
+_debug_files = deque()
+
+
+def get_client(api_key=None):
+    """Return the process-wide client (or record/replay transport) for this API key"""
+    api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+    key = (llm_transport.current_mode(), api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = llm_transport.create_transport(api_key)
+            _clients[key] = client
+    return client
+
+
+def get_tesseract():
+    """Import and configure pytesseract on first use"""
+    global _tesseract
+    if _tesseract is None:
+        import pytesseract
+
+        # Configure Tesseract path for Windows
+        # If Tesseract is installed in the default location, set the path
+        if os.name == 'nt':  # Windows
+            tesseract_path = r'C:\\Program Files\\Tesseract-OCR\\tesseract.exe'
+            if os.path.exists(tesseract_path):
+                pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        _tesseract = pytesseract
+    return _tesseract
+
+
+def get_tts_engine():
+    """Create a pyttsx3 engine for the calling thread (raises if TTS is unavailable)
+
+    Only the speech service's audio thread should call this; it owns the
+    engine and plays everything through it.
+    """
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty('rate', 160)
+    engine.setProperty('volume', 0.9)
+    engine.getProperty('voices')  # Load the voice list now, not on the first line
+    return engine
+
+
+def save_debug_image(image, name):
+    """Save an image to the debug folder, deleting the oldest beyond DEBUG_KEEP"""
+    path = os.path.join(DEBUG_DIR, name)
+    image.save(path)
+    with _lock:
+        _debug_files.append(path)
+        expired = []
+        while len(_debug_files) > DEBUG_KEEP:
+            expired.append(_debug_files.popleft())
+    for old in expired:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def warm_client(api_key=None):
+    """Open a pooled HTTPS connection to the API so the first call skips TLS setup"""
+    if llm_transport.current_mode() == 'replay':
+        return
+    client = get_client(api_key)
+    client = getattr(client, 'client', client)  # Unwrap a recording transport
+    try:
+        # Any response (even an error status) leaves the connection in the pool.
+        # with_options() copies the client but shares its HTTP connection pool.
+        client.with_options(max_retries=0, timeout=5.0).get("/v1/models", cast_to=object)
+    except Exception:
+        pass
+
+
+def warm_tts():
+    """Start the speech service, which creates the TTS engine on its audio thread"""
+    from speech_service import get_speech_service
+    get_speech_service()
+
+
+def warm_up(api_key=None, tts=True, client=True):
+    """Start a background warm-up of the API connection pool and speech service"""
+    def _run():
+        if client:
+            warm_client(api_key)
+        if tts:
+            warm_tts()
+
+    thread = threading.Thread(target=_run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,327 @@
+"""
+Columnar shot analytics store - every completed round, across the facility
+The announcer closes a round when the hole number goes back (hole 1 after 18,
+or a restart) and writes it straight away; the round in progress is written
+on exit.
+
+Each table is a folder of typed, append-only column files (raw little-endian
+arrays, one per field). Readers memory-map the columns with NumPy, so reports
+over thousands of rounds are vectorized and never parse JSON or build dicts.
+
+Tables:
+  rounds     one row per round: timing, trigger and API counts, cost
+  holes      one row per hole played: par, shots, duration, tee distance
+  distances  one row per distance reading: the distance pattern of each hole
+
+Examples:
+  python gspro_ai_trigger.py --mode hype --analytics analytics
+  python shot_analytics.py analytics
+  python shot_analytics.py analytics --bay bay2 --since 2026-06-01
+"""
+
+import os
+import threading
+
+import numpy as np
+
+# Per-call estimate for sessions journaled before real usage was recorded
+COST_PER_CALL = 0.0001
+
+SCHEMA = {
+    'rounds': [
+        ('round_id', '<i8'),
+        ('started', '<f8'),
+        ('ended', '<f8'),
+        ('bay', 'S16'),
+        ('personality', 'S24'),
+        ('holes', '<i2'),
+        ('screenshots', '<i4'),
+        ('triggers', '<i4'),
+        ('api_calls', '<i4'),
+        ('cache_hits', '<i4'),
+        ('cost_usd', '<f8'),
+    ],
+    'holes': [
+        ('round_id', '<i8'),
+        ('hole', '<i1'),
+        ('par', '<i1'),
+        ('shots', '<i2'),
+        ('started', '<f8'),
+        ('duration_s', '<f4'),
+        ('tee_distance', '<i2'),
+    ],
+    'distances': [
+        ('round_id', '<i8'),
+        ('hole', '<i1'),
+        ('seq', '<i2'),
+        ('distance', '<i2'),
+    ],
+}
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class Table:
+    """Read-only, memory-mapped view of one table's columns"""
+
+    def __init__(self, path, schema):
+        self.columns = {}
+        lengths = []
+        for name, dtype in schema:
+            dtype = np.dtype(dtype)
+            file = os.path.join(path, f"{name}.bin")
+            size = os.path.getsize(file) if os.path.exists(file) else 0
+            lengths.append(size // dtype.itemsize)
+            self.columns[name] = (file, dtype)
+        # A crash mid-append can leave some columns a row longer
+        self.rows = min(lengths) if lengths else 0
+        self._maps = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        if name not in self._maps:
+            file, dtype = self.columns[name]
+            if self.rows == 0:
+                self._maps[name] = np.empty(0, dtype=dtype)
+            else:
+                self._maps[name] = np.memmap(file, dtype=dtype, mode='r', shape=(self.rows,))
+        return self._maps[name]
+
+    def where(self, mask):
+        """Dict of the selected rows of every column (copies only those rows)"""
+        return {name: self[name][mask] for name in self.columns}
+
+
+class AnalyticsStore:
+    """Append completed rounds and run vectorized queries over them"""
+
+    def __init__(self, path='analytics'):
+        self.path = path
+        self._lock = threading.Lock()
+        for table in SCHEMA:
+            os.makedirs(os.path.join(path, table), exist_ok=True)
+
+    def table(self, name):
+        """Memory-mapped view of a table (reflects rows appended so far)"""
+        return Table(os.path.join(self.path, name), SCHEMA[name])
+
+    def _append(self, name, rows):
+        """Append rows ({column: sequence}) to a table, column by column"""
+        path = os.path.join(self.path, name)
+        count = self.table(name).rows
+        for column, dtype in SCHEMA[name]:
+            file = os.path.join(path, f"{column}.bin")
+            array = np.asarray(rows[column], dtype=dtype)
+            with open(file, 'r+b' if os.path.exists(file) else 'wb') as f:
+                # Drop any partial row a crash left behind, then append
+                f.truncate(count * array.dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(array.tobytes())
+
+    def add_round(self, record, bay='', personality=''):
+        """Add a finished round (TriggerBasedAnnouncer.round_record()) to the store
+
+        Returns the round id, or None if no hole was played.
+        """
+        holes = record['holes']
+        if not holes:
+            return None
+
+        started, ended = record['started'], record['ended']
+        with self._lock:
+            # Start time in ms, kept unique for rounds started together (multi-bay)
+            ids = self.table('rounds')['round_id']
+            round_id = int(started * 1000)
+            if len(ids):
+                round_id = max(round_id, int(ids.max()) + 1)
+            self._add_round(holes, round_id, started, ended, record['stats'], bay,
+                            personality)
+        return round_id
+
+    def _add_round(self, holes, round_id, started, ended, stats, bay, personality):
+        hole_rows = {column: [] for column, _ in SCHEMA['holes']}
+        distance_rows = {column: [] for column, _ in SCHEMA['distances']}
+        for record in holes:
+            hole = _int(record['hole'])
+            distances = record.get('distances') or []
+            hole_started = record.get('started') or started
+            hole_rows['round_id'].append(round_id)
+            hole_rows['hole'].append(hole)
+            hole_rows['par'].append(_int(record.get('par')))
+            hole_rows['shots'].append(record['shots'])
+            hole_rows['started'].append(hole_started)
+            hole_rows['duration_s'].append((record.get('ended') or ended) - hole_started)
+            hole_rows['tee_distance'].append(distances[0] if distances else 0)
+            for seq, distance in enumerate(distances):
+                distance_rows['round_id'].append(round_id)
+                distance_rows['hole'].append(hole)
+                distance_rows['seq'].append(seq)
+                distance_rows['distance'].append(distance)
+
+        round_row = {
+            'round_id': [round_id],
+            'started': [started],
+            'ended': [ended],
+            'bay': [bay.encode()[:16]],
+            'personality': [personality.encode()[:24]],
+            'holes': [len(holes)],
+            'screenshots': [stats.get('screenshots_taken', 0)],
+            'triggers': [stats.get('changes_detected', 0)],
+            'api_calls': [stats.get('api_calls_made', 0)],
+            'cache_hits': [stats.get('cache_hits', 0)],
+            'cost_usd': [stats.get('cost_usd', stats.get('api_calls_made', 0) * COST_PER_CALL)],
+        }
+
+        # Rounds go last: a round row means its holes are complete
+        self._append('holes', hole_rows)
+        self._append('distances', distance_rows)
+        self._append('rounds', round_row)
+
+    # Queries
+
+    def round_mask(self, bay=None, personality=None, since=None, until=None):
+        """Boolean mask over rounds matching the filters"""
+        rounds = self.table('rounds')
+        mask = np.ones(len(rounds), dtype=bool)
+        if bay is not None:
+            mask &= rounds['bay'] == bay.encode()
+        if personality is not None:
+            mask &= rounds['personality'] == personality.encode()
+        if since is not None:
+            mask &= rounds['started'] >= since
+        if until is not None:
+            mask &= rounds['started'] < until
+        return mask
+
+    def _selected_ids(self, **filters):
+        rounds = self.table('rounds')
+        return rounds['round_id'][self.round_mask(**filters)]
+
+    def round_totals(self, **filters):
+        """Counts, means and totals over the selected rounds"""
+        rounds = self.table('rounds')
+        mask = self.round_mask(**filters)
+        count = int(mask.sum())
+        if not count:
+            return {'rounds': 0}
+        duration = rounds['ended'][mask] - rounds['started'][mask]
+        screenshots = rounds['screenshots'][mask].sum(dtype=np.int64)
+        triggers = rounds['triggers'][mask].sum(dtype=np.int64)
+        cost = rounds['cost_usd'][mask]
+        return {
+            'rounds': count,
+            'holes': int(rounds['holes'][mask].sum(dtype=np.int64)),
+            'mean_round_min': float(duration.mean() / 60),
+            'trigger_rate': float(triggers / screenshots) if screenshots else 0.0,
+            'api_calls': int(rounds['api_calls'][mask].sum(dtype=np.int64)),
+            'cache_hits': int(rounds['cache_hits'][mask].sum(dtype=np.int64)),
+            'cost_total': float(cost.sum()),
+            'cost_per_round': float(cost.mean()),
+        }
+
+    def per_hole(self, **filters):
+        """Per hole number: rounds played, mean minutes, mean shots, mean vs par"""
+        holes = self.table('holes')
+        mask = np.isin(holes['round_id'], self._selected_ids(**filters))
+        number = holes['hole'][mask].astype(np.int64)
+        if not number.size:
+            return {}
+        played = np.bincount(number)
+        minutes = np.bincount(number, weights=holes['duration_s'][mask]) / 60
+        shots = np.bincount(number, weights=holes['shots'][mask])
+        par = holes['par'][mask]
+        has_par = par > 0
+        over = np.bincount(number[has_par], weights=(holes['shots'][mask] - par)[has_par],
+                           minlength=played.size)
+        par_count = np.bincount(number[has_par], minlength=played.size)
+
+        result = {}
+        for hole in np.nonzero(played)[0]:
+            result[int(hole)] = {
+                'played': int(played[hole]),
+                'mean_min': float(minutes[hole] / played[hole]),
+                'mean_shots': float(shots[hole] / played[hole]),
+                'mean_vs_par': (float(over[hole] / par_count[hole])
+                                if par_count[hole] else None),
+            }
+        return result
+
+    def distance_histogram(self, bins=(0, 50, 100, 150, 200, 250, 300, 400, 700), **filters):
+        """How often each distance band is seen (tee and approach readings)"""
+        distances = self.table('distances')
+        mask = np.isin(distances['round_id'], self._selected_ids(**filters))
+        counts, edges = np.histogram(distances['distance'][mask], bins=bins)
+        return list(zip(edges[:-1].astype(int).tolist(), edges[1:].astype(int).tolist(),
+                        counts.tolist()))
+
+
+def print_report(store, **filters):
+    """Facility report over the selected rounds"""
+    totals = store.round_totals(**filters)
+    print("\n" + "="*60)
+    print("📊 ROUND ANALYTICS")
+    print("="*60)
+    if not totals['rounds']:
+        print("No rounds recorded")
+        print("="*60 + "\n")
+        return
+
+    print(f"⛳ Rounds: {totals['rounds']} ({totals['holes']} holes)")
+    print(f"⏱️  Mean round: {totals['mean_round_min']:.1f} minutes")
+    print(f"🎯 Trigger rate: {totals['trigger_rate'] * 100:.1f}% of screenshots")
+    print(f"🤖 API calls: {totals['api_calls']} ({totals['cache_hits']} cache hits)")
+    print(f"💰 Cost: ${totals['cost_total']:.4f} total, "
+          f"${totals['cost_per_round']:.4f} per round")
+
+    print("\nHole  Played  Minutes  Shots  vs Par")
+    for hole, row in sorted(store.per_hole(**filters).items()):
+        vs_par = f"{row['mean_vs_par']:+.2f}" if row['mean_vs_par'] is not None else "   -"
+        print(f"{hole:>4}  {row['played']:>6}  {row['mean_min']:>7.1f}  "
+              f"{row['mean_shots']:>5.2f}  {vs_par:>6}")
+
+    print("\nDistance readings")
+    for low, high, count in store.distance_histogram(**filters):
+        print(f"  {low:>3}-{high:<3} yds  {count}")
+    print("="*60 + "\n")
+
+
+def main():
+    """Entry point"""
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(
+        description='Report on rounds in the shot analytics store',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('store', nargs='?', default='analytics',
+                        help='Analytics store folder (default: analytics)')
+    parser.add_argument('--bay', type=str, help='Only rounds from this bay')
+    parser.add_argument('--mode', type=str, help='Only rounds with this personality')
+    parser.add_argument('--since', type=str, help='Only rounds started on/after YYYY-MM-DD')
+    parser.add_argument('--until', type=str, help='Only rounds started before YYYY-MM-DD')
+
+    args = parser.parse_args()
+
+    def timestamp(day):
+        return datetime.strptime(day, '%Y-%m-%d').timestamp() if day else None
+
+    print_report(
+        AnalyticsStore(args.store),
+        bay=args.bay,
+        personality=args.mode,
+        since=timestamp(args.since),
+        until=timestamp(args.until)
+    )
+
+
+if __name__ == "__main__":
+    main()
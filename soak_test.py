@@ -0,0 +1,326 @@
+"""
+Soak test - hours of simulated play in minutes, checking memory stays flat
+Drives the trigger announcer's real pipeline (change detection, scene
+filter, state parsing, commentary, speech queue) with synthetic frames as
+fast as it can. OCR is replaced by the text the synthetic HUD shows, the LLM
+runs in replay mode and speech goes to a silent engine, so no Tesseract,
+API key or audio is needed.
+
+Memory is sampled with tracemalloc and RSS. After a warm-up, growth is
+reported by allocation site and the run fails if traced memory grew more
+than --max-growth-mb. Synthetic runs also fail if the announcer takes more
+than --max-hole-lag frames to notice a new hole. With --hud the synthetic
+text goes through the announcer's HUD field selection (per scene, CPU
+governor cap) instead of being handed over whole.
+
+    python soak_test.py --hours 4
+    python soak_test.py --hours 2 --hud
+    python soak_test.py --hours 12 --interval 0.5 --top 15
+    python soak_test.py --frames debug_screenshots   (replay saved screens, real OCR)
+"""
+
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import llm_transport
+from gspro_ai_trigger import TriggerBasedAnnouncer
+from speech_service import get_speech_service
+
+FRAME_SIZE = (800, 600)
+
+
+class SilentEngine:
+    """pyttsx3 stand-in that says nothing"""
+
+    def connect(self, name, callback):
+        pass
+
+    def setProperty(self, name, value):
+        pass
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class SyntheticRound:
+    """Endless simulated play: (frame, HUD text) per capture
+
+    Every frame animates a water patch and a flag. Each shot changes the HUD
+    block, each hole changes the view, and every 18 holes a scorecard shows.
+    """
+
+    def __init__(self, seed=0, idle_frames=8):
+        import numpy as np
+
+        self.np = np
+        self.rng = random.Random(seed)
+        self.noise = np.random.default_rng(seed)
+        self.idle_frames = idle_frames
+        width, height = FRAME_SIZE
+
+        def view(horizon):
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[:horizon] = (110, 160, 230)
+            frame[horizon:] = (55, 145, 45)
+            return frame
+
+        scorecard = view(200)
+        scorecard[60:540, 60:740] = 240
+        scorecard[60:540:40, 60:740] = 0
+        scorecard[60:540, 60:740:60] = 0
+        self.views = {'tee': view(260), 'fairway': view(180), 'green': view(0),
+                      'scorecard': scorecard}
+        self.hole = 0
+        self.holes_played = 0
+
+    def frames(self):
+        """Yield (PIL image, OCR text) forever"""
+        while True:
+            self.hole = self.hole % 18 + 1
+            self.holes_played += 1
+            par = self.rng.choice((3, 4, 4, 4, 5))
+            distance = {3: 170, 4: 400, 5: 520}[par] + self.rng.randint(-30, 30)
+            wind = self.rng.randint(0, 20)
+            shots = 0
+            while distance > 0 and shots < 8:
+                scene = 'tee' if shots == 0 else ('green' if distance < 30 else 'fairway')
+                text = f"Hole {self.hole} Par {par}\n{distance} yds\nWind {wind} mph"
+                # Alternate dark/light so every new HUD reads as a screen change
+                hud = 40 if self.holes_played % 2 == shots % 2 else 220
+                for _ in range(self.idle_frames):
+                    yield self.render(scene, hud), text
+                shots += 1
+                distance = max(0, distance - self.rng.randint(120, 260) if distance > 40
+                               else 0)
+            if self.hole == 18:
+                for _ in range(3):
+                    yield self.render('scorecard', 0), "Scorecard\nHole 1 2 3 4 5 6 7 8 9"
+
+    def render(self, scene, hud):
+        from PIL import Image
+
+        frame = self.views[scene].copy()
+        frame[480:600, :400] = self.noise.integers(0, 255, (120, 400, 3), dtype=self.np.uint8)
+        frame[200:260, 500:540] = self.noise.integers(0, 255, (60, 40, 3), dtype=self.np.uint8)
+        if scene != 'scorecard':
+            frame[20:140, 20:420] = hud
+        return Image.fromarray(frame)
+
+
+class SavedFrames:
+    """Cycle through saved screenshots, OCRed for real"""
+
+    def __init__(self, folder):
+        from PIL import Image
+
+        names = sorted(n for n in os.listdir(folder) if n.lower().endswith('.png'))
+        if not names:
+            raise ValueError(f"No .png screenshots in {folder}")
+        self.images = [Image.open(os.path.join(folder, n)).convert('RGB') for n in names]
+
+    def frames(self):
+        while True:
+            for image in self.images:
+                yield image, None
+
+
+class SyntheticHud:
+    """HudCalibrator stand-in: the synthetic HUD lines for the fields asked for"""
+
+    def __init__(self, announcer):
+        self.announcer = announcer
+
+    def read(self, screenshot, fields=None):
+        from hud_calibration import FIELD_PATTERNS
+        patterns = [FIELD_PATTERNS[field] for field in fields or FIELD_PATTERNS]
+        return "\n".join(line for line in self.announcer.soak_text.splitlines()
+                         if any(pattern.search(line) for pattern in patterns))
+
+    def report(self, size, found):
+        pass
+
+
+class SoakAnnouncer(TriggerBasedAnnouncer):
+    """Trigger announcer that reads the synthetic HUD text instead of OCRing"""
+
+    soak_text = None
+
+    def ocr_screen(self, screenshot):
+        if self.soak_text is None or self.hud is not None:
+            return super().ocr_screen(screenshot)
+        return self.soak_text
+
+
+def rss_bytes():
+    """Current resident set size, or None if it can't be read here"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _mb(n):
+    return "   n/a" if n is None else f"{n / 1e6:6.1f}"
+
+
+def soak(announcer, source, frames, interval, samples=12, warmup=0.1, out=sys.stdout):
+    """Run the capture loop over frames
+
+    Returns (samples, start snapshot, end snapshot, most frames the announcer
+    was behind a hole change - None for saved frames).
+    """
+    sample_every = max(1, frames // samples)
+    warmup_frame = int(frames * warmup)
+    taken = []
+    start_snapshot = None
+    started = time.perf_counter()
+    lag = max_lag = 0
+    # Frames are --interval apart in simulated time, so camera motion isn't
+    # mistaken for a flyover just because the soak runs faster than real time
+    from scene_classifier import SceneClassifier
+    announcer.scene_classifier = SceneClassifier(clock=lambda: n * interval)
+
+    stream = source.frames()
+    for n in range(frames + 1):
+        frame, text = next(stream)
+        announcer.soak_text = text
+        announcer.stats['screenshots_taken'] += 1
+        changed, _ = announcer.detect_screen_change(frame)
+        if changed and announcer.classify_scene(frame):
+            announcer.handle_ocr_text(announcer.ocr_screen(frame))
+        announcer.wait_for_feed(0)
+
+        if isinstance(source, SyntheticRound):
+            lag = 0 if announcer.game_state['current_hole'] == str(source.hole) else lag + 1
+            max_lag = max(max_lag, lag)
+
+        if n == warmup_frame:
+            start_snapshot = tracemalloc.take_snapshot()
+        if n % sample_every == 0:
+            traced, _ = tracemalloc.get_traced_memory()
+            taken.append((n * interval / 3600, traced, rss_bytes()))
+            print(f"   {n * interval / 3600:6.2f} h simulated   traced {_mb(traced)} MB   "
+                  f"RSS {_mb(taken[-1][2])} MB   ({time.perf_counter() - started:.0f}s real)",
+                  file=out, flush=True)
+
+    return (taken, start_snapshot, tracemalloc.take_snapshot(),
+            max_lag if isinstance(source, SyntheticRound) else None)
+
+
+def main():
+    """Entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Soak-test the announcer pipeline for memory growth',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--hours', type=float, default=2.0,
+                        help='Simulated hours of play (default: 2)')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Simulated seconds between captures (default: 1.0)')
+    parser.add_argument('--frames', type=str, metavar='DIR',
+                        help='Replay saved screenshots (needs Tesseract) instead of synthetic play')
+    parser.add_argument('--journal', type=str, metavar='FILE',
+                        help='Also write a session journal during the soak')
+    parser.add_argument('--hud', action='store_true',
+                        help='Read the synthetic HUD through per-scene field selection')
+    parser.add_argument('--max-growth-mb', type=float, default=1.0,
+                        help='Fail if traced memory grows more than this after warm-up')
+    parser.add_argument('--max-hole-lag', type=int, default=8,
+                        help='Fail if a new hole goes unnoticed for more frames than this '
+                             '(default: 8, one shot)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Allocation sites to list (default: 10)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.hud and args.frames:
+        parser.error("--hud uses the synthetic HUD; it can't be combined with --frames")
+
+    llm_transport.configure(mode='replay', latency='none')
+    get_speech_service(SilentEngine)
+    out = sys.stdout
+
+    with redirect_stdout(io.StringIO()):
+        announcer = SoakAnnouncer(personality_mode='normal')
+    announcer.classify_scenes = True
+    if args.hud:
+        announcer.hud = SyntheticHud(announcer)
+    source = SavedFrames(args.frames) if args.frames else SyntheticRound(args.seed)
+    journal = None
+    if args.journal:
+        from session_journal import SessionJournal
+        journal = SessionJournal(args.journal)
+        announcer.attach_journal(journal, resume=False)
+
+    frames = int(args.hours * 3600 / args.interval)
+    print("\n" + "="*60)
+    print(f"🧪 SOAK TEST - {args.hours:g} h simulated, {frames} frames"
+          f"{' (HUD fields)' if args.hud else ''}")
+    print("="*60)
+
+    tracemalloc.start()
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            samples, first, last, hole_lag = soak(announcer, source, frames, args.interval, out=out)
+    finally:
+        if journal is not None:
+            journal.close()
+    tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')]
+    growth = last.filter_traces(ignore).compare_to(first.filter_traces(ignore), 'lineno')
+    print("\nTop growth by allocation site since warm-up:")
+    for stat in growth[:args.top]:
+        frame = stat.traceback[0]
+        print(f"   {stat.size_diff / 1024:+9.1f} KiB  {stat.count_diff:+6d} blocks  "
+              f"{os.path.basename(frame.filename)}:{frame.lineno}")
+
+    gs = announcer.game_state
+    service = get_speech_service()
+    print("\nLong-lived structures:")
+    print(f"   hole_history {len(gs['hole_history'])}   hole_distances "
+          f"{len(gs['hole_distances'])}   speech queue {service.pending()}")
+    if isinstance(source, SyntheticRound):
+        print(f"   {source.holes_played} holes played, "
+              f"{announcer.stats['api_calls_made']} commentary calls, "
+              f"{announcer.stats['ocr_skipped']} OCR passes skipped")
+        print(f"   New holes noticed within {hole_lag} frame(s)")
+
+    warm = next((s for s in samples if s[0] >= samples[-1][0] * 0.1), samples[0])
+    grown = (samples[-1][1] - warm[1]) / 1e6
+    lagging = hole_lag is not None and hole_lag > args.max_hole_lag
+    print("\n" + "="*60)
+    if grown > args.max_growth_mb:
+        print(f"❌ Traced memory grew {grown:.2f} MB after warm-up "
+              f"(limit {args.max_growth_mb:g} MB)")
+    else:
+        print(f"✅ Memory flat: {grown:+.2f} MB after warm-up (limit {args.max_growth_mb:g} MB)")
+    if lagging:
+        print(f"❌ A new hole went unnoticed for {hole_lag} frames "
+              f"(limit {args.max_hole_lag})")
+    print("="*60 + "\n")
+    return 1 if grown > args.max_growth_mb or lagging else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
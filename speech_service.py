@@ -0,0 +1,217 @@
+"""
+Speech service - one audio thread, a priority queue and preemption
+speak() used to call engine.runAndWait() on the caller's thread, so every
+utterance stalled the capture loop, and a burst of announcements played in
+full one after another even when they were already stale.
+
+Now callers hand text to say() and return immediately. The audio thread
+plays the most important queued item first:
+
+  hole change > shot result > distance > wind > anything else
+
+A newer item of the same kind from the same channel (announcer/bay)
+replaces the queued one, text already playing or queued for the same
+channel is never repeated, and items older than MAX_AGE for their kind are
+dropped. A higher-priority item stops its own channel's utterance at the
+next word (pyttsx3 only allows engine.stop() from its own callbacks).
+Channels never supersede, merge with, interrupt or push out each other's
+lines, so bays sharing the one audio device each keep their own speech.
+
+The engine is created on the audio thread and only ever used there. If it
+fails to start, lines are printed only and the engine is tried again after
+ENGINE_RETRY seconds.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+from shared_resources import get_tts_engine
+
+# Lower number = more urgent
+PRIORITIES = {'hole': 0, 'shot': 1, 'distance': 2, 'wind': 3, 'other': 4}
+
+# Seconds a queued item of each kind stays worth saying
+MAX_AGE = {'hole': 30.0, 'shot': 15.0, 'distance': 8.0, 'wind': 8.0, 'other': 15.0}
+
+# Seconds before retrying a TTS engine that failed to start
+ENGINE_RETRY = 30.0
+
+
+def speech_kind(changes):
+    """Most urgent announcement class among (change_type, value) pairs"""
+    kinds = [kind for kind, _ in changes or () if kind in PRIORITIES]
+    return min(kinds, key=PRIORITIES.get) if kinds else 'other'
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+class SpeechService:
+    """Priority speech queue played by a single daemon audio thread"""
+
+    def __init__(self, engine_factory=get_tts_engine, max_queue=8):
+        self.engine_factory = engine_factory
+        self.max_queue = max_queue
+        self._queue = []  # heap of (priority, seq, item)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._interrupt = False
+        self._running = True
+        self._engine = None
+        self._engine_retry_at = 0.0
+        self._engine_error = None
+        self.stats = {'queued': 0, 'spoken': 0, 'merged': 0, 'superseded': 0,
+                      'stale': 0, 'interrupted': 0, 'dropped': 0}
+        self._thread = threading.Thread(target=self._run, name='speech', daemon=True)
+        self._thread.start()
+
+    def say(self, text, kind='other', rate=None, channel=None, volume=None):
+        """Queue text to speak; never blocks on audio"""
+        kind = kind if kind in PRIORITIES else 'other'
+        item = {'text': text, 'key': _normalize(text), 'kind': kind,
+                'priority': PRIORITIES[kind], 'rate': rate, 'volume': volume,
+                'channel': channel, 'created': time.monotonic()}
+        with self._cond:
+            # Repeats only merge within a channel - two bays sharing the
+            # commentary cache can get the same line and both should hear it
+            same = (item['key'], channel)
+            current = self._current
+            if current is not None and (current['key'], current['channel']) == same:
+                self.stats['merged'] += 1
+                return False
+            for entry in self._queue:
+                queued = entry[2]
+                if (queued['key'], queued['channel']) == same:
+                    self.stats['merged'] += 1
+                    return False
+            # The newest line of a kind from the same channel supersedes the older one
+            kept = [entry for entry in self._queue
+                    if (entry[2]['kind'], entry[2]['channel']) != (kind, channel)]
+            self.stats['superseded'] += len(self._queue) - len(kept)
+            self._queue = kept
+            heapq.heapify(self._queue)
+
+            heapq.heappush(self._queue, (item['priority'], next(self._seq), item))
+            self.stats['queued'] += 1
+            # The cap is per channel, so a busy bay can't push out another bay's lines
+            own = [entry for entry in self._queue if entry[2]['channel'] == channel]
+            if len(own) > self.max_queue:
+                self._queue.remove(max(own))
+                heapq.heapify(self._queue)
+                self.stats['dropped'] += 1
+
+            # Only cut off the channel's own line - another bay's is left to finish
+            if (current is not None and current['channel'] == channel and
+                    item['priority'] < current['priority']):
+                self._interrupt = True
+            self._cond.notify()
+        return True
+
+    def pending(self):
+        """Number of queued (not yet playing) items"""
+        with self._cond:
+            return len(self._queue)
+
+    def idle(self):
+        """True when nothing is playing or queued"""
+        with self._cond:
+            return self._current is None and not self._queue
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been played (False on timeout)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._current is None and not self._queue,
+                                       timeout)
+
+    def stop(self):
+        """Drop queued speech, cut the current utterance and end the audio thread"""
+        with self._cond:
+            self._running = False
+            self._queue = []
+            self._interrupt = True
+            self._cond.notify()
+
+    def _next_item(self):
+        """Wait for the most urgent item that is still fresh"""
+        with self._cond:
+            while self._running:
+                while self._queue:
+                    _, _, item = heapq.heappop(self._queue)
+                    if time.monotonic() - item['created'] > MAX_AGE[item['kind']]:
+                        self.stats['stale'] += 1
+                        continue
+                    self._current = item
+                    self._interrupt = False
+                    return item
+                self._cond.notify_all()  # Wake wait() - the queue has drained
+                self._cond.wait()
+            return None
+
+    def _on_word(self, name, location, length):
+        """pyttsx3 callback - the only place engine.stop() may be called"""
+        if self._interrupt:
+            self._interrupt = False
+            self.stats['interrupted'] += 1
+            self._engine.stop()
+
+    def _start_engine(self):
+        """Create the engine on this (the audio) thread, at most every ENGINE_RETRY s"""
+        if self._engine is not None or time.monotonic() < self._engine_retry_at:
+            return self._engine
+        try:
+            engine = self.engine_factory()
+            engine.connect('started-word', self._on_word)
+        except Exception as e:
+            if self._engine_error is None:
+                print(f"⚠️  TTS unavailable ({e}) - commentary will only be printed")
+            self._engine_error = e
+            self._engine_retry_at = time.monotonic() + ENGINE_RETRY
+            return None
+        if self._engine_error is not None:
+            print("🔊 TTS engine started")
+            self._engine_error = None
+        self._engine = engine
+        return engine
+
+    def _run(self):
+        self._start_engine()
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            engine = self._start_engine()
+            if engine is not None:
+                try:
+                    if item['rate']:
+                        engine.setProperty('rate', item['rate'])
+                    if item['volume'] is not None:
+                        engine.setProperty('volume', item['volume'])
+                    engine.say(item['text'])
+                    engine.runAndWait()
+                except Exception as e:
+                    print(f"⚠️  TTS error: {e}")
+            with self._cond:
+                self._current = None
+                self.stats['spoken'] += 1
+                self._cond.notify_all()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_speech_service(engine_factory=None):
+    """Return the process-wide speech service (the TTS engine is per process too)
+
+    engine_factory only applies when the service is first created, e.g. a
+    silent engine for soak tests.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = SpeechService(engine_factory or get_tts_engine)
+    return _service
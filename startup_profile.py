@@ -0,0 +1,164 @@
+"""
+Startup profiler for the GSPro announcers
+Measures import time, --help time and startup phases so regressions get caught
+
+Run directly to check every entry point against a budget:
+    python startup_profile.py
+    python startup_profile.py --budget-ms 400
+Exits non-zero if an entry point imports a heavy dependency eagerly or its
+--help takes longer than the budget.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+# Dependencies that must only be imported on first use
+HEAVY_MODULES = ['pytesseract', 'PIL', 'numpy', 'anthropic', 'pyttsx3']
+
+ENTRY_POINTS = [
+    'gspro_ai_trigger',
+    'gspro_ai_announcer',
+    'gspro_voice_caddy',
+    'demo_ai_announcer',
+    'multi_bay',
+    'analysis_server',
+    'capture_agent',
+    'commentary_bank',
+    'soak_test',
+]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class StartupProfiler:
+    """Records named startup phases for the --profile-startup flag"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work"""
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - phase_start))
+
+    def wait_for(self, name, thread, timeout=30.0):
+        """Record how long a background thread takes to finish from process start"""
+        thread.join(timeout)
+        self.phases.append((name, time.perf_counter() - self.start))
+
+    def report(self):
+        """Print phase timings and which heavy modules are loaded so far"""
+        total = time.perf_counter() - self.start
+        print("\n" + "="*60)
+        print("⏱️  STARTUP PROFILE")
+        print("="*60)
+        for name, seconds in self.phases:
+            print(f"  {name:<36} {seconds * 1000:8.1f} ms")
+        print(f"  {'total (profiler start to now)':<36} {total * 1000:8.1f} ms")
+        loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+        print(f"  Heavy modules loaded: {', '.join(loaded) or 'none'}")
+        print("="*60 + "\n")
+
+
+def import_profile(module, python=sys.executable):
+    """Import a module in a fresh interpreter with -X importtime
+
+    Returns (total_ms, {direct_import: cumulative_ms}, eager_heavy_modules).
+    """
+    code = (f"import {module}, sys; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', code],
+        cwd=HERE, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total_ms = 0.0
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)', line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = (len(match.group(3)) - 1) // 2
+        name = match.group(4)
+        if depth == 0 and name == module:
+            total_ms = cumulative_ms
+        elif depth == 1:
+            # Direct imports of the entry point
+            packages[name] = packages.get(name, 0) + cumulative_ms
+
+    eager = [m for m in result.stdout.strip().split(',') if m]
+    return total_ms, packages, eager
+
+
+def help_time(module, python=sys.executable):
+    """Wall-clock time of `python <module>.py --help` in milliseconds"""
+    start = time.perf_counter()
+    subprocess.run(
+        [python, f'{module}.py', '--help'],
+        cwd=HERE, capture_output=True, text=True
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    """Profile every entry point and fail on regressions"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Startup profile for the announcer entry points')
+    parser.add_argument('--budget-ms', type=float, default=500.0,
+                        help='Max wall time for <script> --help (default: 500)')
+    parser.add_argument('--top', type=int, default=5,
+                        help='Show the N slowest imports per entry point')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("⏱️  STARTUP PROFILE")
+    print("="*60)
+
+    failures = []
+    for module in ENTRY_POINTS:
+        try:
+            import_ms, packages, eager = import_profile(module)
+        except RuntimeError as e:
+            print(f"\n❌ {module}: import failed ({e})")
+            failures.append(module)
+            continue
+        help_ms = help_time(module)
+
+        status = "✅"
+        if eager or help_ms > args.budget_ms:
+            status = "❌"
+            failures.append(module)
+
+        print(f"\n{status} {module}")
+        print(f"   import: {import_ms:7.1f} ms   --help: {help_ms:7.1f} ms "
+              f"(budget {args.budget_ms:.0f} ms)")
+        if eager:
+            print(f"   Eagerly imports: {', '.join(eager)}")
+        slowest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+        for name, ms in slowest:
+            print(f"     {name:<28} {ms:7.1f} ms")
+
+    print("\n" + "="*60)
+    if failures:
+        print(f"❌ Startup regressions: {', '.join(failures)}")
+    else:
+        print("✅ All entry points within budget")
+    print("="*60 + "\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
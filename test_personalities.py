@@ -4,52 +4,44 @@ Tests each personality with sample golf scenarios
 """
 
 import os
-import sys
-import json
 
-try:
-    import anthropic
-except ImportError:
-    print("❌ Error: anthropic package not installed")
-    print("Run: pip install anthropic")
-    sys.exit(1)
+from shared_resources import get_client, warm_up
+from commentary_matrix import run_matrix, print_matrix_table
+import llm_transport
+from personality_registry import get_registry
 
 # Load personalities from JSON file
 def load_personalities():
-    """Load personalities from personalities.json"""
+    """Load personalities from personalities.json (parsed and validated once)"""
     json_path = os.path.join(os.path.dirname(__file__), 'personalities.json')
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    return data['personalities']
+    return get_registry(json_path).all()
 
 CADDY_PERSONALITIES = load_personalities()
 
 
-def test_personality(client, personality_name, scenario):
-    """Test a personality with a given scenario"""
-    personality = CADDY_PERSONALITIES[personality_name]
-    
-    try:
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=150,
-            system=personality['prompt'],
-            messages=[
-                {"role": "user", "content": f"Current situation: {scenario}\n\nGenerate a short caddy comment (1-2 sentences max) about this shot. Be in character."}
-            ]
-        )
+# Caddy instructions, sent as part of each personality's cached system prompt
+CADDY_STYLE_RULES = "Generate a short caddy comment (1-2 sentences max) about this shot. Be in character."
+
 
-        return message.content[0].text.strip()
-    except Exception as e:
-        return f"Error: {e}"
+def build_caddy_prompt(scenario):
+    """User message describing the situation for a caddy comment"""
+    return f"Current situation: {scenario}"
 
 
 def main():
     """Test all personalities with sample scenarios"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Preview every personality on sample scenarios')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent API requests (default: 4)')
+    llm_transport.add_transport_arguments(parser)
+    args = parser.parse_args()
+    llm_transport.configure_from_args(args)
     
     # Get API key
     api_key = os.environ.get('ANTHROPIC_API_KEY')
-    if not api_key:
+    if not api_key and llm_transport.requires_api_key():
         print("❌ Error: ANTHROPIC_API_KEY not set!")
         print("\nSet it with:")
         print("  Windows: set ANTHROPIC_API_KEY=your_key_here")
@@ -57,7 +49,8 @@ def main():
         print("\nGet your key at: https://console.anthropic.com/")
         return
     
-    client = anthropic.Anthropic(api_key=api_key)
+    client = get_client(api_key)
+    warm_up(api_key, tts=False)
     
     # Test scenarios
     scenarios = [
@@ -86,6 +79,14 @@ def main():
     print("This helps you choose which personality you'll enjoy most!")
     print()
     
+    # Fan out over every personality x scenario pair
+    prompts = {name: config['prompt'] for name, config in CADDY_PERSONALITIES.items()}
+    results, wall_time = run_matrix(
+        client, prompts, scenarios, build_caddy_prompt,
+        max_workers=args.workers, temperature=1.0, style_rules=CADDY_STYLE_RULES
+    )
+    cells = {(r['personality'], r['scenario']): r for r in results}
+    
     for scenario in scenarios:
         print("\n" + "="*70)
         print(f"⛳ SCENARIO: {scenario['name']}")
@@ -97,10 +98,12 @@ def main():
             print(f"🎭 {personality_config['name'].upper()}:")
             print("   ", end="")
             
-            response = test_personality(client, personality_name, scenario['context'])
-            print(response)
+            cell = cells[(personality_name, scenario['name'])]
+            print(cell['text'] if cell['text'] else f"Error: {cell['error']}")
             print()
     
+    print("="*70)
+    print_matrix_table(results, wall_time)
     print("="*70)
     print("✅ Testing complete!")
     print("\nTo use your favorite personality:")